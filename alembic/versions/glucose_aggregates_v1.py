@@ -0,0 +1,45 @@
+"""glucose aggregates v1
+
+Revision ID: glucose_aggregates_v1
+Revises: glucose_chunks_v1
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_aggregates_v1'
+down_revision: Union[str, None] = 'glucose_chunks_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tier de rétention : agrégats 15 min des mesures anciennes (voir scripts/compact_glucose.py)
+    op.create_table(
+        'glucose_aggregates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('value_count', sa.Integer(), nullable=True),
+        sa.Column('value_mean', sa.Float(), nullable=False),
+        sa.Column('value_min', sa.Float(), nullable=False),
+        sa.Column('value_max', sa.Float(), nullable=False),
+        sa.Column('value_sum_sq', sa.Float(), nullable=True),
+        sa.Column('low_count', sa.Integer(), nullable=True),
+        sa.Column('normal_count', sa.Integer(), nullable=True),
+        sa.Column('high_count', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'bucket_start', name='uq_glucose_aggregates_bucket')
+    )
+    op.create_index(op.f('ix_glucose_aggregates_id'), 'glucose_aggregates', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_glucose_aggregates_id'), table_name='glucose_aggregates')
+    op.drop_table('glucose_aggregates')
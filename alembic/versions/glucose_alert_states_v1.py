@@ -0,0 +1,35 @@
+"""persisted glucose alert engine state
+
+Revision ID: glucose_alert_states_v1
+Revises: meal_responses_v1
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_alert_states_v1'
+down_revision: Union[str, None] = 'meal_responses_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Pas de backfill : une ligne est créée à la première mesure évaluée de l'utilisateur
+    op.create_table(
+        'glucose_alert_states',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('last_timestamp', sa.DateTime(), nullable=True),
+        sa.Column('rules', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('glucose_alert_states')
@@ -0,0 +1,60 @@
+"""glucose alert rules and alerts
+
+Revision ID: glucose_alerts_v1
+Revises: glucose_trend_v1
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_alerts_v1'
+down_revision: Union[str, None] = 'glucose_trend_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'alert_rules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('threshold', sa.Float(), nullable=True),
+        sa.Column('duration_minutes', sa.Integer(), nullable=True),
+        sa.Column('enabled', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_alert_rules_id'), 'alert_rules', ['id'], unique=False)
+    op.create_index(op.f('ix_alert_rules_user_id'), 'alert_rules', ['user_id'], unique=False)
+
+    op.create_table(
+        'glucose_alerts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('rule_id', sa.Integer(), nullable=True),
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('value', sa.Float(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('message', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['rule_id'], ['alert_rules.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_glucose_alerts_id'), 'glucose_alerts', ['id'], unique=False)
+    op.create_index('ix_glucose_alerts_user_timestamp', 'glucose_alerts', ['user_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_glucose_alerts_user_timestamp', table_name='glucose_alerts')
+    op.drop_index(op.f('ix_glucose_alerts_id'), table_name='glucose_alerts')
+    op.drop_table('glucose_alerts')
+    op.drop_index(op.f('ix_alert_rules_user_id'), table_name='alert_rules')
+    op.drop_index(op.f('ix_alert_rules_id'), table_name='alert_rules')
+    op.drop_table('alert_rules')
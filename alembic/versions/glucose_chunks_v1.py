@@ -0,0 +1,41 @@
+"""glucose chunks v1
+
+Revision ID: glucose_chunks_v1
+Revises: glucose_rollups_v1
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_chunks_v1'
+down_revision: Union[str, None] = 'glucose_rollups_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Journées closes compactées (mode de stockage optionnel, voir scripts/pack_chunks.py)
+    op.create_table(
+        'glucose_chunks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.DateTime(), nullable=False),
+        sa.Column('reading_count', sa.Integer(), nullable=True),
+        sa.Column('first_timestamp', sa.DateTime(), nullable=True),
+        sa.Column('last_timestamp', sa.DateTime(), nullable=True),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'day', name='uq_glucose_chunks_user_day')
+    )
+    op.create_index(op.f('ix_glucose_chunks_id'), 'glucose_chunks', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_glucose_chunks_id'), table_name='glucose_chunks')
+    op.drop_table('glucose_chunks')
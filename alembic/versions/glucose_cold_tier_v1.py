@@ -0,0 +1,37 @@
+"""glucose cold tier manifest (Parquet monthly archives)
+
+Revision ID: glucose_cold_tier_v1
+Revises: glucose_rolling_window_v1
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_cold_tier_v1'
+down_revision: Union[str, None] = 'glucose_rolling_window_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rempli par scripts/archive_cold_tier.py (les fichiers Parquet vivent hors base, sous COLD_TIER_DIR)
+    op.create_table(
+        'glucose_cold_months',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('month', sa.DateTime(), nullable=False),
+        sa.Column('reading_count', sa.Integer(), nullable=False),
+        sa.Column('value_sum', sa.Float(), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('exported_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'month')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('glucose_cold_months')
@@ -0,0 +1,45 @@
+"""glucose events v1
+
+Revision ID: glucose_events_v1
+Revises: glucose_summaries_v1
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_events_v1'
+down_revision: Union[str, None] = 'glucose_summaries_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Épisodes hypo / hyper (remplis par scripts/backfill_rollups.py pour l'existant)
+    op.create_table(
+        'glucose_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=8), nullable=False),
+        sa.Column('threshold', sa.Float(), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('end_time', sa.DateTime(), nullable=True),
+        sa.Column('last_timestamp', sa.DateTime(), nullable=False),
+        sa.Column('extreme_value', sa.Float(), nullable=False),
+        sa.Column('extreme_time', sa.DateTime(), nullable=False),
+        sa.Column('reading_count', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_glucose_events_id'), 'glucose_events', ['id'], unique=False)
+    op.create_index('ix_glucose_events_user_kind_start', 'glucose_events', ['user_id', 'kind', 'start_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_glucose_events_user_kind_start', table_name='glucose_events')
+    op.drop_index(op.f('ix_glucose_events_id'), table_name='glucose_events')
+    op.drop_table('glucose_events')
@@ -0,0 +1,38 @@
+"""glucose forecast models
+
+Revision ID: glucose_forecast_v1
+Revises: glucose_alerts_v1
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_forecast_v1'
+down_revision: Union[str, None] = 'glucose_alerts_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # État RLS par utilisateur (rempli par scripts/backfill_rollups.py pour l'existant)
+    op.create_table(
+        'glucose_forecast_models',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('coefficients', sa.LargeBinary(), nullable=False),
+        sa.Column('covariance', sa.LargeBinary(), nullable=False),
+        sa.Column('history', sa.LargeBinary(), nullable=True),
+        sa.Column('last_bucket', sa.DateTime(), nullable=True),
+        sa.Column('update_count', sa.Integer(), nullable=False),
+        sa.Column('error_sq', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('glucose_forecast_models')
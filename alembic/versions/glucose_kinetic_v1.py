@@ -0,0 +1,37 @@
+"""glucose kinetic hba1c states
+
+Revision ID: glucose_kinetic_v1
+Revises: glucose_forecast_v1
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_kinetic_v1'
+down_revision: Union[str, None] = 'glucose_forecast_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rempli par scripts/backfill_kinetic_hba1c.py pour l'historique existant
+    op.create_table(
+        'glucose_kinetic_states',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('weighted_sum', sa.Float(), nullable=False),
+        sa.Column('weight_total', sa.Float(), nullable=False),
+        sa.Column('last_day', sa.DateTime(), nullable=True),
+        sa.Column('closed_until', sa.DateTime(), nullable=True),
+        sa.Column('day_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('glucose_kinetic_states')
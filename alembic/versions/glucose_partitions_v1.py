@@ -0,0 +1,135 @@
+"""glucose entries monthly partitions (PostgreSQL)
+
+Revision ID: glucose_partitions_v1
+Revises: glucose_aggregates_v1
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_partitions_v1'
+down_revision: Union[str, None] = 'glucose_aggregates_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = 'id, user_id, value, "timestamp", note'
+
+# Crée les partitions mensuelles manquantes jusqu'à `months_ahead` mois après le mois courant.
+# Les lignes déjà tombées dans la partition DEFAULT pour ce mois y sont déplacées avant l'ATTACH.
+# Une partition détachée (archivée) n'est jamais recréée : son nom existe toujours.
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION glucose_entries_ensure_partitions(months_ahead integer DEFAULT 3, from_month date DEFAULT NULL)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    month_start date := date_trunc('month', coalesce(from_month, current_date))::date;
+    last_month date := (date_trunc('month', current_date) + make_interval(months => months_ahead))::date;
+    month_end date;
+    part_name text;
+    created integer := 0;
+BEGIN
+    WHILE month_start <= last_month LOOP
+        month_end := (month_start + interval '1 month')::date;
+        part_name := 'glucose_entries_' || to_char(month_start, '"y"YYYY"m"MM');
+        IF to_regclass(part_name) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE glucose_entries INCLUDING DEFAULTS)', part_name);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM glucose_entries_default WHERE "timestamp" >= %L AND "timestamp" < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                month_start, month_end, part_name
+            );
+            EXECUTE format(
+                'ALTER TABLE glucose_entries ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                part_name, month_start, month_end
+            );
+            created := created + 1;
+        END IF;
+        month_start := month_end;
+    END LOOP;
+    RETURN created;
+END $$;
+"""
+
+
+def upgrade() -> None:
+    # PostgreSQL uniquement : SQLite garde la table simple
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    orphans = bind.execute(sa.text('SELECT count(*) FROM glucose_entries WHERE "timestamp" IS NULL')).scalar()
+    if orphans:
+        raise RuntimeError(
+            f"{orphans} mesure(s) sans timestamp : la clé de partition doit être renseignée avant la migration"
+        )
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('glucose_entries', 'id')")).scalar()
+
+    # 1. L'ancienne table est mise de côté (noms d'index et de contrainte libérés)
+    op.execute('ALTER TABLE glucose_entries RENAME TO glucose_entries_unpartitioned')
+    op.execute('ALTER TABLE glucose_entries_unpartitioned RENAME CONSTRAINT glucose_entries_pkey TO glucose_entries_unpartitioned_pkey')
+    op.drop_index('ix_glucose_entries_user_id_timestamp', table_name='glucose_entries_unpartitioned')
+    op.drop_index('ix_glucose_entries_id', table_name='glucose_entries_unpartitioned')
+
+    # 2. Table partitionnée par mois de timestamp (la clé de partition entre dans la clé primaire)
+    op.execute(f"""
+        CREATE TABLE glucose_entries (
+            id integer NOT NULL DEFAULT nextval('{sequence}'),
+            user_id integer REFERENCES users(id),
+            value double precision,
+            "timestamp" timestamp without time zone NOT NULL,
+            note varchar,
+            PRIMARY KEY (id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    op.create_index('ix_glucose_entries_id', 'glucose_entries', ['id'], unique=False)
+    op.create_index('ix_glucose_entries_user_id_timestamp', 'glucose_entries', ['user_id', 'timestamp'], unique=False)
+    op.execute('CREATE TABLE glucose_entries_default PARTITION OF glucose_entries DEFAULT')
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+
+    # 3. Une partition par mois depuis la plus ancienne mesure, puis copie (routage automatique)
+    op.execute("""
+        SELECT glucose_entries_ensure_partitions(
+            3, (SELECT min("timestamp")::date FROM glucose_entries_unpartitioned)
+        )
+    """)
+    op.execute(f'INSERT INTO glucose_entries ({COLUMNS}) SELECT {COLUMNS} FROM glucose_entries_unpartitioned')
+
+    # 4. La séquence des ids change de propriétaire avant la suppression de l'ancienne table
+    op.execute(f'ALTER SEQUENCE {sequence} OWNED BY glucose_entries.id')
+    op.execute('DROP TABLE glucose_entries_unpartitioned')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('glucose_entries', 'id')")).scalar()
+
+    # Les partitions détachées (archives) ne sont pas réintégrées
+    op.execute('ALTER TABLE glucose_entries RENAME TO glucose_entries_partitioned')
+    op.drop_index('ix_glucose_entries_user_id_timestamp', table_name='glucose_entries_partitioned')
+    op.drop_index('ix_glucose_entries_id', table_name='glucose_entries_partitioned')
+    op.execute('ALTER TABLE glucose_entries_partitioned RENAME CONSTRAINT glucose_entries_pkey TO glucose_entries_partitioned_pkey')
+
+    op.execute(f"""
+        CREATE TABLE glucose_entries (
+            id integer NOT NULL DEFAULT nextval('{sequence}'),
+            user_id integer REFERENCES users(id),
+            value double precision,
+            "timestamp" timestamp without time zone,
+            note varchar,
+            CONSTRAINT glucose_entries_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute(f'INSERT INTO glucose_entries ({COLUMNS}) SELECT {COLUMNS} FROM glucose_entries_partitioned')
+    op.execute(f'ALTER SEQUENCE {sequence} OWNED BY glucose_entries.id')
+    op.execute('DROP TABLE glucose_entries_partitioned CASCADE')
+    op.execute('DROP FUNCTION IF EXISTS glucose_entries_ensure_partitions(integer, date)')
+
+    op.create_index('ix_glucose_entries_id', 'glucose_entries', ['id'], unique=False)
+    op.create_index('ix_glucose_entries_user_id_timestamp', 'glucose_entries', ['user_id', 'timestamp'], unique=False)
@@ -0,0 +1,28 @@
+"""glucose entries data quality flags
+
+Revision ID: glucose_quality_v1
+Revises: glucose_cold_tier_v1
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_quality_v1'
+down_revision: Union[str, None] = 'glucose_cold_tier_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Défaut constant : pas de réécriture de la table sous PostgreSQL 11+.
+    # Les mesures existantes sont considérées valides (elles figurent déjà dans les agrégats).
+    op.add_column('glucose_entries', sa.Column('quality', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('glucose_entries', 'quality')
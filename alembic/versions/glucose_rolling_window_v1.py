@@ -0,0 +1,32 @@
+"""glucose summaries rolling 90-day window totals
+
+Revision ID: glucose_rolling_window_v1
+Revises: glucose_kinetic_v1
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_rolling_window_v1'
+down_revision: Union[str, None] = 'glucose_kinetic_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # window_start NULL : la fenêtre est recalculée depuis les agrégats journaliers à la prochaine
+    # ingestion (ou par scripts/backfill_rollups.py)
+    op.add_column('glucose_user_summaries', sa.Column('window_start', sa.DateTime(), nullable=True))
+    op.add_column('glucose_user_summaries', sa.Column('window_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('glucose_user_summaries', sa.Column('window_sum', sa.Float(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('glucose_user_summaries', 'window_sum')
+    op.drop_column('glucose_user_summaries', 'window_count')
+    op.drop_column('glucose_user_summaries', 'window_start')
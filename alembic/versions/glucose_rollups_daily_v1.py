@@ -0,0 +1,28 @@
+"""drop unread 5-minute and hourly glucose rollups
+
+Revision ID: glucose_rollups_daily_v1
+Revises: glucose_alert_states_v1
+Create Date: 2026-10-19 03:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_rollups_daily_v1'
+down_revision: Union[str, None] = 'glucose_alert_states_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Seul l'agrégat journalier est lu : les buckets 5 min / 1 h ne sont plus maintenus
+    op.execute("DELETE FROM glucose_rollups WHERE resolution <> '1d'")
+
+
+def downgrade() -> None:
+    # Données non restaurées : les anciennes versions relisent 5m / 1h après
+    # `python scripts/backfill_rollups.py`
+    pass
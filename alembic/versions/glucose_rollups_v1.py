@@ -0,0 +1,46 @@
+"""glucose rollups v1
+
+Revision ID: glucose_rollups_v1
+Revises: glucose_user_ts_idx
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_rollups_v1'
+down_revision: Union[str, None] = 'glucose_user_ts_idx'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Agrégats 5 min / 1 h / 1 jour (à remplir ensuite avec scripts/backfill_rollups.py)
+    op.create_table(
+        'glucose_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('resolution', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('value_count', sa.Integer(), nullable=True),
+        sa.Column('value_sum', sa.Float(), nullable=True),
+        sa.Column('value_sum_sq', sa.Float(), nullable=True),
+        sa.Column('value_min', sa.Float(), nullable=True),
+        sa.Column('value_max', sa.Float(), nullable=True),
+        sa.Column('low_count', sa.Integer(), nullable=True),
+        sa.Column('normal_count', sa.Integer(), nullable=True),
+        sa.Column('high_count', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'resolution', 'bucket_start', name='uq_glucose_rollups_bucket')
+    )
+    op.create_index(op.f('ix_glucose_rollups_id'), 'glucose_rollups', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_glucose_rollups_id'), table_name='glucose_rollups')
+    op.drop_table('glucose_rollups')
@@ -0,0 +1,36 @@
+"""glucose user summaries v1
+
+Revision ID: glucose_summaries_v1
+Revises: user_watermarks_v1
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_summaries_v1'
+down_revision: Union[str, None] = 'user_watermarks_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Compteurs par utilisateur (remplis par scripts/backfill_rollups.py pour l'existant)
+    op.create_table(
+        'glucose_user_summaries',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('reading_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('value_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('first_timestamp', sa.DateTime(), nullable=True),
+        sa.Column('last_timestamp', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('glucose_user_summaries')
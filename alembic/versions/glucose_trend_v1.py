@@ -0,0 +1,30 @@
+"""glucose entries rate of change and trend
+
+Revision ID: glucose_trend_v1
+Revises: glucose_events_v1
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_trend_v1'
+down_revision: Union[str, None] = 'glucose_events_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Colonnes nullables : pas de réécriture de la table (ni des partitions sous PostgreSQL).
+    # Les mesures existantes restent sans tendance, seules les nouvelles mesures sont renseignées.
+    op.add_column('glucose_entries', sa.Column('rate_of_change', sa.Float(), nullable=True))
+    op.add_column('glucose_entries', sa.Column('trend', sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('glucose_entries', 'trend')
+    op.drop_column('glucose_entries', 'rate_of_change')
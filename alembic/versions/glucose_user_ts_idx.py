@@ -0,0 +1,32 @@
+"""glucose entries user/timestamp index
+
+Revision ID: glucose_user_ts_idx
+Revises: chat_mem_v1
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'glucose_user_ts_idx'
+down_revision: Union[str, None] = 'chat_mem_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Index composite (user_id, timestamp) : évite le scan complet de glucose_entries
+    # pour l'historique, le TIR, l'HbA1c et le contexte du coach.
+    op.create_index(
+        'ix_glucose_entries_user_id_timestamp',
+        'glucose_entries',
+        ['user_id', 'timestamp'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_glucose_entries_user_id_timestamp', table_name='glucose_entries')
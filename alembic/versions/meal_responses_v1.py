@@ -0,0 +1,57 @@
+"""post-meal glucose responses and per-food aggregates
+
+Revision ID: meal_responses_v1
+Revises: glucose_quality_v1
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'meal_responses_v1'
+down_revision: Union[str, None] = 'glucose_quality_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Remplies par scripts/backfill_meal_responses.py pour les repas existants
+    op.create_table(
+        'meal_glucose_responses',
+        sa.Column('meal_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('food_key', sa.String(length=120), nullable=False),
+        sa.Column('baseline', sa.Float(), nullable=True),
+        sa.Column('peak', sa.Float(), nullable=True),
+        sa.Column('peak_delta', sa.Float(), nullable=True),
+        sa.Column('time_to_peak_minutes', sa.Float(), nullable=True),
+        sa.Column('iauc', sa.Float(), nullable=True),
+        sa.Column('reading_count', sa.Integer(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['meal_id'], ['meals.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('meal_id')
+    )
+    op.create_index('ix_meal_glucose_responses_user_id', 'meal_glucose_responses', ['user_id'], unique=False)
+    op.create_table(
+        'food_glucose_responses',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('food_key', sa.String(length=120), nullable=False),
+        sa.Column('meal_count', sa.Integer(), nullable=False),
+        sa.Column('peak_delta_sum', sa.Float(), nullable=False),
+        sa.Column('peak_delta_sum_sq', sa.Float(), nullable=False),
+        sa.Column('time_to_peak_sum', sa.Float(), nullable=False),
+        sa.Column('iauc_sum', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'food_key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('food_glucose_responses')
+    op.drop_index('ix_meal_glucose_responses_user_id', table_name='meal_glucose_responses')
+    op.drop_table('meal_glucose_responses')
@@ -0,0 +1,34 @@
+"""user data watermarks v1
+
+Revision ID: user_watermarks_v1
+Revises: glucose_partitions_v1
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'user_watermarks_v1'
+down_revision: Union[str, None] = 'glucose_partitions_v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Version des données par utilisateur (ETag / If-None-Match)
+    op.create_table(
+        'user_data_watermarks',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_ingest_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_data_watermarks')
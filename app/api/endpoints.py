@@ -1,23 +1,99 @@
-from fastapi import APIRouter, Depends, Request, HTTPException, UploadFile, File, Form # Corrected import
+from fastapi import APIRouter, Depends, Request, Response, HTTPException, UploadFile, File, Form, Query, Header # Corrected import
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from opik import track
 from app.models import schemas, models
 from app.models.database import get_db
+from app.models.records import dump_rows
 from app.services.ai_service import ai_service
 from app.services.nightscout_service import nightscout_service
 from app.services.medtrum_service import medtrum_service # Added import
 from app.services.vision_service import vision_service # Import vision_service
+from app.services.ingest_service import ingest_service
+from app.services.stats_service import stats_service
+from app.services.chunk_service import chunk_service
+from app.services.retention_service import retention_service
+from app.services import export_service, glucose_reader
+from app.services.watermark_service import watermark_service, etag_matches
+from app.services.summary_service import summary_service, ROLLING_DAYS
+from app.services.event_service import event_service
+from app.services.trend_service import trend_service
+from app.services.forecast_service import forecast_service
+from app.services.kinetic_service import kinetic_service
+from app.services.comparison_service import comparison_service, window_bounds as comparison_window_bounds
+from app.services.cold_tier_service import cold_tier_service, month_start
+from app.services.meal_response_service import meal_response_service, status as meal_response_status
+from app.services.rollup_service import bucket_start, to_utc_naive
 from app.api.auth import get_current_user
 from app.core.logger import request_id_context
 from app.core.stability_engine import analyze_stability
+from app.core.metrics import compute_cgm_metrics, ambulatory_glucose_profile
+from app.core.downsampling import lttb
 from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
 from datetime import datetime, timedelta
 from sqlalchemy import func
+from typing import Optional, Annotated
 import uuid
 import base64 # Import base64
 
 router = APIRouter()
 
+def _rolling_avg_90d(db: Session, user_id: int, snapshot: schemas.UserHealthSnapshot) -> float:
+    """
+    rolling_avg_90d de analyze_stability : fenêtre glissante 90 jours de summary_service
+    (totaux maintenus à l'ingestion, jours sortis retranchés à la lecture),
+    à défaut glycémie à jeun du snapshot.
+    """
+    window = summary_service.rolling_window(db, user_id)
+    if window["count"]:
+        return window["sum"] / window["count"]
+    return float(snapshot.lab_data.fasting_glucose)
+
+def _current_glucose_context(db: Session, user_id: int) -> str:
+    """
+    Ligne de contexte coach : dernière mesure et tendance calculée à l'ingestion (sans requête d'historique).
+    """
+    current = trend_service.current(db, user_id)
+    if current is None:
+        return ""
+    value, trend = current
+    return f"\n🩸 GLYCÉMIE ACTUELLE: {round(value)} mg/dL, tendance {trend}\n"
+
+def _kinetic_hba1c_context(db: Session, user_id: int) -> str:
+    """
+    Ligne de contexte coach : HbA1c cinétique estimée (état maintenu à l'ingestion), en complément
+    de l'analyse de stabilité qui reste fondée sur la moyenne 90 jours.
+    """
+    estimate = kinetic_service.estimate(db, user_id)
+    if estimate is None:
+        return ""
+    return (f"🧪 HBA1C CINÉTIQUE ESTIMÉE: {estimate['estimated_hba1c']:.1f} % "
+            f"(glycémie pondérée {round(estimate['kinetic_mean_glucose'])} mg/dL, {estimate['days']} jours)\n")
+
+def _not_modified(db: Session, user_id: int, response: Response, if_none_match: Optional[str], *parts) -> Optional[Response]:
+    """
+    ETag dérivé du watermark de données de l'utilisateur (une lecture par clé primaire).
+    Retourne une réponse 304 si le client a déjà cette version, sinon pose l'en-tête ETag.
+    """
+    etag = watermark_service.etag(db, user_id, *parts)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+def _rows_response(response: Response, rows: list) -> Response:
+    """
+    Mesures lues en base (GlucoseRow) sérialisées directement, sans la revalidation
+    Pydantic de response_model (conservé pour la documentation OpenAPI).
+    Reprend les en-têtes posés sur `response` (ETag, curseurs).
+    """
+    raw = Response(content=dump_rows(rows), media_type="application/json")
+    for key, value in response.headers.items():
+        if key != "content-length":
+            raw.headers[key] = value
+    return raw
+
 @router.post("/medtrum/connect")
 @track(name="api_medtrum_connect")
 def connect_medtrum(
@@ -80,15 +156,8 @@ async def get_coach_advice(
     """
     snapshot = chat_request.snapshot
 
-    # 1. Calcul de la moyenne glissante (90j) depuis la base de données (T-M001)
-    ninety_days_ago = datetime.utcnow() - timedelta(days=90)
-    avg_result = db.query(func.avg(models.GlucoseEntry.value)).filter(
-        models.GlucoseEntry.user_id == current_user.id,
-        models.GlucoseEntry.timestamp >= ninety_days_ago
-    ).scalar()
-    
-    # Si pas de données, on utilise la glycémie à jeun du snapshot comme estimation
-    rolling_avg = float(avg_result) if avg_result else float(snapshot.lab_data.fasting_glucose)
+    # 1. Calcul de la moyenne glissante (90j) via la couche stats (T-M001)
+    rolling_avg = _rolling_avg_90d(db, current_user.id, snapshot)
 
     # 2. Analyse Complète de Stabilité (Ajustement HbA1c + Gap Analysis)
     user_results = analyze_stability(snapshot.lab_data, snapshot.lifestyle, rolling_avg)
@@ -118,7 +187,9 @@ async def get_coach_advice(
     # ---------------------------------------------------
 
     # Generate holistic context string
-    health_ctx_str = ai_service.format_health_context(snapshot)
+    health_ctx_str = ai_service.format_health_context(snapshot) + _current_glucose_context(db, current_user.id)
+    health_ctx_str += _kinetic_hba1c_context(db, current_user.id)
+    health_ctx_str += meal_response_service.format_context(meal_response_service.foods(db, current_user.id, min_meals=2))
     
     # Décoder l`image si présente (Base64 -> Bytes)
     image_bytes = None
@@ -206,86 +277,204 @@ def log_meal(
         **meal.model_dump()
     )
     db.add(db_meal)
+    db.flush()
+    # Repas saisi a posteriori : fenêtre déjà close, réponse calculée tout de suite
+    meal_response_service.compute_meal(db, db_meal)
     db.commit()
     db.refresh(db_meal)
     return db_meal
 
+@router.get("/meals/foods")
+@track(name="api_get_meal_foods")
+def get_meal_foods(
+    min_meals: int = Query(1, ge=1, le=100),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Index par aliment des réponses post-prandiales : pic moyen (et SD), délai moyen du pic,
+    iAUC moyenne. Classé du plus fort au plus faible pic moyen.
+    """
+    return {"foods": meal_response_service.foods(db, current_user.id, min_meals, limit)}
+
+@router.get("/meals/{meal_id}/response")
+@track(name="api_get_meal_response")
+def get_meal_response(
+    meal_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Réponse glycémique sur les 2 h suivant un repas : baseline (30 min avant), pic, délai du pic, iAUC.
+    `status` : complete, insufficient_data (moins de 12 mesures ou pas de baseline), pending (fenêtre non close).
+    """
+    meal = db.query(models.Meal).filter(models.Meal.id == meal_id, models.Meal.user_id == current_user.id).first()
+    if meal is None:
+        raise HTTPException(status_code=404, detail="Repas introuvable")
+    computed = meal.glucose_response is None
+    row = meal_response_service.compute_meal(db, meal)
+    if computed and row is not None:
+        db.commit()
+    return {
+        "meal_id": meal.id,
+        "status": meal_response_status(row),
+        "response": schemas.MealGlucoseResponse.model_validate(row) if row is not None else None,
+    }
+
 @router.get("/history", response_model=list[schemas.GlucoseEntry])
 @track(name="api_read_history")
 def read_history(
-    skip: int = 0, 
-    limit: int = 10, 
+    response: Response,
+    limit: int = Query(10, ge=1, le=1000),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Historique glycémique paginé par curseur (keyset), du plus récent au plus ancien.
+    - `before` : curseur `X-Next-Cursor` d'une page précédente -> mesures plus anciennes.
+    - `after` : curseur `X-Prev-Cursor` -> mesures plus récentes (rafraîchissement).
+    Chaque page coûte une descente d'index (user_id, timestamp), quelle que soit sa profondeur.
+    Lecture Core et sérialisation directe : ni objets ORM ni revalidation Pydantic par ligne.
+    ETag lié au watermark de données : 304 si rien n'a changé depuis la dernière lecture.
+    """
+    if before and after:
+        raise HTTPException(status_code=400, detail="Utiliser 'before' ou 'after', pas les deux")
+
+    not_modified = _not_modified(db, current_user.id, response, if_none_match, "history", limit, before, after)
+    if not_modified:
+        return not_modified
+
+    before_key = after_key = None
+    try:
+        if before:
+            before_key = decode_cursor(before)
+        elif after:
+            after_key = decode_cursor(after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    entries = glucose_reader.history_rows(db, current_user.id, limit, before=before_key, after=after_key)
+
+    # Journées compactées (stockage optionnel) puis agrégats de rétention :
+    # fusion transparente avec les mesures brutes
+    for tier in (chunk_service, retention_service):
+        bound = None
+        if len(entries) == limit:
+            # Page déjà pleine : seules les données qui la chevauchent peuvent s'y intercaler
+            bound = entries[0].timestamp if after else entries[-1].timestamp
+        packed = tier.history_page(
+            db, current_user.id, limit, before=before_key, after=after_key, bound=bound
+        )
+        if packed:
+            entries = sorted(entries + packed, key=lambda e: (e.timestamp, e.id), reverse=True)
+            entries = entries[-limit:] if after else entries[:limit]
+
+    if entries:
+        response.headers["X-Prev-Cursor"] = encode_cursor(entries[0].timestamp, entries[0].id)
+        response.headers["X-Next-Cursor"] = encode_cursor(entries[-1].timestamp, entries[-1].id)
+    return _rows_response(response, entries)
+
+@router.get("/export/glucose")
+@track(name="api_export_glucose")
+def export_glucose(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    entries = db.query(models.GlucoseEntry).filter(
-        models.GlucoseEntry.user_id == current_user.id
-    ).order_by(models.GlucoseEntry.timestamp.desc()).offset(skip).limit(limit).all()
-    return entries
+    """
+    Export complet des mesures de [from, to) en CSV, NDJSON ou Parquet.
+    Réponse en flux : lecture par curseur serveur (yield_per) et écriture par blocs,
+    mémoire constante quelle que soit la plage exportée.
+    """
+    if from_ and to and from_ >= to:
+        raise HTTPException(status_code=400, detail="'from' doit précéder 'to'")
+    try:
+        content = export_service.stream_export(db, current_user.id, format, from_, to)
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Export Parquet indisponible (pyarrow non installé)")
+
+    filename = f"diaside_glucose_{datetime.utcnow():%Y%m%d}.{format}"
+    return StreamingResponse(
+        content,
+        media_type=export_service.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.get("/stats/tir")
 @track(name="api_get_tir")
 def get_tir_stats(
+    response: Response,
     days: int = 1,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Calculates Time In Range (TIR) stats.
     Target: 70-180 mg/dL
+    Une seule requête d'agrégat (SUM(CASE ...) + agrégats journaliers), aucune ligne chargée.
+    ETag : watermark de données + fenêtre glissante arrondie à 5 minutes.
     """
+    not_modified = _not_modified(
+        db, current_user.id, response, if_none_match, "tir", days, bucket_start(datetime.utcnow(), "5m")
+    )
+    if not_modified:
+        return not_modified
+
     start_date = datetime.utcnow() - timedelta(days=days)
-    entries = db.query(models.GlucoseEntry).filter(
-        models.GlucoseEntry.user_id == current_user.id,
-        models.GlucoseEntry.timestamp >= start_date
-    ).all()
+    summary = stats_service.window_stats(db, current_user.id, start_date)
     
-    if not entries:
+    total = summary["count"]
+    if not total:
         return {"low": 0, "normal": 0, "high": 0, "count": 0}
         
-    low = 0
-    normal = 0
-    high = 0
-    
-    for e in entries:
-        if e.value < 70:
-            low += 1
-        elif e.value > 180:
-            high += 1
-        else:
-            normal += 1
-            
-    total = len(entries)
     return {
-        "low": round((low / total) * 100, 1),
-        "normal": round((normal / total) * 100, 1),
-        "high": round((high / total) * 100, 1),
+        "low": round((summary["low"] / total) * 100, 1),
+        "normal": round((summary["normal"] / total) * 100, 1),
+        "high": round((summary["high"] / total) * 100, 1),
         "count": total,
-        "avg": round(sum(e.value for e in entries) / total, 0)
+        "avg": round(summary["sum"] / total, 0)
     }
 
 @router.get("/stats/hba1c")
 @track(name="api_get_hba1c")
 def get_hba1c_stats(
+    response: Response,
     days: int = 90,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Calcule l`HbA1c estimée sur X jours directement en base.
-    Optimisé pour les gros volumes de données.
+    Optimisé pour les gros volumes de données : lit au plus ~X agrégats journaliers ;
+    à 90 jours, totaux glissants de l'utilisateur (aucun agrégat lu si la fenêtre est à jour).
+    ETag : watermark de données (offset du profil compris) + fenêtre arrondie à 5 minutes.
     """
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    avg_glucose = db.query(func.avg(models.GlucoseEntry.value)).filter(
-        models.GlucoseEntry.user_id == current_user.id,
-        models.GlucoseEntry.timestamp >= start_date
-    ).scalar()
+    not_modified = _not_modified(
+        db, current_user.id, response, if_none_match, "hba1c", days, bucket_start(datetime.utcnow(), "5m")
+    )
+    if not_modified:
+        return not_modified
+
+    if days == ROLLING_DAYS:
+        # Fenêtre par défaut : totaux glissants maintenus à l'ingestion (jours UTC)
+        summary = summary_service.rolling_window(db, current_user.id)
+        start_date = summary["start"]
+    else:
+        start_date = datetime.utcnow() - timedelta(days=days)
+        summary = stats_service.window_stats(db, current_user.id, start_date)
     
-    if not avg_glucose:
-        return {"estimated_hba1c": None, "avg_glucose": None, "points": 0}
+    if not summary["count"]:
+        return {"estimated_hba1c": None, "avg_glucose": None, "points": 0, "coverage": 0.0}
         
-    avg_val = float(avg_glucose)
+    avg_val = summary["sum"] / summary["count"]
     estimated_hba1c = (avg_val + 46.7) / 28.7
     
     # Récupérer l`offset utilisateur
@@ -296,9 +485,239 @@ def get_hba1c_stats(
         "raw_hba1c": estimated_hba1c,
         "offset": offset,
         "avg_glucose": avg_val,
-        "points": 90000 # Juste pour info, on pourrait faire un count() mais c`est lourd
+        "points": summary["count"],
+        "coverage": summary_service.coverage(db, current_user.id, start_date, summary["count"])
+    }
+
+@router.get("/stats/compare")
+@track(name="api_get_stats_compare")
+def get_stats_compare(
+    response: Response,
+    window: str = Query("7d", pattern="^(1d|7d|30d)$"),
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Période courante vs précédente (jours UTC, journée en cours incluse) :
+    TIR/TBR/TAR, moyenne, CV et nombre d'épisodes, avec les deltas.
+    Une passe sur les agrégats journaliers. ETag : watermark de données + jour courant.
+    """
+    not_modified = _not_modified(
+        db, current_user.id, response, if_none_match, "compare", window, bucket_start(datetime.utcnow(), "1d")
+    )
+    if not_modified:
+        return not_modified
+    return comparison_service.compare(db, current_user.id, window)
+
+@router.get("/stats/long-range")
+@track(name="api_get_stats_long_range")
+def get_stats_long_range(
+    response: Response,
+    months: int = Query(12, ge=1, le=60),
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Tendance mensuelle sur `months` mois (mois courant inclus) : moyenne, SD, CV, TIR/TBR/TAR, GMI.
+    Mois archivés lus par DuckDB sur le tier froid Parquet, autres mois depuis les agrégats journaliers.
+    """
+    now = datetime.utcnow()
+    not_modified = _not_modified(
+        db, current_user.id, response, if_none_match, "long-range", months, bucket_start(now, "1d")
+    )
+    if not_modified:
+        return not_modified
+    start = month_start(now)
+    for _ in range(months - 1):
+        start = month_start(start - timedelta(days=1))
+    return {"months": cold_tier_service.monthly_stats(db, current_user.id, start, now)}
+
+@router.get("/stats/hba1c/kinetic")
+@track(name="api_get_kinetic_hba1c")
+def get_kinetic_hba1c(
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    HbA1c estimée par le modèle cinétique : moyennes journalières pondérées par la glycation
+    (demi-vie 30 jours) jusqu'au dernier jour clos. Lecture d'une ligne d'état, aucun agrégat.
+    """
+    estimate = kinetic_service.estimate(db, current_user.id)
+    if estimate is None:
+        return {"estimated_hba1c": None, "kinetic_mean_glucose": None, "days": 0}
+    offset = current_user.questionnaire.hba1c_offset if current_user.questionnaire else 0.0
+    return {
+        **estimate,
+        "raw_hba1c": estimate["estimated_hba1c"],
+        "estimated_hba1c": estimate["estimated_hba1c"] + (offset or 0.0),
+        "offset": offset,
     }
 
+@router.post("/stats/hba1c/kinetic/rebuild")
+@track(name="api_rebuild_kinetic_hba1c")
+def rebuild_kinetic_hba1c(
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Recalcule l'état cinétique sur tout l'historique (repli vectorisé des agrégats journaliers),
+    p. ex. après un import de mesures anciennes. Équivalent de scripts/backfill_kinetic_hba1c.py.
+    """
+    days = kinetic_service.rebuild_user(db, current_user.id)
+    watermark_service.bump(db, current_user.id)
+    db.commit()
+    return {"days": days, **(kinetic_service.estimate(db, current_user.id) or {})}
+
+@router.get("/stats/cgm-metrics")
+@track(name="api_get_cgm_metrics")
+def get_cgm_metrics(
+    days: int = Query(14, ge=1, le=90),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Métriques CGM du consensus international sur X jours :
+    TIR/TBR/TAR, moyenne, SD, CV, GMI, MAGE, LBGI/HBGI et couverture capteur.
+    La fenêtre est chargée une fois en tableaux NumPy puis calculée de façon vectorisée.
+    """
+    start_date = datetime.utcnow() - timedelta(days=days)
+    _, values = stats_service.load_series(db, current_user.id, start_date)
+    return {"days": days, **compute_cgm_metrics(values, days=days)}
+
+@router.get("/stats/agp")
+@track(name="api_get_agp")
+def get_agp(
+    days: int = Query(14, ge=14, le=90),
+    tz_offset_minutes: int = Query(0, ge=-720, le=840),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Ambulatory Glucose Profile (AGP) : percentiles 5/25/50/75/95 par tranche de 15 minutes
+    de la journée, sur 14 à 90 jours. `tz_offset_minutes` : décalage de l'heure locale vs UTC.
+    """
+    start_date = datetime.utcnow() - timedelta(days=days)
+    timestamps, values = stats_service.load_series(db, current_user.id, start_date)
+    return {
+        "days": days,
+        "count": int(values.size),
+        **ambulatory_glucose_profile(timestamps, values, tz_offset_minutes=tz_offset_minutes)
+    }
+
+@router.get("/glucose/series")
+@track(name="api_get_glucose_series")
+def get_glucose_series(
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    max_points: int = Query(500, ge=3, le=5000),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Série glycémique pour les graphiques, réduite par LTTB à au plus `max_points` points
+    (pics et creux conservés). Par défaut : les 7 derniers jours.
+    """
+    to = to or datetime.utcnow()
+    from_ = from_ or to - timedelta(days=7)
+    if from_ >= to:
+        raise HTTPException(status_code=400, detail="'from' doit précéder 'to'")
+
+    timestamps, values = stats_service.load_series(db, current_user.id, from_, to)
+    x, y = lttb(timestamps, values, max_points)
+    return {
+        "from": from_,
+        "to": to,
+        "raw_points": int(values.size),
+        "points": [
+            {"timestamp": datetime.utcfromtimestamp(int(t)), "value": round(float(v), 1)}
+            for t, v in zip(x, y)
+        ]
+    }
+
+@router.get("/glucose/forecast")
+@track(name="api_get_glucose_forecast")
+def get_glucose_forecast(
+    horizon: int = Query(60, ge=5, le=60, multiple_of=5),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Prévision glycémique par pas de 5 minutes jusqu'à `horizon` minutes (30 ou 60 usuellement),
+    depuis le modèle autorégressif ajusté à l'ingestion (aucune lecture d'historique).
+    Indisponible si la dernière mesure date de plus de 30 minutes.
+    """
+    result = forecast_service.forecast(db, current_user.id, horizon)
+    if result is None:
+        return {"available": False, "horizon_minutes": horizon, "points": []}
+    return {"available": True, "horizon_minutes": horizon, **result}
+
+@router.get("/events")
+@track(name="api_get_events")
+def get_glucose_events(
+    kind: Optional[str] = Query(None, pattern="^(low|high)$"),
+    days: int = Query(14, ge=1, le=365),
+    nocturnal: bool = False,
+    tz_offset_minutes: int = Query(0, ge=-720, le=840),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Épisodes d'hypo / hyperglycémie détectés à l'ingestion (seuils du profil).
+    Ex. hypos nocturnes des 14 derniers jours : ?kind=low&nocturnal=true&days=14.
+    """
+    start_date = datetime.utcnow() - timedelta(days=days)
+    events = event_service.list_events(
+        db, current_user.id, start_date, kind=kind, nocturnal=nocturnal, tz_offset_minutes=tz_offset_minutes
+    )
+    return {"days": days, "summary": event_service.summarize(events), "events": events}
+
+@router.get("/alerts/rules", response_model=list[schemas.AlertRule])
+@track(name="api_get_alert_rules")
+def get_alert_rules(
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Règles d'alerte configurées (liste vide : règles par défaut < 70 et > 300 mg/dL actives).
+    """
+    return db.query(models.AlertRule).filter(
+        models.AlertRule.user_id == current_user.id
+    ).order_by(models.AlertRule.id).all()
+
+@router.put("/alerts/rules", response_model=list[schemas.AlertRule])
+@track(name="api_put_alert_rules")
+def replace_alert_rules(
+    rules: list[schemas.AlertRuleBase],
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Remplace l'ensemble des règles d'alerte de l'utilisateur (liste vide : retour aux règles par défaut).
+    """
+    db.query(models.AlertRule).filter(models.AlertRule.user_id == current_user.id).delete(synchronize_session=False)
+    db_rules = [models.AlertRule(user_id=current_user.id, **rule.model_dump()) for rule in rules]
+    db.add_all(db_rules)
+    db.commit()
+    return db_rules
+
+@router.get("/alerts", response_model=list[schemas.GlucoseAlert])
+@track(name="api_get_alerts")
+def get_alerts(
+    days: int = Query(7, ge=1, le=90),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Alertes déclenchées sur les X derniers jours, de la plus récente à la plus ancienne.
+    """
+    start_date = datetime.utcnow() - timedelta(days=days)
+    return db.query(models.GlucoseAlert).filter(
+        models.GlucoseAlert.user_id == current_user.id,
+        models.GlucoseAlert.timestamp >= start_date
+    ).order_by(models.GlucoseAlert.timestamp.desc()).all()
+
 @router.post("/health/snapshot", response_model=schemas.HealthSnapshotResponse)
 @track(name="api_health_snapshot")
 def validate_health_snapshot(
@@ -328,6 +747,7 @@ def receive_cgm_ping(
     Ticket T-API001: Réception des pings CGM.
     Enregistre une nouvelle mesure de glucose provenant d`un capteur.
     Met à jour le questionnaire si fourni (T-SEC001).
+    Vitesse de variation et flèche de tendance sont calculées à l'ingestion (`ping.trend` ignoré).
     """
     # Mise à jour du Questionnaire (T-SEC001)
     if ping.questionnaire:
@@ -352,11 +772,49 @@ def receive_cgm_ping(
         timestamp=ping.timestamp or datetime.utcnow(),
         note=f"CGM Upload ({ping.device_id})"
     )
-    db.add(db_entry)
+    ingest_service.add_entries(db, current_user.id, [db_entry])
     db.commit()
     db.refresh(db_entry)
     return db_entry
 
+@router.post("/cgm/batch", response_model=schemas.CGMBatchResult)
+@track(name="api_receive_cgm_batch")
+def receive_cgm_batch(
+    batch: schemas.CGMBatch,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Réception groupée de mesures CGM (rattrapage après une perte de réseau du téléphone).
+    Dédoublonnage du lot en une requête (mesures déjà stockées, compactées ou archivées, et
+    doublons internes au lot), puis un seul INSERT multi-lignes et un seul commit pour tout le lot.
+    Statut par mesure, dans l'ordre d'envoi : accepted (avec son id) ou duplicate.
+    """
+    keys = [to_utc_naive(reading.timestamp) for reading in batch.readings]
+    known = glucose_reader.existing_timestamps(db, current_user.id, min(keys), max(keys))
+    # Avant cette date, les mesures sont déjà comptées dans les agrégats de rétention
+    archived_until = retention_service.archived_until(db, current_user.id)
+
+    entries = {}
+    note = f"CGM Upload ({batch.device_id})"
+    for index, (reading, key) in enumerate(zip(batch.readings, keys)):
+        if key in known or (archived_until is not None and key < archived_until):
+            continue
+        known.add(key)
+        entries[index] = models.GlucoseEntry(user_id=current_user.id, value=reading.value, timestamp=key, note=note)
+
+    # add_all + flush : INSERT ... VALUES multi-lignes avec RETURNING id sur PostgreSQL (insertmanyvalues de SQLAlchemy 2)
+    ingest_service.add_entries(db, current_user.id, list(entries.values()))
+    # Ids lus avant le commit : après, chaque accès rechargerait la mesure (expire_on_commit)
+    ids = {index: entry.id for index, entry in entries.items()}
+    db.commit()
+
+    items = [
+        {"index": index, "timestamp": key, "status": "accepted" if index in ids else "duplicate", "id": ids.get(index)}
+        for index, key in enumerate(keys)
+    ]
+    return {"accepted": len(entries), "duplicates": len(keys) - len(entries), "items": items}
+
 @router.put("/profile", response_model=schemas.Questionnaire)
 @track(name="api_update_profile")
 def update_profile(
@@ -380,7 +838,9 @@ def update_profile(
         # Update fields
         for key, value in profile_data.model_dump(exclude_unset=True).items():
             setattr(db_quest, key, value)
-            
+    
+    # L'offset HbA1c fait partie des réponses mises en cache par ETag
+    watermark_service.bump(db, current_user.id)
     db.commit()
     db.refresh(db_quest)
     return db_quest
@@ -406,19 +866,30 @@ def get_profile(
 @track(name="api_food_recognition")
 async def analyze_food_image(
     image: UploadFile = File(...),
-    current_glucose: float = Form(...),
-    trend: str = Form(...),
+    current_glucose: Optional[float] = Form(None),
+    trend: Optional[str] = Form(None),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db) # db is included for consistency, though not directly used in analyze_meal
+    db: Session = Depends(get_db)
 ):
     """
     Analyzes an image of food to estimate nutritional information (carbs) and provide advice.
+    `current_glucose` / `trend` sont optionnels : à défaut, la dernière mesure (moins de 30 min)
+    et sa tendance calculée à l'ingestion sont utilisées.
     """
     try:
         image_bytes = await image.read()
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error reading image file: {e}")
 
+    if current_glucose is None or trend is None:
+        current = trend_service.current(db, current_user.id)
+        if current is None and current_glucose is None:
+            raise HTTPException(status_code=400, detail="Aucune mesure récente : 'current_glucose' est requis")
+        if current is not None:
+            current_glucose = current_glucose if current_glucose is not None else current[0]
+            trend = trend or current[1]
+        trend = trend or "inconnue"
+
     try:
         # Call the VisionService to analyze the meal
         analysis_result = await vision_service.analyze_meal(
@@ -482,7 +953,7 @@ if settings.ENABLE_SIMULATION_ENDPOINT:
                 )
                 entries.append(entry)
         
-        db.add_all(entries)
+        ingest_service.add_entries(db, current_user.id, entries)
         db.commit()
         
         return {"message": f"Simulation terminée : {len(entries)} points générés.", "avg_target": target_avg_glucose}
@@ -728,24 +1199,49 @@ async def send_chat_message(
     
     # Calcul des stats glycémie temps réel (7 derniers jours)
     seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    glucose_entries = db.query(models.GlucoseEntry).filter(
-        models.GlucoseEntry.user_id == current_user.id,
-        models.GlucoseEntry.timestamp >= seven_days_ago
-    ).all()
+    summary_7d = stats_service.window_stats(db, current_user.id, seven_days_ago)
     
     # Calcul TIR 7 jours
-    if glucose_entries:
-        total = len(glucose_entries)
-        low = sum(1 for e in glucose_entries if e.value < 70)
-        normal = sum(1 for e in glucose_entries if 70 <= e.value <= 180)
-        high = sum(1 for e in glucose_entries if e.value > 180)
+    if summary_7d["count"]:
+        total = summary_7d["count"]
+        low = summary_7d["low"]
+        normal = summary_7d["normal"]
+        high = summary_7d["high"]
         
         # Ajouter au contexte
         glucose_context = f"\n\n📊 STATS GLYCÉMIE (7 derniers jours):\n"
         glucose_context += f"- TIR: {round((normal/total)*100, 1)}% (Cible: >70%)\n"
         glucose_context += f"- Temps bas (<70): {round((low/total)*100, 1)}%\n"
         glucose_context += f"- Temps haut (>180): {round((high/total)*100, 1)}%\n"
-        glucose_context += f"- Moyenne: {round(sum(e.value for e in glucose_entries)/total, 0)} mg/dL\n"
+        glucose_context += f"- Moyenne: {round(summary_7d['sum']/total, 0)} mg/dL\n"
+
+        # Épisodes détectés à l'ingestion (14 jours) : base factuelle pour les patterns.
+        # Une seule lecture, étendue si besoin à la période précédente de la comparaison.
+        fourteen_days_ago = datetime.utcnow() - timedelta(days=14)
+        events_start = fourteen_days_ago
+        if chat_request.compare_window:
+            events_start = min(events_start, comparison_window_bounds(chat_request.compare_window)[0])
+        events = event_service.list_events(db, current_user.id, events_start)
+        episodes = event_service.summarize([e for e in events if e["start_time"] >= fourteen_days_ago])
+        if episodes["low"]["count"]:
+            lows = episodes["low"]
+            glucose_context += (
+                f"- Hypos (14j): {lows['count']} épisodes dont {lows['nocturnal']} nocturnes (00h-06h UTC), "
+                f"durée moyenne {lows['avg_duration_minutes']} min, nadir {round(lows['extreme_value'])} mg/dL\n"
+            )
+        if episodes["high"]["count"]:
+            highs = episodes["high"]
+            glucose_context += (
+                f"- Hypers (14j): {highs['count']} épisodes, durée moyenne {highs['avg_duration_minutes']} min, "
+                f"pic {round(highs['extreme_value'])} mg/dL\n"
+            )
+
+        # Deltas période courante / précédente : appuie les comparaisons "par rapport à hier"
+        if chat_request.compare_window:
+            comparison = comparison_service.compare(
+                db, current_user.id, chat_request.compare_window, events=events
+            )
+            glucose_context += comparison_service.format_context(comparison)
     else:
         glucose_context = "\n\n📊 STATS: Pas de données glycémie récentes."
     
@@ -762,16 +1258,12 @@ async def send_chat_message(
         memory_context += "Aucune préférence enregistrée.\n"
     
     # Contexte complet
-    full_context = glucose_context + memory_context
+    full_context = _current_glucose_context(db, current_user.id) + _kinetic_hba1c_context(db, current_user.id) \
+        + glucose_context + memory_context
     
     # 6. Appeler le coach IA
     snapshot = chat_request.snapshot
-    ninety_days_ago = datetime.utcnow() - timedelta(days=90)
-    avg_result = db.query(func.avg(models.GlucoseEntry.value)).filter(
-        models.GlucoseEntry.user_id == current_user.id,
-        models.GlucoseEntry.timestamp >= ninety_days_ago
-    ).scalar()
-    rolling_avg = float(avg_result) if avg_result else float(snapshot.lab_data.fasting_glucose)
+    rolling_avg = _rolling_avg_90d(db, current_user.id, snapshot)
     
     # Analyse de stabilité
     user_results = analyze_stability(snapshot.lab_data, snapshot.lifestyle, rolling_avg)
@@ -0,0 +1,150 @@
+"""
+Alerts - Moteur de règles d'alerte glycémique, évalué mesure par mesure.
+
+Types de règles :
+- below / above : valeur < / > seuil (mg/dL) ;
+- rate : vitesse de variation (mg/dL/min) <= seuil si seuil négatif (chute), >= sinon (montée) ;
+- missing : aucune mesure depuis `duration_minutes` (évaluée par `check_missing`).
+Pour below / above / rate, `duration_minutes` > 0 exige que la condition tienne sans
+interruption pendant cette durée (règle "soutenue").
+
+Une règle se déclenche une fois à l'entrée dans la condition et se réarme à sa sortie.
+L'état est en mémoire le temps d'une évaluation : une mesure coûte O(nombre de règles),
+sans accès base ni allocation hors alertes émises. Entre deux appels, il est persisté
+(`dump_rules` / `load_rules`, voir alert_service).
+"""
+
+from datetime import datetime, timedelta
+
+KINDS = ("below", "above", "rate", "missing")
+MAX_GAP = timedelta(minutes=30)  # Trou capteur : les conditions soutenues repartent de zéro
+
+
+class RuleState:
+    """
+    Règle compilée et son état (début de la condition en cours, alerte active).
+    """
+    __slots__ = ("rule_id", "kind", "threshold", "duration", "since", "active")
+
+    @property
+    def key(self) -> str:
+        # Règles par défaut (sans id) : identifiées par leur définition
+        if self.rule_id is not None:
+            return str(self.rule_id)
+        return f"{self.kind}:{self.threshold}:{int(self.duration.total_seconds() // 60)}"
+
+    def __init__(self, rule_id, kind: str, threshold, duration_minutes: int = 0):
+        self.rule_id = rule_id
+        self.kind = kind
+        self.threshold = threshold
+        self.duration = timedelta(minutes=duration_minutes or 0)
+        self.since = None
+        self.active = False
+
+    def matches(self, value: float, rate) -> bool:
+        if self.kind == "below":
+            return value < self.threshold
+        if self.kind == "above":
+            return value > self.threshold
+        if self.kind == "rate":
+            if rate is None:
+                return False
+            return rate <= self.threshold if self.threshold < 0 else rate >= self.threshold
+        return False
+
+
+class UserAlertState:
+    __slots__ = ("user_id", "rules", "last_timestamp")
+
+    def __init__(self, user_id: int, rules: list[RuleState]):
+        self.user_id = user_id
+        self.rules = rules
+        self.last_timestamp = None
+
+
+def dump_rules(state: UserAlertState) -> dict:
+    return {
+        rule.key: [rule.since.isoformat() if rule.since else None, rule.active]
+        for rule in state.rules if rule.since is not None or rule.active
+    }
+
+
+def load_rules(state: UserAlertState, data: dict) -> None:
+    """
+    Restaure l'état des règles ; les clés inconnues (règles remplacées) sont ignorées.
+    """
+    for rule in state.rules:
+        since, active = (data or {}).get(rule.key, (None, False))
+        rule.since = datetime.fromisoformat(since) if since else None
+        rule.active = bool(active)
+
+
+def _message(rule: RuleState, value: float, rate, since: datetime, ts: datetime) -> str:
+    if rule.kind == "below":
+        text = f"Glycémie basse : {round(value)} mg/dL (< {round(rule.threshold)})"
+    elif rule.kind == "above":
+        text = f"Glycémie haute : {round(value)} mg/dL (> {round(rule.threshold)})"
+    else:
+        label = "Chute rapide" if rule.threshold < 0 else "Montée rapide"
+        text = f"{label} : {rate:+.1f} mg/dL/min ({round(value)} mg/dL)"
+    if rule.duration:
+        text += f" depuis {round((ts - since).total_seconds() / 60)} min"
+    return text
+
+
+def _alert(state: UserAlertState, rule: RuleState, ts: datetime, value, message: str) -> dict:
+    return {
+        "user_id": state.user_id,
+        "rule_id": rule.rule_id,
+        "kind": rule.kind,
+        "value": value,
+        "timestamp": ts,
+        "message": message,
+    }
+
+
+def evaluate(state: UserAlertState, ts: datetime, value: float, rate=None) -> list[dict]:
+    """
+    Fait avancer l'état avec une nouvelle mesure et retourne les alertes déclenchées.
+    Les mesures antérieures à la dernière évaluée (re-sync tardive) sont ignorées.
+    """
+    last = state.last_timestamp
+    if last is not None and ts <= last:
+        return []
+    gap = last is not None and ts - last > MAX_GAP
+    state.last_timestamp = ts
+
+    fired = []
+    for rule in state.rules:
+        if rule.kind == "missing":
+            rule.active = False  # Données revenues : la règle se réarme
+            continue
+        if gap:
+            rule.since = None
+        if not rule.matches(value, rate):
+            rule.since = None
+            rule.active = False
+            continue
+        if rule.since is None:
+            rule.since = ts
+        if not rule.active and ts - rule.since >= rule.duration:
+            rule.active = True
+            fired.append(_alert(state, rule, ts, value, _message(rule, value, rate, rule.since, ts)))
+    return fired
+
+
+def check_missing(state: UserAlertState, now: datetime) -> list[dict]:
+    """
+    Règles "missing" : alerte si la dernière mesure date de plus de `duration_minutes`.
+    """
+    last = state.last_timestamp
+    fired = []
+    if last is None:
+        return fired
+    for rule in state.rules:
+        if rule.kind != "missing" or rule.active or now - last < rule.duration:
+            continue
+        rule.active = True
+        minutes = round((now - last).total_seconds() / 60)
+        fired.append(_alert(state, rule, now, None, f"Pas de données capteur depuis {minutes} min"))
+    return fired
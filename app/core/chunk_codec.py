@@ -0,0 +1,242 @@
+"""
+Chunk Codec - Encodage compact d'une journée de mesures glycémiques.
+
+Une journée (≈288 mesures) est sérialisée sans perte en un seul blob :
+- timestamps (microsecondes epoch) : valeur initiale, premier delta, puis
+  delta-of-delta en varint zigzag (≈0 pour une cadence régulière de 5 min) ;
+- ids : premier id puis deltas varint zigzag (souvent +1 -> 1 octet) ;
+- valeurs (float64) : XOR avec la valeur précédente (à la Gorilla), encodé
+  en un octet de zéros de poids faible + varint des bits significatifs ;
+- notes : dictionnaire des notes distinctes + runs (index, longueur) ;
+- vitesses de variation (mg/dL/min, arrondies au centième à l'ingestion) et
+  flèches de tendance : même encodage dictionnaire + runs.
+
+Format (version 2) :
+    version | count | timestamps | ids | valeurs | notes | vitesses | tendances
+La version 1 (sans vitesses ni tendances) reste décodable : colonnes à None.
+"""
+
+import struct
+from datetime import datetime, timedelta
+
+VERSION = 2
+_EPOCH = datetime(1970, 1, 1)
+_SAME_VALUE = 64  # Marqueur "XOR nul" (valeur identique à la précédente)
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(n: int) -> int:
+    return n << 1 if n >= 0 else ((-n) << 1) - 1
+
+
+def _unzigzag(n: int) -> int:
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+def _float_bits(value: float) -> int:
+    return struct.unpack("<Q", struct.pack("<d", value))[0]
+
+
+def _bits_float(bits: int) -> float:
+    return struct.unpack("<d", struct.pack("<Q", bits))[0]
+
+
+def to_epoch_micros(ts: datetime) -> int:
+    delta = ts - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_epoch_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def _write_text(out: bytearray, text) -> None:
+    # 0 = None, sinon longueur + 1
+    if text is None:
+        _write_varint(out, 0)
+    else:
+        encoded = text.encode("utf-8")
+        _write_varint(out, len(encoded) + 1)
+        out += encoded
+
+
+def _read_text(data: bytes, pos: int):
+    length, pos = _read_varint(data, pos)
+    if length == 0:
+        return None, pos
+    return data[pos:pos + length - 1].decode("utf-8"), pos + length - 1
+
+
+def _write_rate(out: bytearray, rate) -> None:
+    # 0 = None, 1 = centièmes exacts (zigzag), 2 = float64 brut
+    if rate is None:
+        out.append(0)
+        return
+    cents = round(rate * 100)
+    if cents / 100 == rate:
+        out.append(1)
+        _write_varint(out, _zigzag(cents))
+    else:
+        out.append(2)
+        out += struct.pack("<d", rate)
+
+
+def _read_rate(data: bytes, pos: int):
+    tag = data[pos]
+    pos += 1
+    if tag == 0:
+        return None, pos
+    if tag == 1:
+        cents, pos = _read_varint(data, pos)
+        return _unzigzag(cents) / 100, pos
+    return struct.unpack_from("<d", data, pos)[0], pos + 8
+
+
+def _write_runs(out: bytearray, items: list, write_item) -> None:
+    """
+    Dictionnaire des éléments distincts puis runs (index, longueur).
+    """
+    dictionary = []
+    index = {}
+    runs = []
+    for item in items:
+        if item not in index:
+            index[item] = len(dictionary)
+            dictionary.append(item)
+        idx = index[item]
+        if runs and runs[-1][0] == idx:
+            runs[-1][1] += 1
+        else:
+            runs.append([idx, 1])
+
+    _write_varint(out, len(dictionary))
+    for item in dictionary:
+        write_item(out, item)
+    _write_varint(out, len(runs))
+    for idx, length in runs:
+        _write_varint(out, idx)
+        _write_varint(out, length)
+
+
+def _read_runs(data: bytes, pos: int, read_item) -> tuple[list, int]:
+    size, pos = _read_varint(data, pos)
+    dictionary = []
+    for _ in range(size):
+        item, pos = read_item(data, pos)
+        dictionary.append(item)
+    n_runs, pos = _read_varint(data, pos)
+    items = []
+    for _ in range(n_runs):
+        idx, pos = _read_varint(data, pos)
+        length, pos = _read_varint(data, pos)
+        items.extend([dictionary[idx]] * length)
+    return items, pos
+
+
+def encode_chunk(timestamps: list[int], ids: list[int], values: list[float], notes: list,
+                 rates: list = None, trends: list = None) -> bytes:
+    """
+    Encode une série triée par timestamp. `timestamps` en microsecondes epoch (UTC).
+    `rates` / `trends` absents : colonnes à None.
+    """
+    count = len(timestamps)
+    out = bytearray([VERSION])
+    _write_varint(out, count)
+    if count == 0:
+        return bytes(out)
+
+    # Timestamps : t0, d0, puis delta-of-delta
+    _write_varint(out, timestamps[0])
+    previous_delta = 0
+    for i in range(1, count):
+        delta = timestamps[i] - timestamps[i - 1]
+        _write_varint(out, _zigzag(delta - previous_delta))
+        previous_delta = delta
+
+    # Ids : id0 puis deltas
+    _write_varint(out, ids[0])
+    for i in range(1, count):
+        _write_varint(out, _zigzag(ids[i] - ids[i - 1]))
+
+    # Valeurs : 8 octets bruts puis XOR successifs
+    previous_bits = _float_bits(values[0])
+    out += struct.pack("<Q", previous_bits)
+    for i in range(1, count):
+        bits = _float_bits(values[i])
+        xor = bits ^ previous_bits
+        if xor == 0:
+            out.append(_SAME_VALUE)
+        else:
+            trailing = (xor & -xor).bit_length() - 1
+            out.append(trailing)
+            _write_varint(out, xor >> trailing)
+        previous_bits = bits
+
+    _write_runs(out, notes, _write_text)
+    _write_runs(out, rates if rates is not None else [None] * count, _write_rate)
+    _write_runs(out, trends if trends is not None else [None] * count, _write_text)
+
+    return bytes(out)
+
+
+def decode_chunk(data: bytes) -> tuple[list[int], list[int], list[float], list, list, list]:
+    """
+    Décode un blob : (timestamps µs, ids, valeurs, notes, vitesses, tendances).
+    """
+    version = data[0]
+    if version not in (1, VERSION):
+        raise ValueError(f"Version de chunk inconnue: {version}")
+    count, pos = _read_varint(data, 1)
+    if count == 0:
+        return [], [], [], [], [], []
+
+    timestamps = [0] * count
+    timestamps[0], pos = _read_varint(data, pos)
+    delta = 0
+    for i in range(1, count):
+        dod, pos = _read_varint(data, pos)
+        delta += _unzigzag(dod)
+        timestamps[i] = timestamps[i - 1] + delta
+
+    ids = [0] * count
+    ids[0], pos = _read_varint(data, pos)
+    for i in range(1, count):
+        d, pos = _read_varint(data, pos)
+        ids[i] = ids[i - 1] + _unzigzag(d)
+
+    values = [0.0] * count
+    bits = struct.unpack_from("<Q", data, pos)[0]
+    pos += 8
+    values[0] = _bits_float(bits)
+    for i in range(1, count):
+        trailing = data[pos]
+        pos += 1
+        if trailing != _SAME_VALUE:
+            xor, pos = _read_varint(data, pos)
+            bits ^= xor << trailing
+        values[i] = _bits_float(bits)
+
+    notes, pos = _read_runs(data, pos, _read_text)
+    if version == 1:
+        return timestamps, ids, values, notes, [None] * count, [None] * count
+    rates, pos = _read_runs(data, pos, _read_rate)
+    trends, pos = _read_runs(data, pos, _read_text)
+    return timestamps, ids, values, notes, rates, trends
@@ -24,6 +24,31 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./diaside.db"
 
+    # Hot cache (séries mémoire-mappées des 90 derniers jours par utilisateur)
+    HOT_CACHE_ENABLED: bool = False
+    HOT_CACHE_DIR: str = "./data/hot_cache"
+    HOT_CACHE_DAYS: int = 90
+
+    # Stockage compacté (une ligne glucose_chunks par utilisateur et jour clos)
+    GLUCOSE_CHUNK_STORAGE: bool = False
+    GLUCOSE_CHUNK_AFTER_DAYS: int = 7
+
+    # Rétention : au-delà de N jours, mesures 5 min remplacées par des agrégats 15 min (0 = désactivé)
+    GLUCOSE_RETENTION_DAYS: int = 0
+
+    # Filtre qualité : détection des doublons, sauts impossibles, compressions et trous à l'ingestion
+    # (désactivé : seules les erreurs signalées par la source sont écartées des statistiques)
+    GLUCOSE_QUALITY_FILTER: bool = False
+
+    # Alertes : webhook de notification (vide = notifier local, journalisation seule)
+    ALERT_WEBHOOK_URL: str = ""
+    # Période (s) de la vérification des règles "absence de données" (0 = désactivée)
+    ALERT_MISSING_SWEEP_SECONDS: int = 60
+
+    # Tier froid : mois clos exportés en Parquet (scripts/archive_cold_tier.py), lus par DuckDB
+    COLD_TIER_ENABLED: bool = False
+    COLD_TIER_DIR: str = "./data/cold_tier"
+
     # Simulation
     ENABLE_SIMULATION_ENDPOINT: bool = False
     
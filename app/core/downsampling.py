@@ -0,0 +1,56 @@
+"""
+Downsampling - Réduction de séries pour l'affichage (graphiques mobiles).
+
+Largest-Triangle-Three-Buckets (Steinarsson, 2013) : le premier et le dernier
+point sont conservés, les autres sont répartis en `threshold - 2` buckets ; dans
+chaque bucket on garde le point qui forme le plus grand triangle avec le point
+retenu précédemment et la moyenne du bucket suivant. Pics et creux sont ainsi
+préservés, contrairement à une moyenne ou à un échantillonnage régulier.
+"""
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices des points retenus (triés). `x` doit être croissant.
+    Bornes et moyennes des buckets sont calculées en une passe (np.add.reduceat) ;
+    seule la sélection, qui dépend du point retenu précédemment, reste une boucle
+    sur les buckets (≈ threshold itérations vectorisées).
+    """
+    n = x.size
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    buckets = threshold - 2
+    # bounds[i]..bounds[i+1] : bucket i ; bounds[-1] == n - 1 (dernier point, conservé à part)
+    bounds = (np.arange(buckets + 1) * (n - 2)) // buckets + 1
+
+    counts = np.diff(bounds)
+    mean_x = np.add.reduceat(x[:-1], bounds[:-1]) / counts
+    mean_y = np.add.reduceat(y[:-1], bounds[:-1]) / counts
+    # Point "c" du bucket i : moyenne du bucket i+1, ou dernier point pour le dernier bucket
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(buckets):
+        lo, hi = bounds[i], bounds[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Série réduite à au plus `threshold` points.
+    """
+    indices = lttb_indices(x, y, threshold)
+    return np.asarray(x)[indices], np.asarray(y)[indices]
@@ -0,0 +1,81 @@
+"""
+Forecast - Prévision glycémique court terme (30 / 60 minutes).
+
+Modèle autorégressif AR(p) sur la série rééchantillonnée à 5 minutes :
+    z(t) = c + a1 z(t-5) + ... + ap z(t-5p),   z = (glycémie - CENTER) / SCALE
+Les coefficients sont ajustés en ligne par moindres carrés récursifs (RLS) avec
+facteur d'oubli : chaque nouveau pas de 5 minutes coûte O(p²), sans jamais
+réajuster sur l'historique. Le modèle initial est la persistance (z(t) = z(t-5)).
+
+Toutes les fonctions acceptent une dimension de lot en tête (N utilisateurs) :
+la mise à jour et la prévision d'un lot se font en quelques opérations NumPy.
+"""
+
+import numpy as np
+
+ORDER = 6  # 30 minutes d'historique
+STEP_MINUTES = 5
+FORGETTING = 0.998  # Demi-vie ≈ 29 h de données
+INITIAL_COVARIANCE = 1.0
+CENTER = 140.0
+SCALE = 50.0
+MIN_VALUE, MAX_VALUE = 40.0, 400.0  # Plage de mesure des capteurs
+ERROR_DECAY = 0.02  # Moyenne mobile exponentielle de l'erreur quadratique à 1 pas
+
+
+def initial_state(batch: tuple = ()) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (theta, P) du modèle de persistance : theta = [c, a1..ap], P = INITIAL_COVARIANCE x I.
+    """
+    k = ORDER + 1
+    theta = np.zeros(batch + (k,))
+    theta[..., 1] = 1.0
+    covariance = np.broadcast_to(np.eye(k) * INITIAL_COVARIANCE, batch + (k, k)).copy()
+    return theta, covariance
+
+
+def normalize(values):
+    return (np.asarray(values, dtype=np.float64) - CENTER) / SCALE
+
+
+def denormalize(z):
+    return np.clip(np.asarray(z) * SCALE + CENTER, MIN_VALUE, MAX_VALUE)
+
+
+def regressor(history: np.ndarray) -> np.ndarray:
+    """
+    [1, z(t-5), ..., z(t-5p)] depuis un historique chronologique (..., p) normalisé.
+    """
+    ones = np.ones(history.shape[:-1] + (1,))
+    return np.concatenate([ones, history[..., ::-1]], axis=-1)
+
+
+def rls_update(theta: np.ndarray, covariance: np.ndarray, history: np.ndarray, target,
+               forgetting: float = FORGETTING):
+    """
+    Une itération RLS (en place) : theta (..., k), P (..., k, k), historique (..., p), cible (...).
+    Retourne l'erreur a priori (cible - prévision à 1 pas), en unités normalisées.
+    """
+    x = regressor(history)
+    error = np.asarray(target) - np.einsum("...k,...k->...", theta, x)
+    px = np.einsum("...ij,...j->...i", covariance, x)
+    gain = px / (forgetting + np.einsum("...k,...k->...", x, px))[..., None]
+    theta += gain * error[..., None]
+    covariance -= gain[..., :, None] * px[..., None, :]
+    covariance /= forgetting
+    return error
+
+
+def predict(theta: np.ndarray, history: np.ndarray, steps: int) -> np.ndarray:
+    """
+    Prévision itérée sur `steps` pas de 5 minutes : (..., steps), en unités normalisées.
+    """
+    window = np.array(history, dtype=np.float64)
+    out = np.empty(window.shape[:-1] + (steps,))
+    for step in range(steps):
+        z = np.einsum("...k,...k->...", theta, regressor(window))
+        # Bornage à la plage capteur : une racine instable ne diverge pas sur 12 pas
+        z = np.clip(z, normalize(MIN_VALUE), normalize(MAX_VALUE))
+        out[..., step] = z
+        window = np.concatenate([window[..., 1:], z[..., None]], axis=-1)
+    return out
@@ -0,0 +1,86 @@
+"""
+Meal Response - Réponse glycémique post-prandiale.
+
+Pour chaque repas, sur la série triée (secondes epoch, mg/dL) :
+- baseline : moyenne des mesures des 30 minutes précédant le repas (repas inclus) ;
+- pic : maximum des 2 heures suivantes, et délai du pic (minutes) ;
+- iAUC : aire incrémentale au-dessus de la baseline (trapèzes, parties négatives
+  écrêtées, mg/dL·min), départ à la baseline à l'heure du repas.
+
+Jointure fenêtrée vectorisée : bornes des fenêtres de tous les repas par recherche
+dichotomique (np.searchsorted) dans la série, puis une matrice repas x mesures (masquée)
+pour le pic et l'aire. Aucune requête ni boucle Python par repas.
+"""
+
+import unicodedata
+import numpy as np
+
+WINDOW_MINUTES = 120
+BASELINE_MINUTES = 30
+MIN_READINGS = 12  # Fenêtre couverte au moins à moitié (capteur 5 min)
+
+
+def meal_excursions(timestamps: np.ndarray, values: np.ndarray, meal_times: np.ndarray) -> dict:
+    """
+    timestamps (int64 s, triés), values (float64), meal_times (int64 s) -> tableaux alignés sur
+    meal_times : baseline, peak, peak_delta, time_to_peak (min), iauc, count (mesures post-repas).
+    Métriques NaN si la baseline manque ou si la fenêtre compte moins de MIN_READINGS mesures.
+    """
+    meal_times = np.asarray(meal_times, dtype=np.int64)
+    n = meal_times.size
+    nan = np.full(n, np.nan)
+    result = {"baseline": nan, "peak": nan.copy(), "peak_delta": nan.copy(), "time_to_peak": nan.copy(),
+              "iauc": nan.copy(), "count": np.zeros(n, dtype=np.int64)}
+    if n == 0 or timestamps.size == 0:
+        return result
+
+    # Baseline : somme cumulée, [t - 30 min, t]
+    cumulative = np.concatenate([[0.0], np.cumsum(values)])
+    base_lo = np.searchsorted(timestamps, meal_times - BASELINE_MINUTES * 60, side="left")
+    base_hi = np.searchsorted(timestamps, meal_times, side="right")
+    base_count = base_hi - base_lo
+    with np.errstate(invalid="ignore", divide="ignore"):
+        baseline = np.where(base_count > 0, (cumulative[base_hi] - cumulative[base_lo]) / base_count, np.nan)
+
+    # Fenêtre post-repas ]t, t + 2 h] : matrice repas x K mesures, masquée
+    lo = base_hi
+    hi = np.searchsorted(timestamps, meal_times + WINDOW_MINUTES * 60, side="right")
+    count = hi - lo
+    width = int(count.max())
+    result["baseline"] = baseline
+    result["count"] = count
+    if width == 0:
+        return result
+    index = lo[:, None] + np.arange(width)[None, :]
+    mask = index < hi[:, None]
+    index = np.minimum(index, timestamps.size - 1)
+    window_values = np.where(mask, values[index], -np.inf)
+    minutes = np.where(mask, (timestamps[index] - meal_times[:, None]) / 60.0, 0.0)
+
+    valid = (count >= MIN_READINGS) & ~np.isnan(baseline)
+    peak_index = np.argmax(window_values, axis=1)
+    peak = window_values[np.arange(n), peak_index]
+    time_to_peak = minutes[np.arange(n), peak_index]
+
+    # iAUC : la courbe part de la baseline à t = 0
+    above = np.where(mask, np.maximum(window_values - baseline[:, None], 0.0), 0.0)
+    above = np.concatenate([np.zeros((n, 1)), above], axis=1)
+    times = np.concatenate([np.zeros((n, 1)), minutes], axis=1)
+    segment = np.concatenate([np.ones((n, 1), dtype=bool), mask], axis=1)
+    pairs = segment[:, 1:] & segment[:, :-1]
+    area = np.where(pairs, (above[:, 1:] + above[:, :-1]) / 2 * (times[:, 1:] - times[:, :-1]), 0.0)
+
+    result["peak"] = np.where(valid, peak, np.nan)
+    result["peak_delta"] = np.where(valid, peak - baseline, np.nan)
+    result["time_to_peak"] = np.where(valid, time_to_peak, np.nan)
+    result["iauc"] = np.where(valid, area.sum(axis=1), np.nan)
+    return result
+
+
+def food_key(name: str) -> str:
+    """
+    Clé d'agrégation d'un aliment : nom normalisé (casse, accents, espaces).
+    """
+    normalized = unicodedata.normalize("NFKD", name or "")
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return " ".join(normalized.lower().split())[:120]
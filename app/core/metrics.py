@@ -0,0 +1,198 @@
+"""
+CGM Metrics - Indicateurs du consensus international (Battelino et al., 2019).
+
+Toutes les métriques sont calculées de façon vectorisée (NumPy) sur un tableau
+de valeurs (mg/dL) triées par timestamp, chargé une seule fois :
+- Temps dans les plages : TBR niveau 2 (<54), TBR niveau 1 (54-69), TIR (70-180),
+  TAR niveau 1 (181-250), TAR niveau 2 (>250), en % des mesures.
+- Moyenne, écart-type (SD), coefficient de variation (CV).
+- GMI (Glucose Management Indicator) : 3.31 + 0.02392 x moyenne (mg/dL).
+- MAGE (amplitude moyenne des excursions glycémiques > 1 SD).
+- LBGI / HBGI (indices de risque de Kovatchev).
+"""
+
+import numpy as np
+
+READINGS_PER_DAY = 288  # Une mesure toutes les 5 minutes
+
+# Bornes du consensus (mg/dL)
+VERY_LOW = 54
+LOW = 70
+HIGH = 180
+VERY_HIGH = 250
+
+
+def time_in_ranges(values: np.ndarray) -> dict:
+    """
+    Répartition (%) des mesures dans les 5 plages du consensus.
+    """
+    n = values.size
+    # Bornes 54 et 70 exclues des plages basses, 180 et 250 incluses dans les plages inférieures
+    below_54 = np.count_nonzero(values < VERY_LOW)
+    below_70 = np.count_nonzero(values < LOW)
+    above_180 = np.count_nonzero(values > HIGH)
+    above_250 = np.count_nonzero(values > VERY_HIGH)
+    pct = 100.0 / n
+    return {
+        "tbr_level2": round(below_54 * pct, 1),
+        "tbr_level1": round((below_70 - below_54) * pct, 1),
+        "tir": round((n - below_70 - above_180) * pct, 1),
+        "tar_level1": round((above_180 - above_250) * pct, 1),
+        "tar_level2": round(above_250 * pct, 1),
+    }
+
+
+def gmi(mean_glucose: float) -> float:
+    """
+    Glucose Management Indicator (%), à partir de la moyenne en mg/dL.
+    """
+    return 3.31 + 0.02392 * mean_glucose
+
+
+def mage(values: np.ndarray, sd: float) -> float:
+    """
+    MAGE : moyenne des amplitudes entre pics et creux consécutifs dépassant 1 SD.
+    Les points de retournement bruts (changements de signe de la dérivée, plateaux
+    compressés) sont filtrés en un passage : un retournement n'est confirmé que si
+    la glycémie s'éloigne de plus de 1 SD de l'extremum courant. Les inversions du
+    bruit capteur (<= 1 SD) sont ainsi absorbées dans l'excursion en cours, et les
+    segments de même sens fusionnés, au lieu de fragmenter les vraies excursions.
+    """
+    if values.size < 3 or sd == 0:
+        return 0.0
+
+    # Compression des plateaux (valeurs consécutives identiques)
+    keep = np.empty(values.size, dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    series = values[keep]
+    if series.size < 3:
+        return 0.0
+
+    direction = np.sign(np.diff(series))
+    turning = np.flatnonzero(direction[1:] != direction[:-1]) + 1
+    extrema = series[np.concatenate(([0], turning, [series.size - 1]))].tolist()
+
+    pivots = []
+    low = high = candidate = extrema[0]
+    trend = 0  # 0 : aucune excursion > 1 SD encore vue ; 1 : montée en cours ; -1 : descente
+    for value in extrema[1:]:
+        if trend == 0:
+            low, high = min(low, value), max(high, value)
+            if high - low > sd:
+                rising = value == high
+                pivots.append(low if rising else high)
+                candidate, trend = value, (1 if rising else -1)
+        elif trend == 1:
+            if value > candidate:
+                candidate = value
+            elif candidate - value > sd:
+                pivots.append(candidate)
+                candidate, trend = value, -1
+        else:
+            if value < candidate:
+                candidate = value
+            elif value - candidate > sd:
+                pivots.append(candidate)
+                candidate, trend = value, 1
+    if trend:
+        pivots.append(candidate)
+
+    amplitudes = np.abs(np.diff(pivots))
+    significant = amplitudes[amplitudes > sd]
+    if significant.size == 0:
+        return 0.0
+    return float(significant.mean())
+
+
+def risk_indices(values: np.ndarray) -> tuple[float, float]:
+    """
+    LBGI / HBGI (Kovatchev) : transformation symétrique de l'échelle glycémique.
+    f(BG) = 1.509 x (ln(BG)^1.084 - 5.381), risque = 10 x f^2.
+    """
+    f = 1.509 * (np.power(np.log(np.clip(values, 1.0, None)), 1.084) - 5.381)
+    risk = 10.0 * f * f
+    lbgi = float(np.where(f < 0, risk, 0.0).mean())
+    hbgi = float(np.where(f > 0, risk, 0.0).mean())
+    return lbgi, hbgi
+
+
+def compute_cgm_metrics(values: np.ndarray, days: int = None) -> dict:
+    """
+    Calcule l'ensemble des métriques du consensus pour une fenêtre de mesures.
+    `values` : tableau de glycémies (mg/dL) trié chronologiquement.
+    `days` : durée de la fenêtre, pour le taux de couverture capteur.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = int(values.size)
+    if n == 0:
+        return {"count": 0}
+
+    mean = float(values.mean())
+    sd = float(values.std(ddof=1)) if n > 1 else 0.0
+    lbgi, hbgi = risk_indices(values)
+
+    result = {
+        "count": n,
+        "mean": round(mean, 1),
+        "sd": round(sd, 1),
+        "cv": round(sd / mean * 100, 1) if mean else None,
+        "gmi": round(gmi(mean), 2),
+        "mage": round(mage(values, sd), 1),
+        "lbgi": round(lbgi, 2),
+        "hbgi": round(hbgi, 2),
+        **time_in_ranges(values),
+    }
+    if days:
+        result["coverage"] = round(min(100.0, n / (days * READINGS_PER_DAY) * 100), 1)
+    return result
+
+
+AGP_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def ambulatory_glucose_profile(timestamps: np.ndarray, values: np.ndarray, bin_minutes: int = 15,
+                               tz_offset_minutes: int = 0) -> dict:
+    """
+    Ambulatory Glucose Profile : percentiles 5/25/50/75/95 par tranche horaire de la journée.
+    Un seul tri global (lexsort par tranche puis valeur) ; les percentiles de toutes les
+    tranches sont ensuite lus par indexation vectorisée (interpolation linéaire,
+    identique à np.percentile), sans boucle Python sur les tranches.
+    `timestamps` : secondes epoch UTC ; `tz_offset_minutes` décale vers l'heure locale.
+    """
+    n_bins = (24 * 60) // bin_minutes
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+
+    seconds_of_day = (timestamps + tz_offset_minutes * 60) % 86400
+    bins = (seconds_of_day // (bin_minutes * 60)).astype(np.int64)
+
+    order = np.lexsort((values, bins))
+    sorted_values = values[order]
+    counts = np.bincount(bins, minlength=n_bins)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    has_data = counts > 0
+    last = np.maximum(counts - 1, 0)
+    percentiles = {}
+    for p in AGP_PERCENTILES:
+        position = last * (p / 100.0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, last)
+        fraction = position - lower
+        if sorted_values.size:
+            low_values = sorted_values[np.minimum(offsets + lower, sorted_values.size - 1)]
+            high_values = sorted_values[np.minimum(offsets + upper, sorted_values.size - 1)]
+            band = low_values + (high_values - low_values) * fraction
+        else:
+            band = np.zeros(n_bins)
+        percentiles[p] = np.where(has_data, band, np.nan)
+
+    profile = []
+    for i in range(n_bins):
+        minutes = i * bin_minutes
+        point = {"time": f"{minutes // 60:02d}:{minutes % 60:02d}", "count": int(counts[i])}
+        for p in AGP_PERCENTILES:
+            point[f"p{p}"] = round(float(percentiles[p][i]), 1) if has_data[i] else None
+        profile.append(point)
+    return {"bin_minutes": bin_minutes, "bins": profile}
@@ -0,0 +1,33 @@
+"""
+Keyset Pagination - Curseurs opaques pour les listes triées par timestamp.
+
+Un curseur encode la position (timestamp, id) de la dernière ligne vue.
+La page suivante est obtenue par un `WHERE (timestamp, id) < curseur` qui
+s'appuie sur l'index (user_id, timestamp) : le coût d'une page profonde est
+le même que celui de la première page (pas d'OFFSET).
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+
+def encode_cursor(timestamp: datetime, entry_id: int) -> str:
+    """
+    Encode une position (timestamp, id) en curseur opaque (base64 url-safe).
+    """
+    raw = f"{timestamp.isoformat()}|{entry_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Décode un curseur opaque. Lève ValueError si le curseur est invalide.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        ts_str, id_str = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts_str), int(id_str)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Curseur invalide: {cursor}") from e
@@ -0,0 +1,113 @@
+"""
+Quality - Filtre de qualité des mesures CGM, en flux.
+
+Chaque mesure reçoit un masque de drapeaux (colonne glucose_entries.quality) :
+- DUPLICATE   : même mesure reçue deux fois (< 60 s de la précédente, ex. deux uploaders) ;
+- SENSOR      : erreur signalée par le capteur / l'uploader, ou valeur hors plage de mesure ;
+- JUMP        : variation physiologiquement impossible depuis la dernière mesure valide (> 5 mg/dL/min) ;
+- COMPRESSION : chute brutale (> 2.5 mg/dL/min) vers l'hypoglycémie, typique d'un capteur
+                comprimé pendant le sommeil ; l'épisode dure jusqu'au retour au-dessus de 70 mg/dL
+                (au plus 45 minutes : au-delà, l'hypo est considérée comme réelle) ;
+- GAP         : première mesure après un trou de données (> 15 min) — informatif, pas un artefact.
+Les mesures marquées ARTIFACT sont conservées mais exclues des statistiques.
+
+`annotate` est un générateur : état O(1) (dernière mesure vue, dernière mesure valide,
+début de l'épisode de compression en cours), mesures traitées une à une dans l'ordre chronologique.
+"""
+
+from datetime import datetime, timedelta
+
+FLAG_DUPLICATE = 1
+FLAG_SENSOR = 2
+FLAG_JUMP = 4
+FLAG_COMPRESSION = 8
+FLAG_GAP = 16
+ARTIFACT = FLAG_DUPLICATE | FLAG_SENSOR | FLAG_JUMP | FLAG_COMPRESSION
+# Les alertes voient les compressions probables : une vraie hypo rapide ne doit pas être masquée
+ALERT_EXCLUDED = FLAG_DUPLICATE | FLAG_SENSOR | FLAG_JUMP
+
+FLAG_NAMES = {
+    FLAG_DUPLICATE: "duplicate",
+    FLAG_SENSOR: "sensor",
+    FLAG_JUMP: "jump",
+    FLAG_COMPRESSION: "compression",
+    FLAG_GAP: "gap",
+}
+
+DUPLICATE_WINDOW = timedelta(seconds=60)
+GAP = timedelta(minutes=15)
+SENSOR_MIN, SENSOR_MAX = 39.0, 401.0  # Plage de mesure usuelle 40-400 mg/dL
+MAX_RATE = 5.0  # mg/dL/min
+COMPRESSION_RATE = 2.5  # mg/dL/min, chute
+COMPRESSION_LOW = 70.0
+COMPRESSION_ONSET = timedelta(minutes=15)  # Chute mesurée depuis une mesure valide récente
+COMPRESSION_MAX = timedelta(minutes=45)
+
+
+class QualityState:
+    """
+    État du filtre pour un utilisateur : dernière mesure vue (doublons, trous),
+    dernière mesure valide (référence des vitesses), épisode de compression en cours.
+    """
+    __slots__ = ("last_ts", "ref_ts", "ref_value", "compression_since")
+
+    def __init__(self, last_ts: datetime = None, ref_ts: datetime = None, ref_value: float = None,
+                 compression_since: datetime = None):
+        self.last_ts = last_ts
+        self.ref_ts = ref_ts
+        self.ref_value = ref_value
+        self.compression_since = compression_since
+
+
+def _rate_flags(state: QualityState, ts: datetime, value: float) -> int:
+    if state.ref_ts is None:
+        return 0
+    elapsed = ts - state.ref_ts
+    rate = (value - state.ref_value) / (elapsed.total_seconds() / 60)
+
+    if state.compression_since is not None:
+        if value >= COMPRESSION_LOW or ts - state.compression_since > COMPRESSION_MAX:
+            state.compression_since = None
+        else:
+            return FLAG_COMPRESSION
+    if rate <= -COMPRESSION_RATE and value < COMPRESSION_LOW and elapsed <= COMPRESSION_ONSET:
+        state.compression_since = ts
+        return FLAG_COMPRESSION
+    if abs(rate) > MAX_RATE:
+        return FLAG_JUMP
+    return 0
+
+
+def annotate(points, state: QualityState):
+    """
+    (timestamp, valeur, drapeaux source) triés -> (timestamp, valeur, drapeaux).
+    Les drapeaux source (ex. SENSOR posé par l'uploader) sont conservés.
+    Met à jour `state` au fil du flux.
+    """
+    for ts, value, flags in points:
+        if value is None or not SENSOR_MIN <= value <= SENSOR_MAX:
+            flags |= FLAG_SENSOR
+        if state.last_ts is not None:
+            if ts - state.last_ts < DUPLICATE_WINDOW:
+                flags |= FLAG_DUPLICATE
+            elif ts - state.last_ts > GAP:
+                flags |= FLAG_GAP
+
+        if not flags & (FLAG_SENSOR | FLAG_DUPLICATE):
+            flags |= _rate_flags(state, ts, value)
+        if not flags & ARTIFACT:
+            state.ref_ts, state.ref_value = ts, value
+        if not flags & FLAG_DUPLICATE:
+            state.last_ts = ts
+        yield ts, value, flags
+
+
+def clean_condition(quality_column):
+    """
+    Condition SQL "mesure valide" sur la colonne quality (drapeau GAP seul autorisé).
+    """
+    return quality_column.op("&")(ARTIFACT) == 0
+
+
+def describe(flags: int) -> list[str]:
+    return [name for flag, name in FLAG_NAMES.items() if flags & flag]
@@ -2,10 +2,20 @@
 Stability Engine - Miedema HbA1c Adjustment Logic
 
 This module implements the Miedema kinetic model for HbA1c adjustment based on glucose levels and questionnaire data.
+
+Estimation cinétique : l'HbA1c ne reflète pas une moyenne plate sur 90 jours, la
+glycation récente pèse davantage (≈ 50 % du signal sur les 30 derniers jours,
+25 % sur les 30 précédents). Les moyennes journalières sont donc pondérées par un
+noyau exponentiel de demi-vie GLYCATION_HALF_LIFE_DAYS, puis converties par ADAG.
+L'état (somme pondérée, somme des poids) se replie jour par jour : une
+multiplication-addition par jour clos, lecture O(1).
 """
 
+import numpy as np
 from app.models.schemas import LabData, LifestyleProfile
 
+GLYCATION_HALF_LIFE_DAYS = 30.0
+
 def adjust_hba1c(lab: LabData, lifestyle: LifestyleProfile) -> dict:
     """
     Ticket B05: Adjustment of HbA1c based on physiological factors (Miedema simplified rules).
@@ -56,11 +66,46 @@ def adjust_hba1c(lab: LabData, lifestyle: LifestyleProfile) -> dict:
 
 def estimate_hba1c_from_glucose(avg_glucose: float) -> float:
     """
-    Estimate HbA1c from Average Glucose using Miedema formula.
+    Estimate HbA1c from Average Glucose (ADAG linear formula, Nathan et al. 2008).
     HbA1c = (AvgGlucose + 46.7) / 28.7
+    La pondération cinétique est portée par la moyenne fournie (voir `fold_daily_means`).
     """
     return (avg_glucose + 46.7) / 28.7
 
+def glycation_weights(ages_days) -> np.ndarray:
+    """
+    Poids du noyau de glycation pour des âges en jours (0 = jour le plus récent).
+    """
+    return np.power(0.5, np.asarray(ages_days, dtype=np.float64) / GLYCATION_HALF_LIFE_DAYS)
+
+def fold_daily_means(weighted_sum: float, weight_total: float, last_day, days, means) -> tuple[float, float, int]:
+    """
+    Replie des jours clos (ordinaux croissants, postérieurs à `last_day`) dans l'état cinétique.
+    L'état est exprimé au dernier jour replié : il est d'abord vieilli de l'écart, puis chaque
+    jour entre avec le poids de son âge. Vectorisé : un jour ou tout l'historique en un appel.
+    Retourne (somme pondérée, somme des poids, dernier jour).
+    """
+    days = np.asarray(days, dtype=np.int64)
+    if days.size == 0:
+        return weighted_sum, weight_total, last_day
+    new_last = int(days[-1])
+    if last_day is not None:
+        decay = float(glycation_weights(new_last - last_day))
+        weighted_sum *= decay
+        weight_total *= decay
+    weights = glycation_weights(new_last - days)
+    return (
+        weighted_sum + float(np.dot(weights, np.asarray(means, dtype=np.float64))),
+        weight_total + float(weights.sum()),
+        new_last
+    )
+
+def kinetic_mean_glucose(weighted_sum: float, weight_total: float):
+    """
+    Glycémie moyenne pondérée par la cinétique de glycation, None sans données.
+    """
+    return weighted_sum / weight_total if weight_total > 0 else None
+
 def analyze_stability(lab: LabData, lifestyle: LifestyleProfile, rolling_avg_90d: float) -> dict:
     """
     Complete Stability Analysis (Ticket T-M001 + B05).
@@ -0,0 +1,74 @@
+"""
+Trend - Vitesse de variation glycémique et flèche de tendance.
+
+La vitesse (mg/dL/min) est la pente des moindres carrés sur les mesures des
+15 dernières minutes (mesure courante comprise) : plus stable qu'une simple
+différence entre deux points, sensible au bruit capteur.
+La flèche suit les seuils usuels des CGM (Dexcom / Nightscout) :
+  > 3 ⇈, 2 à 3 ↑, 1 à 2 ↗, -1 à 1 →, -2 à -1 ↘, -3 à -2 ↓, < -3 ⇊ (mg/dL/min).
+"""
+
+from datetime import datetime, timedelta
+
+SMOOTHING_WINDOW = timedelta(minutes=15)
+MIN_SPAN = timedelta(minutes=4)  # En dessous, pas de pente fiable (mesures quasi simultanées)
+
+# (borne basse exclue, direction) du plus rapide au plus lent ; Flat sinon
+_RISING = ((3.0, "DoubleUp"), (2.0, "SingleUp"), (1.0, "FortyFiveUp"))
+_FALLING = ((-3.0, "DoubleDown"), (-2.0, "SingleDown"), (-1.0, "FortyFiveDown"))
+
+ARROWS = {
+    "DoubleUp": ("⇈", "hausse rapide"),
+    "SingleUp": ("↑", "en hausse"),
+    "FortyFiveUp": ("↗", "légère hausse"),
+    "Flat": ("→", "stable"),
+    "FortyFiveDown": ("↘", "légère baisse"),
+    "SingleDown": ("↓", "en baisse"),
+    "DoubleDown": ("⇊", "baisse rapide"),
+}
+
+
+def rate_of_change(points: list[tuple[datetime, float]]):
+    """
+    Pente (mg/dL/min) des points (timestamp, valeur) triés, restreints aux
+    SMOOTHING_WINDOW précédant le dernier. None si la fenêtre est trop courte (trou capteur).
+    """
+    if not points:
+        return None
+    last_ts = points[-1][0]
+    window = [(ts, value) for ts, value in points if last_ts - ts <= SMOOTHING_WINDOW]
+    if len(window) < 2 or last_ts - window[0][0] < MIN_SPAN:
+        return None
+
+    minutes = [(ts - last_ts).total_seconds() / 60 for ts, _ in window]
+    values = [value for _, value in window]
+    mean_t = sum(minutes) / len(minutes)
+    mean_v = sum(values) / len(values)
+    var_t = sum((t - mean_t) ** 2 for t in minutes)
+    cov = sum((t - mean_t) * (v - mean_v) for t, v in zip(minutes, values))
+    return cov / var_t
+
+
+def trend_direction(rate):
+    """
+    Direction (vocabulaire Nightscout) pour une vitesse en mg/dL/min, None si inconnue.
+    """
+    if rate is None:
+        return None
+    for bound, direction in _RISING:
+        if rate > bound:
+            return direction
+    for bound, direction in _FALLING:
+        if rate < bound:
+            return direction
+    return "Flat"
+
+
+def describe_trend(direction, rate) -> str:
+    """
+    Libellé pour les prompts : "↗ légère hausse (+1.4 mg/dL/min)".
+    """
+    if direction is None:
+        return "inconnue"
+    arrow, label = ARROWS[direction]
+    return f"{arrow} {label} ({rate:+.1f} mg/dL/min)"
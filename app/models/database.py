@@ -1,5 +1,6 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from app.core.config import settings
 
 connect_args = {"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
@@ -17,3 +18,21 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def _is_postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def upsert(db: Session, table):
+    """
+    INSERT du dialecte de la session, avec on_conflict_do_update / on_conflict_do_nothing
+    (PostgreSQL, SQLite) : deux transactions qui créent la même ligne ne lèvent pas d'IntegrityError.
+    """
+    return (postgresql if _is_postgresql(db) else sqlite).insert(table)
+
+def least(db: Session, *values):
+    """Minimum scalaire SQL (LEAST sur PostgreSQL, MIN à plusieurs arguments sur SQLite)."""
+    return (func.least if _is_postgresql(db) else func.min)(*values)
+
+def greatest(db: Session, *values):
+    """Maximum scalaire SQL (GREATEST sur PostgreSQL, MAX à plusieurs arguments sur SQLite)."""
+    return (func.greatest if _is_postgresql(db) else func.max)(*values)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Float, Integer, String, ForeignKey, DateTime, Text, JSON
+from sqlalchemy import Boolean, Column, Float, Integer, String, ForeignKey, DateTime, Text, JSON, Index, UniqueConstraint, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.database import Base
@@ -70,6 +70,7 @@ class Meal(Base):
     image_url = Column(String, nullable=True)
     
     user = relationship("User", back_populates="meals")
+    glucose_response = relationship("MealGlucoseResponse", uselist=False, cascade="all, delete-orphan")
 
 class GlucoseEntry(Base):
     __tablename__ = "glucose_entries"
@@ -79,9 +80,212 @@ class GlucoseEntry(Base):
     value = Column(Float)
     timestamp = Column(DateTime, default=datetime.utcnow)
     note = Column(String, nullable=True)
+    rate_of_change = Column(Float, nullable=True)  # mg/dL/min, calculée à l'ingestion (app/core/trend.py)
+    trend = Column(String(16), nullable=True)  # Direction Nightscout : DoubleUp ... Flat ... DoubleDown
+    quality = Column(Integer, nullable=False, default=0)  # Drapeaux du filtre qualité (app/core/quality.py), 0 = mesure valide
     
     user = relationship("User", back_populates="glucose_entries")
 
+    # Index composite : toutes les lectures filtrent par user_id puis par plage de timestamp
+    __table_args__ = (
+        Index("ix_glucose_entries_user_id_timestamp", "user_id", "timestamp"),
+    )
+
+class GlucoseRollup(Base):
+    """Agrégats glycémiques journaliers (jour UTC) maintenus à l'ingestion"""
+    __tablename__ = "glucose_rollups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    resolution = Column(String(8), nullable=False)  # "1d" (seule résolution maintenue)
+    bucket_start = Column(DateTime, nullable=False)  # Début du bucket (UTC)
+    value_count = Column(Integer, default=0)
+    value_sum = Column(Float, default=0.0)
+    value_sum_sq = Column(Float, default=0.0)  # Somme des carrés (écart-type / CV)
+    value_min = Column(Float, nullable=True)
+    value_max = Column(Float, nullable=True)
+    low_count = Column(Integer, default=0)  # < 70 mg/dL
+    normal_count = Column(Integer, default=0)  # 70-180 mg/dL
+    high_count = Column(Integer, default=0)  # > 180 mg/dL
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "resolution", "bucket_start", name="uq_glucose_rollups_bucket"),
+    )
+
+class GlucoseChunk(Base):
+    """Journée close de mesures compactée en un blob (voir app/core/chunk_codec.py)"""
+    __tablename__ = "glucose_chunks"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(DateTime, nullable=False)  # Début du jour (UTC)
+    reading_count = Column(Integer, default=0)
+    first_timestamp = Column(DateTime, nullable=True)
+    last_timestamp = Column(DateTime, nullable=True)
+    data = Column(LargeBinary, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_glucose_chunks_user_day"),
+    )
+
+class GlucoseAggregate(Base):
+    """Tier de rétention : mesures au-delà de l'horizon remplacées par des agrégats 15 min"""
+    __tablename__ = "glucose_aggregates"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)  # Début du bucket de 15 min (UTC)
+    value_count = Column(Integer, default=0)
+    value_mean = Column(Float, nullable=False)
+    value_min = Column(Float, nullable=False)
+    value_max = Column(Float, nullable=False)
+    value_sum_sq = Column(Float, default=0.0)  # Écart-type exact sur des fenêtres mixtes
+    low_count = Column(Integer, default=0)  # < 70 mg/dL
+    normal_count = Column(Integer, default=0)  # 70-180 mg/dL
+    high_count = Column(Integer, default=0)  # > 180 mg/dL
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "bucket_start", name="uq_glucose_aggregates_bucket"),
+    )
+
+class UserDataWatermark(Base):
+    """Version des données glycémiques d'un utilisateur : incrémentée à chaque écriture (ETag)"""
+    __tablename__ = "user_data_watermarks"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    data_version = Column(Integer, nullable=False, default=0)
+    last_ingest_at = Column(DateTime, nullable=True)
+
+class GlucoseUserSummary(Base):
+    """Compteurs glycémiques par utilisateur, maintenus à l'ingestion (lecture O(1))"""
+    __tablename__ = "glucose_user_summaries"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    reading_count = Column(Integer, nullable=False, default=0)
+    value_sum = Column(Float, nullable=False, default=0.0)
+    first_timestamp = Column(DateTime, nullable=True)
+    last_timestamp = Column(DateTime, nullable=True)
+    window_start = Column(DateTime, nullable=True)  # Premier jour (UTC) de la fenêtre glissante 90 jours
+    window_count = Column(Integer, nullable=False, default=0)  # Mesures de la fenêtre
+    window_sum = Column(Float, nullable=False, default=0.0)
+
+class GlucoseForecastModel(Base):
+    """État du modèle de prévision AR/RLS d'un utilisateur (voir app/core/forecast.py)"""
+    __tablename__ = "glucose_forecast_models"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    coefficients = Column(LargeBinary, nullable=False)  # float64[p+1] : constante + coefficients AR
+    covariance = Column(LargeBinary, nullable=False)  # float64[(p+1)²] : matrice P du RLS
+    history = Column(LargeBinary, nullable=True)  # float64[<=p] : derniers points normalisés de la grille 5 min
+    last_bucket = Column(DateTime, nullable=True)  # Dernier pas de 5 min intégré (UTC)
+    update_count = Column(Integer, nullable=False, default=0)
+    error_sq = Column(Float, nullable=False, default=0.0)  # Erreur quadratique moyenne à 1 pas (normalisée, EWMA)
+
+class GlucoseKineticState(Base):
+    """État de l'HbA1c cinétique d'un utilisateur : moyennes journalières pondérées par la glycation"""
+    __tablename__ = "glucose_kinetic_states"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    weighted_sum = Column(Float, nullable=False, default=0.0)  # Σ poids x moyenne journalière, au dernier jour replié
+    weight_total = Column(Float, nullable=False, default=0.0)  # Σ poids
+    last_day = Column(DateTime, nullable=True)  # Dernier jour avec données replié (UTC)
+    closed_until = Column(DateTime, nullable=True)  # Jours antérieurs déjà traités (borne exclue)
+    day_count = Column(Integer, nullable=False, default=0)
+
+class GlucoseColdMonth(Base):
+    """Manifeste du tier froid : mois clos d'un utilisateur exporté en Parquet (voir cold_tier_service)"""
+    __tablename__ = "glucose_cold_months"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    month = Column(DateTime, primary_key=True)  # Premier jour du mois (UTC)
+    reading_count = Column(Integer, nullable=False, default=0)  # Totaux des agrégats journaliers à l'export
+    value_sum = Column(Float, nullable=False, default=0.0)
+    row_count = Column(Integer, nullable=False, default=0)  # Lignes du fichier (moyennes 15 min au-delà de la rétention)
+    exported_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class MealGlucoseResponse(Base):
+    """Réponse glycémique post-prandiale d'un repas (2 h, voir app/core/meal_response.py)"""
+    __tablename__ = "meal_glucose_responses"
+    
+    meal_id = Column(Integer, ForeignKey("meals.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    food_key = Column(String(120), nullable=False)  # Nom du repas normalisé (agrégat par aliment)
+    baseline = Column(Float, nullable=True)  # Moyenne des 30 min précédant le repas (mg/dL)
+    peak = Column(Float, nullable=True)
+    peak_delta = Column(Float, nullable=True)  # Pic - baseline
+    time_to_peak_minutes = Column(Float, nullable=True)
+    iauc = Column(Float, nullable=True)  # Aire incrémentale au-dessus de la baseline (mg/dL·min)
+    reading_count = Column(Integer, nullable=False, default=0)  # Mesures dans la fenêtre ; métriques nulles si insuffisantes
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+class FoodGlucoseResponse(Base):
+    """Agrégat par aliment des réponses post-prandiales (sommes maintenues à chaque calcul de repas)"""
+    __tablename__ = "food_glucose_responses"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    food_key = Column(String(120), primary_key=True)
+    meal_count = Column(Integer, nullable=False, default=0)  # Repas avec une réponse complète
+    peak_delta_sum = Column(Float, nullable=False, default=0.0)
+    peak_delta_sum_sq = Column(Float, nullable=False, default=0.0)
+    time_to_peak_sum = Column(Float, nullable=False, default=0.0)
+    iauc_sum = Column(Float, nullable=False, default=0.0)
+
+class GlucoseEvent(Base):
+    """Épisode d'hypo- ou d'hyperglycémie détecté à l'ingestion"""
+    __tablename__ = "glucose_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(String(8), nullable=False)  # "low" ou "high"
+    threshold = Column(Float, nullable=False)  # Seuil du profil au début de l'épisode (mg/dL)
+    start_time = Column(DateTime, nullable=False)  # Première mesure hors cible (UTC)
+    end_time = Column(DateTime, nullable=True)  # Retour en cible ; NULL tant que l'épisode est ouvert
+    last_timestamp = Column(DateTime, nullable=False)  # Dernière mesure hors cible
+    extreme_value = Column(Float, nullable=False)  # Nadir (low) ou pic (high)
+    extreme_time = Column(DateTime, nullable=False)
+    reading_count = Column(Integer, default=0)
+    
+    __table_args__ = (
+        Index("ix_glucose_events_user_kind_start", "user_id", "kind", "start_time"),
+    )
+
+class AlertRule(Base):
+    """Règle d'alerte glycémique d'un utilisateur (voir app/core/alerts.py)"""
+    __tablename__ = "alert_rules"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    kind = Column(String(16), nullable=False)  # "below", "above", "rate" ou "missing"
+    threshold = Column(Float, nullable=True)  # mg/dL, ou mg/dL/min pour "rate" (négatif = chute)
+    duration_minutes = Column(Integer, default=0)  # Durée minimale de la condition / d'absence de données
+    enabled = Column(Boolean, default=True)
+
+class GlucoseAlertState(Base):
+    """État du moteur d'alertes d'un utilisateur, partagé entre workers et mis à jour dans la transaction d'ingestion"""
+    __tablename__ = "glucose_alert_states"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_timestamp = Column(DateTime, nullable=True)  # Dernière mesure évaluée (UTC)
+    rules = Column(JSON, nullable=False, default=dict)  # {clé de règle: [début de la condition ISO ou null, active]}
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class GlucoseAlert(Base):
+    """Alerte déclenchée (historique), enregistrée dans la transaction d'ingestion"""
+    __tablename__ = "glucose_alerts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    rule_id = Column(Integer, ForeignKey("alert_rules.id", ondelete="SET NULL"), nullable=True)  # NULL : règle par défaut
+    kind = Column(String(16), nullable=False)
+    value = Column(Float, nullable=True)  # Mesure déclenchante (NULL pour "missing")
+    timestamp = Column(DateTime, nullable=False)  # Mesure déclenchante ou heure du constat (UTC)
+    message = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_glucose_alerts_user_timestamp", "user_id", "timestamp"),
+    )
+
 # ==================== NOUVEAUX MODÈLES POUR LA MÉMOIRE DU CHATBOT ====================
 
 class Conversation(Base):
@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import TypeAdapter
+
+# Même forme JSON que schemas.GlucoseEntry, sans instancier de modèle Pydantic par ligne
+_ROWS_ADAPTER = TypeAdapter(list[dict])
+
+
+class GlucoseRow:
+    """
+    Mesure en lecture seule issue d'une requête Core (ou d'un tier compacté) :
+    pas d'identity map ni de suivi de session, pas de revalidation Pydantic.
+    Mêmes champs que schemas.GlucoseEntry ; à réserver aux lignes lues en base (de confiance).
+    """
+    # Ordre des champs de schemas.GlucoseEntry : JSON identique octet pour octet
+    __slots__ = ("value", "note", "id", "user_id", "timestamp", "rate_of_change", "trend", "quality")
+
+    def __init__(self, id: int, user_id: int, value: float, timestamp: datetime, note: Optional[str] = None,
+                 rate_of_change: Optional[float] = None, trend: Optional[str] = None, quality: int = 0):
+        self.id = id
+        self.user_id = user_id
+        self.value = value
+        self.timestamp = timestamp
+        self.note = note
+        self.rate_of_change = rate_of_change
+        self.trend = trend
+        self.quality = quality
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+def dump_rows(rows: list[GlucoseRow]) -> bytes:
+    """
+    Corps JSON d'une liste de mesures (même sérialisation que response_model=list[schemas.GlucoseEntry]).
+    """
+    return _ROWS_ADAPTER.dump_json([row.as_dict() for row in rows])
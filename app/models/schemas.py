@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, model_validator
+from typing import Optional, List, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -84,9 +84,26 @@ class MealBase(BaseModel):
 class MealCreate(MealBase):
     pass
 
+class MealGlucoseResponse(BaseModel):
+    """
+    Réponse glycémique post-prandiale (2 h) : métriques nulles si les données sont insuffisantes.
+    """
+    meal_id: int
+    food_key: str
+    baseline: Optional[float] = None
+    peak: Optional[float] = None
+    peak_delta: Optional[float] = None
+    time_to_peak_minutes: Optional[float] = None
+    iauc: Optional[float] = Field(None, description="Aire incrémentale au-dessus de la baseline (mg/dL·min)")
+    reading_count: int = 0
+    computed_at: Optional[datetime] = None
+    class Config:
+        from_attributes = True
+
 class Meal(MealBase):
     id: int
     user_id: int
+    glucose_response: Optional[MealGlucoseResponse] = None
     class Config:
         from_attributes = True
 
@@ -102,6 +119,9 @@ class GlucoseEntry(GlucoseDataBase):
     id: int
     user_id: int
     timestamp: datetime
+    rate_of_change: Optional[float] = None  # mg/dL/min
+    trend: Optional[str] = None  # DoubleUp, SingleUp, FortyFiveUp, Flat, FortyFiveDown, SingleDown, DoubleDown
+    quality: int = 0  # Drapeaux qualité (1 doublon, 2 capteur, 4 saut, 8 compression, 16 trou) ; artefacts exclus des stats
     
     class Config:
         from_attributes = True
@@ -110,9 +130,60 @@ class CGMPing(BaseModel):
     value: float = Field(..., gt=0, description="Glucose value in mg/dL")
     timestamp: Optional[datetime] = Field(default_factory=datetime.utcnow)
     device_id: Optional[str] = "unknown"
-    trend: Optional[str] = None # e.g. "stable", "rising", "falling"
+    trend: Optional[str] = None # Ignorée : la tendance est calculée côté serveur à l'ingestion
     questionnaire: Optional[QuestionnaireBase] = Field(None, description="Contextual questionnaire data")
 
+class CGMBatchReading(BaseModel):
+    value: float = Field(..., gt=0, description="Glucose value in mg/dL")
+    timestamp: datetime
+    trend: Optional[str] = None # Ignorée, comme pour CGMPing
+
+class CGMBatch(BaseModel):
+    device_id: Optional[str] = "unknown"
+    readings: list[CGMBatchReading] = Field(..., min_length=1, max_length=2000, description="Mesures en attente (rattrapage hors ligne)")
+
+class CGMBatchItemStatus(BaseModel):
+    index: int
+    timestamp: datetime
+    status: Literal["accepted", "duplicate"]
+    id: Optional[int] = None
+
+class CGMBatchResult(BaseModel):
+    accepted: int
+    duplicates: int
+    items: list[CGMBatchItemStatus]
+
+# --- Alerts ---
+class AlertRuleBase(BaseModel):
+    kind: Literal["below", "above", "rate", "missing"]
+    threshold: Optional[float] = Field(None, description="mg/dL, ou mg/dL/min pour 'rate' (négatif = chute)")
+    duration_minutes: int = Field(0, ge=0, le=1440, description="Durée minimale de la condition (ou d'absence de données)")
+    enabled: bool = True
+
+    @model_validator(mode="after")
+    def check_rule(self):
+        if self.kind == "missing":
+            if self.duration_minutes <= 0:
+                raise ValueError("Une règle 'missing' exige duration_minutes > 0")
+        elif self.threshold is None:
+            raise ValueError(f"Une règle '{self.kind}' exige un seuil")
+        elif self.kind == "rate" and self.threshold == 0:
+            raise ValueError("Le seuil d'une règle 'rate' doit être non nul")
+        return self
+
+class AlertRule(AlertRuleBase):
+    id: int
+    model_config = ConfigDict(from_attributes=True)
+
+class GlucoseAlert(BaseModel):
+    id: int
+    rule_id: Optional[int] = None
+    kind: str
+    value: Optional[float] = None
+    timestamp: datetime
+    message: str
+    model_config = ConfigDict(from_attributes=True)
+
 # --- Analysis ---
 class CoachAction(BaseModel):
     label: str
@@ -276,6 +347,8 @@ class ChatWithHistoryRequest(BaseModel):
     image_base64: Optional[str] = Field(None, description="Image en base64")
     # Option pour charger l'historique récent depuis la DB
     load_history_from_db: bool = Field(True, description="Charger l'historique depuis la DB")
+    # Comparaison de périodes injectée dans le contexte du coach (None pour désactiver)
+    compare_window: Optional[Literal["1d", "7d", "30d"]] = Field("1d", description="Fenêtre de comparaison (1d, 7d, 30d)")
 
 
 class EnhancedAIAnalysisResponse(BaseModel):
@@ -11,6 +11,13 @@ from app.models import schemas
 from app.core.guardrails import SafetyGuardrails
 from app.core.prompts import COACH_SYSTEM_PROMPT_V2
 
+
+def _meal_response_suffix(meal) -> str:
+    response = meal.glucose_response
+    if response is None or response.peak_delta is None:
+        return ""
+    return f", pic {round(response.peak_delta):+d} mg/dL à {round(response.time_to_peak_minutes)} min"
+
 class AIService:
     def __init__(self):
         # Workaround: google-genai peut privilégier GOOGLE_API_KEY si présent
@@ -214,7 +221,10 @@ class AIService:
         # Format Meal History
         meal_context = "Pas de repas récents enregistrés."
         if anon_snapshot.recent_meals:
-            recent_meals_str = [f"- {m.timestamp.strftime('%H:%M')}: {m.name} ({m.carbs}g glucides)" for m in anon_snapshot.recent_meals[-3:]]
+            recent_meals_str = [
+                f"- {m.timestamp.strftime('%H:%M')}: {m.name} ({m.carbs}g glucides)" + _meal_response_suffix(m)
+                for m in anon_snapshot.recent_meals[-3:]
+            ]
             meal_context = "Derniers repas :\n" + "\n".join(recent_meals_str)
 
         # Build the anonymized context string
@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app.core.alerts import RuleState, UserAlertState, evaluate, check_missing, dump_rules, load_rules
+from app.models import models
+from app.models.database import upsert
+from app.services.notifier import Notifier, build_notifier
+from app.services.rollup_service import to_utc_naive
+
+_PENDING_KEY = "alerts_pending"
+
+# Règles appliquées tant que l'utilisateur n'a rien configuré : seuils d'urgence du coach
+DEFAULT_RULES = (
+    ("below", 70.0, 0),
+    ("above", 300.0, 0),
+)
+MAX_AGE = timedelta(hours=1)  # Mesures plus anciennes (import d'historique) : état mis à jour, pas de notification
+
+
+class AlertService:
+    """
+    Alertes évaluées à l'ingestion (app/core/alerts.py) :
+    - état par utilisateur persisté dans glucose_alert_states, lu et réécrit dans la transaction
+      d'ingestion (verrou de ligne) : partagé entre workers, conservé au redémarrage, annulé
+      avec la transaction en cas de rollback ;
+    - alertes enregistrées dans glucose_alerts dans la même transaction ;
+    - envoi au notifier après le commit uniquement (rien n'est envoyé en cas de rollback).
+    Les règles "missing" sont évaluées par `sweep_missing` depuis la base (dernière mesure du
+    résumé utilisateur) : un balayage par un seul planificateur, ou plusieurs sans doublon
+    (lignes d'état verrouillées, SKIP LOCKED).
+    """
+
+    def __init__(self, notifier: Notifier = None):
+        self.notifier = notifier or build_notifier()
+
+    def rules(self, db: Session, user_id: int) -> list:
+        """
+        Règles configurées de l'utilisateur, ou règles par défaut (id None) s'il n'en a aucune.
+        """
+        rows = db.query(models.AlertRule).filter(models.AlertRule.user_id == user_id).order_by(models.AlertRule.id).all()
+        if rows:
+            return rows
+        return [
+            models.AlertRule(user_id=user_id, kind=kind, threshold=threshold, duration_minutes=duration, enabled=True)
+            for kind, threshold, duration in DEFAULT_RULES
+        ]
+
+    def _compile(self, user_id: int, rules: list) -> UserAlertState:
+        return UserAlertState(user_id, [
+            RuleState(rule.id, rule.kind, rule.threshold, rule.duration_minutes) for rule in rules if rule.enabled
+        ])
+
+    def _load(self, db: Session, user_id: int, state: UserAlertState, skip_locked: bool = False):
+        """
+        Ligne d'état verrouillée (créée au besoin), état des règles restauré dans `state`.
+        None si la ligne est verrouillée par une autre transaction (`skip_locked`).
+        """
+        query = db.query(models.GlucoseAlertState).filter(models.GlucoseAlertState.user_id == user_id)
+        row = query.with_for_update(skip_locked=skip_locked).first()
+        if row is None:
+            # Première évaluation : deux ingestions concurrentes ne créent qu'une ligne
+            table = models.GlucoseAlertState.__table__
+            db.execute(
+                upsert(db, table).values(user_id=user_id, rules={}, updated_at=datetime.utcnow())
+                .on_conflict_do_nothing(index_elements=[table.c.user_id])
+            )
+            row = query.with_for_update(skip_locked=skip_locked).first()
+            if row is None:
+                return None  # Verrouillée par une autre transaction (`skip_locked`)
+        state.last_timestamp = row.last_timestamp
+        load_rules(state, row.rules)
+        return row
+
+    @staticmethod
+    def _save(row: models.GlucoseAlertState, state: UserAlertState):
+        row.last_timestamp = state.last_timestamp
+        row.rules = dump_rules(state)
+        row.updated_at = datetime.utcnow()
+
+    def _record(self, db: Session, alerts: list[dict]):
+        db.add_all([models.GlucoseAlert(**alert) for alert in alerts])
+        db.info.setdefault(_PENDING_KEY, []).extend(alerts)
+
+    def apply_entries(self, db: Session, user_id: int, entries: list[models.GlucoseEntry], now: datetime = None):
+        """
+        Évalue les règles sur les nouvelles mesures (après le calcul de tendance). Ne commit pas.
+        """
+        state = self._compile(user_id, self.rules(db, user_id))
+        if not state.rules:
+            return
+        row = self._load(db, user_id, state)
+        horizon = (now or datetime.utcnow()) - MAX_AGE
+        alerts = []
+        for entry in sorted(
+            (e for e in entries if e.timestamp is not None and e.value is not None),
+            key=lambda e: to_utc_naive(e.timestamp)
+        ):
+            ts = to_utc_naive(entry.timestamp)
+            fired = evaluate(state, ts, float(entry.value), entry.rate_of_change)
+            if fired and ts >= horizon:
+                alerts.extend(fired)
+        self._save(row, state)
+        if alerts:
+            self._record(db, alerts)
+
+    def sweep_missing(self, db: Session, now: datetime = None) -> int:
+        """
+        Évalue les règles "missing" actives de tous les utilisateurs depuis la base. Ne commit pas.
+        Retourne le nombre d'alertes émises.
+        """
+        now = now or datetime.utcnow()
+        rule, summary = models.AlertRule, models.GlucoseUserSummary
+        rows = db.execute(
+            select(rule.user_id, rule.duration_minutes, summary.last_timestamp)
+            .join(summary, summary.user_id == rule.user_id)
+            .where(rule.kind == "missing", rule.enabled.is_(True), summary.last_timestamp.isnot(None))
+        ).all()
+        candidates = {
+            user_id: last_timestamp for user_id, duration, last_timestamp in rows
+            if now - last_timestamp >= timedelta(minutes=duration or 0)
+        }
+
+        alerts = []
+        for user_id, last_timestamp in candidates.items():
+            state = self._compile(user_id, self.rules(db, user_id))
+            row = self._load(db, user_id, state, skip_locked=True)
+            if row is None:
+                continue  # Balayage concurrent en cours pour cet utilisateur
+            # Référence : dernière mesure connue de la base, quel que soit le worker qui l'a reçue
+            state.last_timestamp = max(filter(None, (state.last_timestamp, last_timestamp)))
+            fired = check_missing(state, now)
+            if fired:
+                self._save(row, state)
+                alerts.extend(fired)
+        if alerts:
+            self._record(db, alerts)
+        return len(alerts)
+
+    def dispatch(self, alerts: list[dict]):
+        try:
+            self.notifier.send(alerts)
+        except Exception as e:
+            # L'alerte reste consultable via GET /api/alerts
+            print(f"⚠️ Alert dispatch failed: {e}")
+
+alert_service = AlertService()
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending(session):
+    alerts = session.info.pop(_PENDING_KEY, None)
+    if alerts:
+        alert_service.dispatch(alerts)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
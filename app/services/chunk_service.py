@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import Session
+from app.models import models
+from app.models.records import GlucoseRow
+from app.core.quality import clean_condition
+from app.core.chunk_codec import encode_chunk, decode_chunk, to_epoch_micros, from_epoch_micros
+from app.services.rollup_service import bucket_start, to_utc_naive
+
+ONE_DAY = timedelta(days=1)
+
+
+def decode_readings(chunk_data: bytes) -> list[tuple]:
+    """
+    Blob -> [(timestamp, id, value, note, rate_of_change, trend)] trié chronologiquement.
+    """
+    timestamps, ids, values, notes, rates, trends = decode_chunk(chunk_data)
+    return [
+        (from_epoch_micros(t), entry_id, value, note, rate, trend)
+        for t, entry_id, value, note, rate, trend in zip(timestamps, ids, values, notes, rates, trends)
+    ]
+
+
+def _encode_readings(readings: list[tuple]) -> bytes:
+    return encode_chunk(
+        [to_epoch_micros(r[0]) for r in readings],
+        [r[1] for r in readings],
+        [r[2] for r in readings],
+        [r[3] for r in readings],
+        [r[4] for r in readings],
+        [r[5] for r in readings]
+    )
+
+
+class ChunkService:
+    """
+    Mode de stockage optionnel : les journées closes de glucose_entries sont
+    compactées en une ligne glucose_chunks par (utilisateur, jour UTC).
+    Les lectures (historique, séries, stats) fusionnent de façon transparente
+    les mesures brutes restantes et les chunks.
+    """
+
+    def _pack_day(self, db: Session, user_id: int, day: datetime, rows: list) -> int:
+        entry = models.GlucoseEntry
+        readings = [
+            (to_utc_naive(r.timestamp), r.id, float(r.value), r.note, r.rate_of_change, r.trend) for r in rows
+        ]
+
+        chunk = db.query(models.GlucoseChunk).filter(
+            models.GlucoseChunk.user_id == user_id,
+            models.GlucoseChunk.day == day
+        ).first()
+        if chunk is not None:
+            # Mesures arrivées en retard : fusion avec le chunk existant
+            known_ids = {r[1] for r in readings}
+            readings += [r for r in decode_readings(chunk.data) if r[1] not in known_ids]
+        else:
+            chunk = models.GlucoseChunk(user_id=user_id, day=day)
+            db.add(chunk)
+
+        readings.sort(key=lambda r: (r[0], r[1]))
+        chunk.data = _encode_readings(readings)
+        chunk.reading_count = len(readings)
+        chunk.first_timestamp = readings[0][0]
+        chunk.last_timestamp = readings[-1][0]
+
+        db.execute(delete(entry).where(entry.id.in_([r.id for r in rows])))
+        return len(rows)
+
+    def pack_user(self, db: Session, user_id: int, before: datetime) -> dict:
+        """
+        Compacte toutes les journées UTC closes antérieures au jour de `before`.
+        Une requête par jour (plage d'index user_id/timestamp). Ne commit pas.
+        """
+        entry = models.GlucoseEntry
+        before_day = bucket_start(before, "1d")
+        first = db.query(func.min(entry.timestamp)).filter(
+            entry.user_id == user_id,
+            entry.timestamp < before_day,
+            clean_condition(entry.quality)
+        ).scalar()
+        if first is None:
+            return {"days": 0, "readings": 0}
+
+        days = 0
+        packed = 0
+        day = bucket_start(first, "1d")
+        while day < before_day:
+            rows = db.execute(
+                select(entry.id, entry.timestamp, entry.value, entry.note, entry.rate_of_change, entry.trend).where(
+                    entry.user_id == user_id,
+                    entry.timestamp >= day,
+                    entry.timestamp < day + ONE_DAY,
+                    entry.value.isnot(None),
+                    clean_condition(entry.quality)
+                )
+            ).all()
+            if rows:
+                packed += self._pack_day(db, user_id, day, rows)
+                days += 1
+            day += ONE_DAY
+        return {"days": days, "readings": packed}
+
+    def unpack_user(self, db: Session, user_id: int) -> int:
+        """
+        Opération inverse : restaure les mesures brutes (ids d'origine) et supprime les chunks.
+        """
+        chunks = db.query(models.GlucoseChunk).filter(models.GlucoseChunk.user_id == user_id).all()
+        restored = 0
+        for chunk in chunks:
+            readings = decode_readings(chunk.data)
+            db.bulk_insert_mappings(models.GlucoseEntry, [
+                {"id": entry_id, "user_id": user_id, "timestamp": ts, "value": value, "note": note,
+                 "rate_of_change": rate, "trend": trend}
+                for ts, entry_id, value, note, rate, trend in readings
+            ])
+            restored += len(readings)
+            db.delete(chunk)
+        return restored
+
+    def has_chunk(self, db: Session, user_id: int, day: datetime) -> bool:
+        return db.query(models.GlucoseChunk.id).filter(
+            models.GlucoseChunk.user_id == user_id,
+            models.GlucoseChunk.day == day
+        ).first() is not None
+
+    def iter_readings(self, db: Session, user_id: int, start: datetime = None, end: datetime = None):
+        """
+        Mesures compactées de [start, end), dans l'ordre chronologique.
+        """
+        chunk = models.GlucoseChunk
+        query = select(chunk.data).where(chunk.user_id == user_id).order_by(chunk.day)
+        if start is not None:
+            query = query.where(chunk.day >= bucket_start(start, "1d"))
+        if end is not None:
+            query = query.where(chunk.day < end)
+
+        start = to_utc_naive(start) if start is not None else None
+        end = to_utc_naive(end) if end is not None else None
+        for (data,) in db.execute(query):
+            for reading in decode_readings(data):
+                if start is not None and reading[0] < start:
+                    continue
+                if end is not None and reading[0] >= end:
+                    continue
+                yield reading
+
+    def history_page(self, db: Session, user_id: int, limit: int, before: tuple = None,
+                     after: tuple = None, bound: datetime = None) -> list[GlucoseRow]:
+        """
+        Mesures compactées d'une page d'historique, au plus `limit`, strictement avant
+        (ordre décroissant) ou après (ordre croissant) le curseur (timestamp, id).
+        `bound` : timestamp de la dernière mesure brute d'une page déjà pleine ;
+        seuls les chunks susceptibles de la concurrencer sont alors décodés.
+        """
+        chunk = models.GlucoseChunk
+        query = select(chunk.data).where(chunk.user_id == user_id)
+        if after is not None:
+            query = query.where(chunk.last_timestamp >= after[0]).order_by(chunk.day.asc())
+            if bound is not None:
+                query = query.where(chunk.first_timestamp <= bound)
+        else:
+            if before is not None:
+                query = query.where(chunk.day <= before[0])
+            if bound is not None:
+                query = query.where(chunk.last_timestamp >= bound)
+            query = query.order_by(chunk.day.desc())
+
+        page = []
+        for (data,) in db.execute(query):
+            readings = decode_readings(data)
+            if after is not None:
+                readings = [r for r in readings if (r[0], r[1]) > after]
+            else:
+                readings.reverse()
+                if before is not None:
+                    readings = [r for r in readings if (r[0], r[1]) < before]
+            page.extend(readings)
+            if len(page) >= limit:
+                break
+
+        return [
+            GlucoseRow(entry_id, user_id, value, ts, note, rate, trend)
+            for ts, entry_id, value, note, rate, trend in page[:limit]
+        ]
+
+chunk_service = ChunkService()
@@ -0,0 +1,262 @@
+import math
+import os
+from datetime import datetime
+import numpy as np
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import LOW, HIGH
+from app.models import models
+from app.services import glucose_reader
+from app.services.retention_service import retention_service
+from app.services.rollup_service import bucket_start, to_utc_naive
+
+
+def month_start(ts: datetime) -> datetime:
+    return bucket_start(ts, "1d").replace(day=1)
+
+
+def next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def _month_stats(month: datetime, count: int, total: float, total_sq: float, low: int, high: int, source: str) -> dict:
+    mean = total / count
+    sd = math.sqrt(max(total_sq / count - mean * mean, 0.0))
+    return {
+        "month": month,
+        "source": source,
+        "count": count,
+        "mean": round(mean, 1),
+        "sd": round(sd, 1),
+        "cv": round(sd / mean * 100, 1) if mean else None,
+        "tir": round((count - low - high) / count * 100, 1),
+        "tbr": round(low / count * 100, 1),
+        "tar": round(high / count * 100, 1),
+        "gmi": round(3.31 + 0.02392 * mean, 2),
+    }
+
+
+class ColdTierService:
+    """
+    Tier froid : mois clos exportés en Parquet sur disque local, un fichier par utilisateur
+    et par mois (partitionnement Hive : user_id=<id>/month=<YYYY-MM>/data.parquet), et requêtes
+    longues (tendances annuelles, cohortes) exécutées par DuckDB embarqué sur ces fichiers.
+    Les mois non archivés (mois courant, archivage en retard) sont lus dans la base vive via
+    les agrégats journaliers. pyarrow et duckdb sont importés à l'usage (dépendances optionnelles).
+    Chaque ligne Parquet porte ses totaux (nombre de mesures, somme, somme des carrés, bas, hauts) :
+    une mesure brute vaut une ligne de nombre 1, un agrégat de rétention 15 min garde ses totaux.
+    Nombre de mesures et SD ont donc la même sémantique exacte que les agrégats journaliers.
+    Le manifeste glucose_cold_months fait foi pour la lecture (aucun accès aux agrégats vifs) :
+    une mesure tardive dans un mois exporté supprime sa ligne de manifeste à l'ingestion, et le
+    job d'archivage ré-exporte les mois absents du manifeste ou dont les totaux ont changé.
+    """
+
+    def __init__(self, directory: str, enabled: bool = False):
+        self.directory = directory
+        self.enabled = enabled
+
+    def month_path(self, user_id: int, month: datetime) -> str:
+        return os.path.join(self.directory, f"user_id={user_id}", f"month={month:%Y-%m}", "data.parquet")
+
+    def _monthly_totals(self, db: Session, user_id: int, start: datetime = None, end: datetime = None) -> dict:
+        """
+        {mois: (nombre, somme, somme des carrés, bas, hauts)} depuis les agrégats journaliers.
+        """
+        rollup = models.GlucoseRollup
+        conditions = [rollup.user_id == user_id, rollup.resolution == "1d", rollup.value_count > 0]
+        if start is not None:
+            conditions.append(rollup.bucket_start >= start)
+        if end is not None:
+            conditions.append(rollup.bucket_start < end)
+        totals = {}
+        rows = db.execute(
+            select(rollup.bucket_start, rollup.value_count, rollup.value_sum, rollup.value_sum_sq,
+                   rollup.low_count, rollup.high_count).where(*conditions)
+        ).all()
+        for day, count, total, total_sq, low, high in rows:
+            month = month_start(day)
+            previous = totals.get(month, (0, 0.0, 0.0, 0, 0))
+            totals[month] = (previous[0] + count, previous[1] + total, previous[2] + (total_sq or 0.0),
+                             previous[3] + (low or 0), previous[4] + (high or 0))
+        return totals
+
+    def _month_columns(self, db: Session, user_id: int, month: datetime) -> dict:
+        """
+        Colonnes du fichier d'un mois : mesures brutes / compactées (nombre 1) et
+        agrégats de rétention 15 min (totaux conservés), triés chronologiquement.
+        """
+        end = next_month(month)
+        archived_until = retention_service.archived_until(db, user_id)
+        raw_start = month if archived_until is None else min(max(month, archived_until), end)
+        timestamps, values = glucose_reader.load_series(db, user_id, raw_start, end)
+
+        aggregate = models.GlucoseAggregate
+        rows = db.execute(
+            select(aggregate.bucket_start, aggregate.value_count, aggregate.value_mean, aggregate.value_sum_sq,
+                   aggregate.low_count, aggregate.high_count)
+            .where(aggregate.user_id == user_id, aggregate.bucket_start >= month, aggregate.bucket_start < raw_start)
+            .order_by(aggregate.bucket_start)
+        ).all()
+        counts = np.array([r[1] or 0 for r in rows], dtype=np.int64)
+        means = np.array([r[2] for r in rows], dtype=np.float64)
+        bucket_seconds = np.array([to_utc_naive(r[0]) for r in rows], dtype="datetime64[s]").astype(np.int64)
+        return {
+            "timestamp": np.concatenate([bucket_seconds, timestamps]).astype("datetime64[s]"),
+            "value": np.concatenate([means, values]),
+            "count": np.concatenate([counts, np.ones(values.size, dtype=np.int64)]),
+            "value_sum": np.concatenate([means * counts, values]),
+            "value_sum_sq": np.concatenate([np.array([r[3] or 0.0 for r in rows], dtype=np.float64), values * values]),
+            "low_count": np.concatenate([np.array([r[4] or 0 for r in rows], dtype=np.int64), (values < LOW).astype(np.int64)]),
+            "high_count": np.concatenate([np.array([r[5] or 0 for r in rows], dtype=np.int64), (values > HIGH).astype(np.int64)]),
+        }
+
+    def _write_month(self, db: Session, user_id: int, month: datetime) -> int:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = self._month_columns(db, user_id, month)
+        table = pa.table({
+            "timestamp": pa.array(columns["timestamp"], type=pa.timestamp("us")),
+            "value": pa.array(columns["value"], type=pa.float64()),
+            "count": pa.array(columns["count"], type=pa.int32()),
+            "value_sum": pa.array(columns["value_sum"], type=pa.float64()),
+            "value_sum_sq": pa.array(columns["value_sum_sq"], type=pa.float64()),
+            "low_count": pa.array(columns["low_count"], type=pa.int32()),
+            "high_count": pa.array(columns["high_count"], type=pa.int32()),
+        })
+        path = self.month_path(user_id, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        return table.num_rows
+
+    def archive_user(self, db: Session, user_id: int, now: datetime = None) -> dict:
+        """
+        Exporte les mois clos nouveaux ou modifiés depuis leur export. Ne commit pas
+        (le manifeste est mis à jour dans la transaction de l'appelant, fichiers écrits avant).
+        """
+        current_month = month_start(now or datetime.utcnow())
+        totals = self._monthly_totals(db, user_id, end=current_month)
+        manifest = {
+            row.month: row for row in db.query(models.GlucoseColdMonth).filter(models.GlucoseColdMonth.user_id == user_id)
+        }
+        months = readings = 0
+        for month in sorted(totals):
+            count, total = totals[month][0], totals[month][1]
+            row = manifest.get(month)
+            if row is not None and row.reading_count == count and abs(row.value_sum - total) < 1e-6 \
+                    and os.path.exists(self.month_path(user_id, month)):
+                continue
+            rows = self._write_month(db, user_id, month)
+            if row is None:
+                row = models.GlucoseColdMonth(user_id=user_id, month=month)
+                db.add(row)
+            row.reading_count = count
+            row.value_sum = total
+            row.row_count = rows
+            row.exported_at = datetime.utcnow()
+            months += 1
+            readings += rows
+        return {"months": months, "readings": readings}
+
+    def archived_months(self, db: Session, user_id: int, start: datetime, end: datetime) -> list[datetime]:
+        """
+        Mois de [start, end) présents au manifeste et dont le fichier Parquet existe.
+        Le manifeste est tenu à jour à l'ingestion (apply_entries) : aucun accès aux agrégats vifs.
+        """
+        if not self.enabled:
+            return []
+        cold = models.GlucoseColdMonth
+        months = db.execute(
+            select(cold.month).where(cold.user_id == user_id, cold.month >= start, cold.month < end)
+        ).scalars().all()
+        return sorted(month for month in months if os.path.exists(self.month_path(user_id, month)))
+
+    def apply_entries(self, db: Session, user_id: int, entries: list[models.GlucoseEntry]):
+        """
+        Mesures tardives dans un mois clos : le mois sort du manifeste (lu depuis la base vive
+        jusqu'au prochain export). Aucune requête pour les mesures du mois courant.
+        """
+        if not self.enabled:
+            return
+        current_month = month_start(datetime.utcnow())
+        late = {month_start(e.timestamp) for e in entries if e.timestamp is not None and to_utc_naive(e.timestamp) < current_month}
+        if late:
+            cold = models.GlucoseColdMonth
+            db.execute(delete(cold).where(cold.user_id == user_id, cold.month.in_(late)))
+
+    def _query_archive(self, paths: list[str]) -> list[tuple]:
+        import duckdb
+
+        with duckdb.connect() as conn:
+            return conn.execute("""
+                SELECT date_trunc('month', "timestamp") AS month,
+                       sum("count"), sum(value_sum), sum(value_sum_sq), sum(low_count), sum(high_count)
+                FROM read_parquet(?)
+                GROUP BY 1 ORDER BY 1
+            """, [paths]).fetchall()
+
+    def monthly_stats(self, db: Session, user_id: int, start: datetime, end: datetime = None) -> list[dict]:
+        """
+        Statistiques mensuelles (moyenne, SD, CV, TIR/TBR/TAR, GMI) de [start, end), mois entiers.
+        Mois archivés : DuckDB sur les Parquet seuls ; autres mois : agrégats journaliers de la base vive
+        (lus uniquement à partir du premier mois non archivé). Mêmes totaux exacts pour les deux sources.
+        """
+        start = month_start(start)
+        end = next_month(month_start(end or datetime.utcnow()))
+        archived = self.archived_months(db, user_id, start, end)
+
+        result = {}
+        if archived:
+            paths = [self.month_path(user_id, month) for month in archived]
+            for month, count, total, total_sq, low, high in self._query_archive(paths):
+                if count:
+                    month = month_start(month)
+                    result[month] = _month_stats(month, count, total, total_sq, low, high, "archive")
+
+        live_start = start
+        while live_start < end and live_start in archived:
+            live_start = next_month(live_start)
+        if live_start < end:
+            for month, (count, total, total_sq, low, high) in self._monthly_totals(db, user_id, live_start, end).items():
+                if month not in archived and count:
+                    result[month] = _month_stats(month, count, total, total_sq, low, high, "live")
+        return [result[month] for month in sorted(result)]
+
+    def cohort_stats(self, start: datetime, end: datetime) -> list[dict]:
+        """
+        Statistiques de cohorte sur les mois archivés de [start, end) : par mois, nombre
+        d'utilisateurs, médiane et quartiles de la glycémie moyenne et du TIR par utilisateur.
+        Lit tous les fichiers du tier froid (partitions Hive user_id / month), sans la base vive.
+        """
+        import duckdb
+
+        pattern = os.path.join(self.directory, "user_id=*", "month=*", "data.parquet")
+        with duckdb.connect() as conn:
+            rows = conn.execute("""
+                WITH per_user AS (
+                    SELECT user_id, date_trunc('month', "timestamp") AS month,
+                           sum(value_sum) / sum("count") AS mean,
+                           100.0 * (sum("count") - sum(low_count) - sum(high_count)) / sum("count") AS tir
+                    FROM read_parquet(?, hive_partitioning = true)
+                    WHERE "timestamp" >= ? AND "timestamp" < ?
+                    GROUP BY 1, 2
+                )
+                SELECT month, count(*),
+                       quantile_cont(mean, [0.25, 0.5, 0.75]),
+                       quantile_cont(tir, [0.25, 0.5, 0.75])
+                FROM per_user GROUP BY 1 ORDER BY 1
+            """, [pattern, start, end]).fetchall()
+        return [
+            {
+                "month": month_start(month),
+                "users": users,
+                "mean_quartiles": [round(v, 1) for v in mean_q],
+                "tir_quartiles": [round(v, 1) for v in tir_q],
+            }
+            for month, users, mean_q, tir_q in rows
+        ]
+
+cold_tier_service = ColdTierService(settings.COLD_TIER_DIR, enabled=settings.COLD_TIER_ENABLED)
@@ -0,0 +1,111 @@
+import math
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import Session
+from app.models import models
+from app.services.rollup_service import bucket_start
+from app.services.event_service import event_service, KINDS
+
+WINDOWS = {"1d": 1, "7d": 7, "30d": 30}
+METRICS = ("tir", "tbr", "tar", "mean", "cv", "low_episodes", "high_episodes")
+
+
+def window_bounds(window: str, now: datetime = None) -> tuple[datetime, datetime, datetime]:
+    """
+    (début période précédente, début période courante, fin) alignés sur les jours UTC.
+    La période courante inclut la journée en cours : "1d" compare aujourd'hui à hier.
+    """
+    days = WINDOWS[window]
+    today = bucket_start(now or datetime.utcnow(), "1d")
+    current_start = today - timedelta(days=days - 1)
+    return current_start - timedelta(days=days), current_start, today + timedelta(days=1)
+
+
+def _period_metrics(row, start: datetime, end: datetime, episodes: dict) -> dict:
+    n = int(row.n or 0) if row is not None else 0
+    metrics = {"start": start, "end": end, "count": n, **{m: None for m in METRICS[:5]}}
+    if n:
+        mean = row.s / n
+        variance = max(row.sq / n - mean * mean, 0.0)
+        metrics.update({
+            "tir": round(row.normal / n * 100, 1),
+            "tbr": round(row.low / n * 100, 1),
+            "tar": round(row.high / n * 100, 1),
+            "mean": round(mean, 1),
+            "cv": round(math.sqrt(variance) / mean * 100, 1) if mean else None,
+        })
+    metrics["low_episodes"] = episodes["low"]
+    metrics["high_episodes"] = episodes["high"]
+    return metrics
+
+
+class ComparisonService:
+    """
+    Comparaison période courante / période précédente (TIR, moyenne, CV, épisodes).
+    Les deux périodes sont lues en une seule passe sur les agrégats journaliers
+    (GROUP BY sur un CASE de période, au plus 2 x 30 lignes de glucose_rollups).
+    """
+
+    def compare(self, db: Session, user_id: int, window: str, now: datetime = None, events: list[dict] = None) -> dict:
+        """
+        `events` : épisodes déjà chargés (event_service.list_events depuis au moins le début
+        de la période précédente) pour éviter une seconde lecture ; sinon ils sont lus ici.
+        """
+        previous_start, current_start, end = window_bounds(window, now)
+
+        rollup = models.GlucoseRollup
+        period = case((rollup.bucket_start >= current_start, "current"), else_="previous").label("period")
+        rows = db.execute(
+            select(
+                period,
+                func.sum(rollup.value_count).label("n"),
+                func.sum(rollup.value_sum).label("s"),
+                func.sum(rollup.value_sum_sq).label("sq"),
+                func.sum(rollup.low_count).label("low"),
+                func.sum(rollup.normal_count).label("normal"),
+                func.sum(rollup.high_count).label("high")
+            ).where(
+                rollup.user_id == user_id,
+                rollup.resolution == "1d",
+                rollup.bucket_start >= previous_start,
+                rollup.bucket_start < end
+            ).group_by(period)
+        ).all()
+        by_period = {row.period: row for row in rows}
+
+        if events is None:
+            events = event_service.list_events(db, user_id, previous_start)
+        episodes = {"current": dict.fromkeys(KINDS, 0), "previous": dict.fromkeys(KINDS, 0)}
+        for e in events:
+            if previous_start <= e["start_time"] < end:
+                episodes["current" if e["start_time"] >= current_start else "previous"][e["kind"]] += 1
+
+        current = _period_metrics(by_period.get("current"), current_start, end, episodes["current"])
+        previous = _period_metrics(by_period.get("previous"), previous_start, current_start, episodes["previous"])
+        delta = {
+            m: round(current[m] - previous[m], 1) if current[m] is not None and previous[m] is not None else None
+            for m in METRICS
+        }
+        return {"window": window, "current": current, "previous": previous, "delta": delta}
+
+    def format_context(self, comparison: dict) -> str:
+        """
+        Lignes de contexte coach : deltas en points de pourcentage / mg/dL, signe explicite.
+        """
+        label = {"1d": "aujourd'hui vs hier", "7d": "7 derniers jours vs 7 précédents",
+                 "30d": "30 derniers jours vs 30 précédents"}[comparison["window"]]
+        current, previous, delta = comparison["current"], comparison["previous"], comparison["delta"]
+        if not current["count"] or not previous["count"]:
+            return f"\n📈 ÉVOLUTION ({label}): données insuffisantes pour comparer.\n"
+
+        return (
+            f"\n📈 ÉVOLUTION ({label}):\n"
+            f"- TIR: {current['tir']}% vs {previous['tir']}% ({delta['tir']:+} pts)\n"
+            f"- Temps bas: {current['tbr']}% vs {previous['tbr']}% ({delta['tbr']:+} pts)\n"
+            f"- Moyenne: {current['mean']} vs {previous['mean']} mg/dL ({delta['mean']:+} mg/dL)\n"
+            f"- CV: {current['cv']}% vs {previous['cv']}%\n"
+            f"- Épisodes hypo: {current['low_episodes']} vs {previous['low_episodes']}, "
+            f"hyper: {current['high_episodes']} vs {previous['high_episodes']}\n"
+        )
+
+comparison_service = ComparisonService()
@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from app.models import models
+from app.services.rollup_service import TIR_LOW, TIR_HIGH, to_utc_naive
+from app.services.summary_service import summary_service
+from app.services import glucose_reader
+
+MIN_DURATION = timedelta(minutes=15)  # Consensus : un épisode dure au moins 15 minutes
+MAX_GAP = timedelta(minutes=30)  # Au-delà, trou capteur : l'épisode est clos à la dernière mesure
+READING_INTERVAL = timedelta(minutes=5)
+NIGHT_HOURS = (0, 6)  # Heure locale [00:00, 06:00)
+
+KINDS = ("low", "high")
+
+
+class EventService:
+    """
+    Moteur d'épisodes hypo / hyper, alimenté à l'ingestion :
+    - un épisode s'ouvre à la première mesure hors cible (seuils du Questionnaire,
+      70-180 mg/dL par défaut) et se ferme à la première mesure revenue en cible ;
+    - nadir / pic et nombre de mesures sont suivis au fil de l'eau ;
+    - un épisode clos de moins de 15 minutes est considéré comme du bruit et supprimé ;
+    - après un trou capteur de plus de 30 minutes, l'épisode est clos à sa dernière mesure :
+      à la prochaine ingestion, et dès la lecture (`list_events`) si le capteur reste muet.
+    Les épisodes sont persistés dans glucose_events (index user_id, kind, start_time).
+    """
+
+    def thresholds(self, db: Session, user_id: int) -> tuple[float, float]:
+        questionnaire = db.query(models.Questionnaire).filter(models.Questionnaire.user_id == user_id).first()
+        low = questionnaire.target_glucose_min if questionnaire and questionnaire.target_glucose_min else TIR_LOW
+        high = questionnaire.target_glucose_max if questionnaire and questionnaire.target_glucose_max else TIR_HIGH
+        return float(low), float(high)
+
+    def _close(self, db: Session, event: models.GlucoseEvent, end: datetime):
+        event.end_time = end
+        if end - event.start_time < MIN_DURATION:
+            if inspect(event).pending:
+                db.expunge(event)
+            else:
+                db.delete(event)
+
+    def _feed(self, db: Session, user_id: int, open_events: dict, points, low: float, high: float):
+        for ts, value in points:
+            for kind, out_of_range, threshold in (("low", value < low, low), ("high", value > high, high)):
+                event = open_events.get(kind)
+                if event is not None and ts - event.last_timestamp > MAX_GAP:
+                    self._close(db, event, event.last_timestamp + READING_INTERVAL)
+                    event = open_events[kind] = None
+
+                if out_of_range:
+                    if event is None:
+                        event = models.GlucoseEvent(
+                            user_id=user_id, kind=kind, threshold=threshold, start_time=ts,
+                            extreme_value=value, extreme_time=ts, reading_count=0
+                        )
+                        db.add(event)
+                        open_events[kind] = event
+                    event.last_timestamp = ts
+                    event.reading_count += 1
+                    if (value < event.extreme_value) if kind == "low" else (value > event.extreme_value):
+                        event.extreme_value = value
+                        event.extreme_time = ts
+                elif event is not None:
+                    self._close(db, event, ts)
+                    open_events[kind] = None
+
+    def _open_events(self, db: Session, user_id: int) -> dict:
+        rows = db.query(models.GlucoseEvent).filter(
+            models.GlucoseEvent.user_id == user_id,
+            models.GlucoseEvent.end_time.is_(None)
+        ).all()
+        return {row.kind: row for row in rows}
+
+    def apply_entries(self, db: Session, user_id: int, entries: list[models.GlucoseEntry]):
+        """
+        Fait avancer les épisodes avec les nouvelles mesures. Ne commit pas.
+        Doit être appelé avant la mise à jour du résumé utilisateur : les mesures antérieures
+        à la dernière mesure connue (re-sync tardive) sont ignorées ici et ne sont prises
+        en compte que par `rebuild_user`.
+        """
+        summary = summary_service.get(db, user_id)
+        cursor = summary.last_timestamp if summary is not None else None
+        points = sorted(
+            (to_utc_naive(e.timestamp), float(e.value)) for e in entries
+            if e.timestamp is not None and e.value is not None
+        )
+        if cursor is not None:
+            points = [p for p in points if p[0] > cursor]
+        if not points:
+            return
+
+        low, high = self.thresholds(db, user_id)
+        self._feed(db, user_id, self._open_events(db, user_id), points, low, high)
+
+    def rebuild_user(self, db: Session, user_id: int) -> int:
+        """
+        Recalcule tous les épisodes d'un utilisateur depuis sa série complète (backfill). Ne commit pas.
+        """
+        db.query(models.GlucoseEvent).filter(models.GlucoseEvent.user_id == user_id).delete(synchronize_session=False)
+        timestamps, values = glucose_reader.load_series(db, user_id, datetime(1970, 1, 1))
+        low, high = self.thresholds(db, user_id)
+        points = zip(timestamps.astype("datetime64[s]").tolist(), values.tolist())
+        self._feed(db, user_id, {}, points, low, high)
+        db.flush()
+        return db.query(models.GlucoseEvent).filter(models.GlucoseEvent.user_id == user_id).count()
+
+    def list_events(self, db: Session, user_id: int, start: datetime, kind: str = None,
+                    nocturnal: bool = False, tz_offset_minutes: int = 0, now: datetime = None) -> list[dict]:
+        """
+        Épisodes commencés depuis `start` (lecture par l'index user_id / kind / start_time).
+        `nocturnal` : début entre 00:00 et 06:00, heure locale.
+        Un épisode ouvert sans mesure depuis plus de MAX_GAP est rendu clos à sa dernière
+        mesure (ou écarté s'il dure moins de 15 minutes), comme le fera la prochaine ingestion.
+        """
+        now = now or datetime.utcnow()
+        event = models.GlucoseEvent
+        query = db.query(event).filter(event.user_id == user_id)
+        if kind is not None:
+            query = query.filter(event.kind == kind)
+        rows = query.filter(event.start_time >= start).order_by(event.start_time.desc()).all()
+
+        offset = timedelta(minutes=tz_offset_minutes)
+        result = []
+        for row in rows:
+            local_hour = (row.start_time + offset).hour
+            is_nocturnal = NIGHT_HOURS[0] <= local_hour < NIGHT_HOURS[1]
+            if nocturnal and not is_nocturnal:
+                continue
+            end_time = row.end_time
+            if end_time is None and now - row.last_timestamp > MAX_GAP:
+                end_time = row.last_timestamp + READING_INTERVAL
+                if end_time - row.start_time < MIN_DURATION:
+                    continue
+            end = end_time or row.last_timestamp + READING_INTERVAL
+            result.append({
+                "id": row.id,
+                "kind": row.kind,
+                "start_time": row.start_time,
+                "end_time": end_time,
+                "ongoing": end_time is None,
+                "duration_minutes": round((end - row.start_time).total_seconds() / 60),
+                "extreme_value": row.extreme_value,
+                "extreme_time": row.extreme_time,
+                "threshold": row.threshold,
+                "reading_count": row.reading_count,
+                "nocturnal": is_nocturnal,
+            })
+        return result
+
+    def summarize(self, events: list[dict]) -> dict:
+        """
+        Synthèse par type d'épisode (nombre, dont nocturnes, durée moyenne, extrême).
+        """
+        summary = {}
+        for kind in KINDS:
+            selected = [e for e in events if e["kind"] == kind]
+            if not selected:
+                summary[kind] = {"count": 0}
+                continue
+            pick = min if kind == "low" else max
+            summary[kind] = {
+                "count": len(selected),
+                "nocturnal": sum(1 for e in selected if e["nocturnal"]),
+                "avg_duration_minutes": round(sum(e["duration_minutes"] for e in selected) / len(selected)),
+                "extreme_value": pick(e["extreme_value"] for e in selected),
+            }
+        return summary
+
+event_service = EventService()
@@ -0,0 +1,152 @@
+import csv
+import heapq
+import io
+import json
+from datetime import datetime
+from operator import itemgetter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models import models
+from app.services.chunk_service import chunk_service
+from app.services.retention_service import retention_service
+from app.services.rollup_service import to_utc_naive
+
+BATCH_SIZE = 1000  # Lignes lues par aller-retour curseur et écrites par bloc (CSV/NDJSON) ou row group (Parquet)
+COLUMNS = ("timestamp", "value", "note")
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def iter_readings(db: Session, user_id: int, start: datetime = None, end: datetime = None):
+    """
+    (timestamp UTC naïf, valeur, note) de [start, end) dans l'ordre chronologique.
+    Mesures brutes lues par curseur serveur (yield_per), fusionnées à la volée avec les
+    journées compactées (décodées une par une) et les agrégats de rétention.
+    Mémoire constante quelle que soit la plage.
+    """
+    entry = models.GlucoseEntry
+    conditions = [entry.user_id == user_id, entry.value.isnot(None)]
+    if start is not None:
+        conditions.append(entry.timestamp >= start)
+    if end is not None:
+        conditions.append(entry.timestamp < end)
+
+    raw = db.execute(
+        select(entry.timestamp, entry.value, entry.note)
+        .where(*conditions)
+        .order_by(entry.timestamp, entry.id)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    return heapq.merge(
+        ((to_utc_naive(ts), value, note) for ts, value, note in raw),
+        ((r[0], r[2], r[3]) for r in chunk_service.iter_readings(db, user_id, start, end)),
+        ((ts, value, "Moyenne 15 min") for ts, value in retention_service.iter_points(db, user_id, start, end)),
+        key=itemgetter(0)
+    )
+
+
+def _batches(readings):
+    batch = []
+    for reading in readings:
+        batch.append(reading)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_csv(readings):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for batch in _batches(readings):
+        writer.writerows((ts.isoformat(), value, note) for ts, value, note in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()  # Export vide : en-tête seul
+
+
+def iter_ndjson(readings):
+    for batch in _batches(readings):
+        yield "".join(
+            json.dumps({"timestamp": ts.isoformat(), "value": value, "note": note}, ensure_ascii=False) + "\n"
+            for ts, value, note in batch
+        )
+
+
+class _StreamSink(io.RawIOBase):
+    """
+    Fichier en écriture seule pour ParquetWriter : les octets écrits sont récupérés
+    (drain) après chaque row group, tell() reste la position absolue dans le fichier.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_parquet(readings):
+    """
+    Parquet écrit row group par row group (BATCH_SIZE lignes) : chaque groupe est envoyé
+    dès qu'il est écrit, seul le footer est émis à la fin.
+    Nécessite pyarrow (ImportError levée avant le début du flux).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("value", pa.float64()),
+        ("note", pa.string()),
+    ])
+
+    def generate():
+        sink = _StreamSink()
+        with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+            for batch in _batches(readings):
+                timestamps, values, notes = zip(*batch)
+                writer.write_table(pa.table([list(timestamps), list(values), list(notes)], schema=schema))
+                yield sink.drain()
+        yield sink.drain()
+
+    return generate()
+
+
+def stream_export(db: Session, user_id: int, fmt: str, start: datetime = None, end: datetime = None):
+    """
+    Générateur d'octets/texte de l'export au format `fmt` (csv, ndjson, parquet).
+    La session est fermée à la fin du flux (la réponse survit à l'appel de l'endpoint).
+    """
+    writer = {"csv": iter_csv, "ndjson": iter_ndjson, "parquet": iter_parquet}[fmt]
+    content = writer(iter_readings(db, user_id, start, end))
+
+    def generate():
+        try:
+            yield from content
+        finally:
+            db.close()
+
+    return generate()
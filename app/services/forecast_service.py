@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core import forecast
+from app.models import models
+from app.services.rollup_service import bucket_start, to_utc_naive
+from app.services import glucose_reader
+
+STEP = timedelta(minutes=forecast.STEP_MINUTES)
+MAX_GAP_STEPS = 6  # Trou > 30 min : l'historique repart de zéro (les coefficients sont conservés)
+MIN_UPDATES = 24  # 2 h de données ajustées avant de publier une prévision
+REBUILD_DAYS = 14
+STALE_AFTER = STEP * MAX_GAP_STEPS  # Dernier point plus ancien : prévision non publiée
+
+
+def _to_array(blob: bytes, shape) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float64).reshape(shape).copy()
+
+
+class ForecastService:
+    """
+    Prévision 30 / 60 minutes (app/core/forecast.py) ajustée à l'ingestion.
+    État par utilisateur dans glucose_forecast_models : coefficients, covariance RLS,
+    derniers points de la grille 5 minutes et erreur à 1 pas. Une mesure coûte une
+    lecture par clé primaire et une mise à jour O(p²), quel que soit l'historique.
+    """
+
+    def _load(self, db: Session, user_id: int):
+        row = db.get(models.GlucoseForecastModel, user_id)
+        k = forecast.ORDER + 1
+        if row is None:
+            theta, covariance = forecast.initial_state()
+            row = models.GlucoseForecastModel(user_id=user_id, update_count=0, error_sq=0.0)
+            db.add(row)
+            history = np.empty(0)
+        else:
+            theta = _to_array(row.coefficients, (k,))
+            covariance = _to_array(row.covariance, (k, k))
+            history = np.frombuffer(row.history, dtype=np.float64).copy() if row.history else np.empty(0)
+        return row, theta, covariance, history
+
+    def _feed(self, row, theta, covariance, history, points):
+        """
+        Pousse les mesures (timestamp, valeur) triées sur la grille 5 minutes.
+        Une mesure par pas (la première) ; pas manquants (<= 30 min) interpolés linéairement.
+        """
+        last_bucket = row.last_bucket
+        for ts, value in points:
+            bucket = bucket_start(ts, "5m")
+            if last_bucket is not None and bucket <= last_bucket:
+                continue
+            z = float(forecast.normalize(value))
+            steps = int((bucket - last_bucket) / STEP) if last_bucket is not None else 0
+            if last_bucket is None or steps > MAX_GAP_STEPS or history.size == 0:
+                grid = [z]
+                history = np.empty(0)
+            else:
+                previous = history[-1]
+                grid = [previous + (z - previous) * i / steps for i in range(1, steps + 1)]
+
+            for target in grid:
+                if history.size == forecast.ORDER:
+                    error = float(forecast.rls_update(theta, covariance, history, target))
+                    row.error_sq = (1 - forecast.ERROR_DECAY) * (row.error_sq or 0.0) + forecast.ERROR_DECAY * error * error
+                    row.update_count = (row.update_count or 0) + 1
+                history = np.append(history, target)[-forecast.ORDER:]
+            last_bucket = bucket
+
+        row.last_bucket = last_bucket
+        row.coefficients = theta.tobytes()
+        row.covariance = covariance.tobytes()
+        row.history = history.tobytes()
+
+    def apply_entries(self, db: Session, user_id: int, entries: list[models.GlucoseEntry]):
+        """
+        Met à jour le modèle de l'utilisateur avec les nouvelles mesures. Ne commit pas.
+        Les mesures antérieures au dernier pas traité (re-sync tardive) sont ignorées.
+        """
+        points = sorted(
+            (to_utc_naive(e.timestamp), float(e.value)) for e in entries
+            if e.timestamp is not None and e.value is not None
+        )
+        if not points:
+            return
+        row, theta, covariance, history = self._load(db, user_id)
+        if row.last_bucket is not None and bucket_start(points[-1][0], "5m") <= row.last_bucket:
+            return
+        self._feed(row, theta, covariance, history, points)
+
+    def rebuild_user(self, db: Session, user_id: int, days: int = REBUILD_DAYS) -> int:
+        """
+        Réajuste le modèle sur les `days` derniers jours (backfill). Ne commit pas.
+        Retourne le nombre de pas ajustés.
+        """
+        row = db.get(models.GlucoseForecastModel, user_id)
+        if row is not None:
+            db.delete(row)
+            db.flush()
+        timestamps, values = glucose_reader.load_series(db, user_id, datetime.utcnow() - timedelta(days=days))
+        row, theta, covariance, history = self._load(db, user_id)
+        points = zip(timestamps.astype("datetime64[s]").tolist(), values.tolist())
+        self._feed(row, theta, covariance, history, points)
+        db.flush()
+        return row.update_count
+
+    def forecast(self, db: Session, user_id: int, horizon_minutes: int = 60, now: datetime = None):
+        """
+        Prévision par pas de 5 minutes depuis le dernier point de la grille, ou None
+        si le modèle n'a pas encore assez de données, si l'historique est interrompu
+        ou si le dernier point date de plus de 30 minutes (capteur déconnecté).
+        """
+        row = db.get(models.GlucoseForecastModel, user_id)
+        if row is None or (row.update_count or 0) < MIN_UPDATES or not row.history:
+            return None
+        now = to_utc_naive(now) if now is not None else datetime.utcnow()
+        if row.last_bucket is None or now - row.last_bucket > STALE_AFTER:
+            return None
+        history = np.frombuffer(row.history, dtype=np.float64)
+        if history.size < forecast.ORDER:
+            return None
+        theta = np.frombuffer(row.coefficients, dtype=np.float64)
+        steps = horizon_minutes // forecast.STEP_MINUTES
+        values = forecast.denormalize(forecast.predict(theta, history, steps))
+        return {
+            "last_timestamp": row.last_bucket,
+            "last_value": round(float(forecast.denormalize(history[-1])), 1),
+            "rmse_5min": round(float(np.sqrt(row.error_sq or 0.0)) * forecast.SCALE, 1),
+            "updates": row.update_count,
+            "points": [
+                {"timestamp": row.last_bucket + STEP * (i + 1), "value": round(float(v), 1)}
+                for i, v in enumerate(values)
+            ],
+        }
+
+forecast_service = ForecastService()
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import select, or_, and_
+from sqlalchemy.orm import Session
+from app.core.quality import clean_condition
+from app.models import models
+from app.models.records import GlucoseRow
+from app.services.chunk_service import chunk_service
+from app.services.retention_service import retention_service
+from app.services.rollup_service import to_utc_naive
+
+
+def load_series(db: Session, user_id: int, start: datetime, end: datetime = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Série [start, end) depuis la base : mesures brutes valides (tuples, pas d'objets ORM)
+    fusionnées avec les journées compactées et, au-delà de l'horizon de rétention,
+    une moyenne par bucket de 15 min. Retourne (secondes epoch int64, valeurs float64)
+    triés chronologiquement.
+    """
+    entry = models.GlucoseEntry
+    conditions = [
+        entry.user_id == user_id, entry.timestamp >= start, entry.value.isnot(None), clean_condition(entry.quality)
+    ]
+    if end is not None:
+        conditions.append(entry.timestamp < end)
+
+    rows = db.execute(
+        select(entry.timestamp, entry.value).where(*conditions).order_by(entry.timestamp)
+    ).all()
+    packed = [(r[0], r[2]) for r in chunk_service.iter_readings(db, user_id, start, end)]
+    packed += [tuple(r) for r in retention_service.iter_points(db, user_id, start, end)]
+    if packed:
+        rows = packed + [(to_utc_naive(r[0]), r[1]) for r in rows]
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    timestamps = np.array([row[0] for row in rows], dtype="datetime64[s]").astype(np.int64)
+    values = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+    if packed:
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, values = timestamps[order], values[order]
+    return timestamps, values
+
+
+def history_rows(db: Session, user_id: int, limit: int, before: tuple = None, after: tuple = None) -> list[GlucoseRow]:
+    """
+    Page de mesures brutes par curseur (timestamp, id), du plus récent au plus ancien,
+    artefacts compris (drapeaux `quality` exposés au client).
+    `before` : strictement plus anciennes ; `after` : les `limit` plus proches strictement plus récentes.
+    Requête Core (tuples -> GlucoseRow) : ni objets ORM ni identity map.
+    """
+    entry = models.GlucoseEntry
+    query = select(
+        entry.id, entry.user_id, entry.value, entry.timestamp, entry.note, entry.rate_of_change, entry.trend, entry.quality
+    ).where(entry.user_id == user_id)
+    if before is not None:
+        ts, entry_id = before
+        query = query.where(or_(entry.timestamp < ts, and_(entry.timestamp == ts, entry.id < entry_id)))
+    elif after is not None:
+        ts, entry_id = after
+        query = query.where(or_(entry.timestamp > ts, and_(entry.timestamp == ts, entry.id > entry_id)))
+
+    if after is not None:
+        # On lit les plus proches du curseur (ordre croissant) puis on remet en ordre décroissant
+        rows = db.execute(query.order_by(entry.timestamp.asc(), entry.id.asc()).limit(limit)).all()
+        rows.reverse()
+    else:
+        rows = db.execute(query.order_by(entry.timestamp.desc(), entry.id.desc()).limit(limit)).all()
+    return [GlucoseRow(*row) for row in rows]
+
+
+def existing_timestamps(db: Session, user_id: int, start: datetime, end: datetime) -> set:
+    """
+    Timestamps (UTC naïfs) déjà stockés sur [start, end], bruts ou compactés.
+    Une requête pour tout un lot à dédoublonner, au lieu d'une par mesure.
+    """
+    start, end = to_utc_naive(start), to_utc_naive(end)
+    entry = models.GlucoseEntry
+    rows = db.execute(
+        select(entry.timestamp).where(
+            entry.user_id == user_id,
+            entry.timestamp >= start,
+            entry.timestamp <= end
+        )
+    ).all()
+    known = {to_utc_naive(r[0]) for r in rows}
+    known.update(r[0] for r in chunk_service.iter_readings(db, user_id, start, end + timedelta(microseconds=1)))
+    return known
@@ -0,0 +1,215 @@
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import models
+from app.services.rollup_service import to_utc_naive
+from app.services import glucose_reader
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de flock, verrou limité au processus (un seul worker)
+    fcntl = None
+
+# Un enregistrement = 8 octets : secondes epoch (uint32, valide jusqu'en 2106) + valeur (float32).
+# 90 jours x 288 mesures ≈ 207 Ko par utilisateur.
+RECORD_DTYPE = np.dtype([("t", "<u4"), ("v", "<f4")])
+
+_EPOCH = datetime(1970, 1, 1)
+_PENDING_KEY = "hot_cache_pending"
+
+
+def to_epoch_seconds(ts: datetime) -> int:
+    return int((to_utc_naive(ts) - _EPOCH).total_seconds())
+
+
+def _to_records(points) -> np.ndarray:
+    """
+    (timestamp, value) -> tableau d'enregistrements trié par timestamp.
+    """
+    points = list(points)
+    records = np.empty(len(points), dtype=RECORD_DTYPE)
+    if points:
+        records["t"] = [to_epoch_seconds(ts) for ts, _ in points]
+        records["v"] = [value for _, value in points]
+        records = records[np.argsort(records["t"], kind="stable")]
+    return records
+
+
+class GlucoseHotCache:
+    """
+    Cache chaud optionnel : les 90 derniers jours de chaque utilisateur actif dans un
+    fichier mémoire-mappé (timestamps + valeurs), trié chronologiquement.
+    - Lecture : np.memmap + searchsorted, aucun objet ORM.
+    - Écriture : ajout en fin de fichier après le commit de l'ingestion.
+    - Un utilisateur sans fichier est chargé depuis la base à sa première lecture.
+    - Fichier partagé entre workers (uvicorn / gunicorn) : lecture, ajout et réécriture
+      sous flock d'un fichier .lock annexe (le fichier de données est remplacé par
+      os.replace lors des réécritures). Sans fcntl (Windows), un seul worker.
+    """
+
+    def __init__(self, directory: str, days: int = 90, enabled: bool = False):
+        self.directory = directory
+        self.days = days
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    def _path(self, user_id: int) -> str:
+        return os.path.join(self.directory, f"user_{user_id}.glc")
+
+    @contextmanager
+    def _locked(self, user_id: int, exclusive: bool):
+        """
+        Verrou du fichier d'un utilisateur : partagé (lecture) ou exclusif (écriture),
+        entre processus comme entre threads (un descripteur par acquisition).
+        """
+        if fcntl is None:
+            with self._lock:
+                yield
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(self._path(user_id) + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)  # Relâche le verrou
+
+    def _horizon(self) -> int:
+        # Un jour de marge : une fenêtre "90 jours" calculée juste avant reste couverte
+        return to_epoch_seconds(datetime.utcnow() - timedelta(days=self.days + 1))
+
+    def covers(self, start: datetime) -> bool:
+        """
+        True si la fenêtre commençant à `start` peut être servie par le cache.
+        """
+        return self.enabled and to_epoch_seconds(start) >= self._horizon()
+
+    def _read(self, user_id: int):
+        path = self._path(user_id)
+        if not os.path.exists(path):
+            return None
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(path, dtype=RECORD_DTYPE, mode="r")
+
+    def _write(self, user_id: int, records: np.ndarray):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._path(user_id) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(records.tobytes())
+        os.replace(tmp_path, self._path(user_id))
+
+    def warm(self, db: Session, user_id: int) -> np.ndarray:
+        """
+        (Re)construit le fichier d'un utilisateur depuis la base (tuples + chunks, pas d'ORM).
+        Appelé sous verrou exclusif.
+        """
+        start = datetime.utcnow() - timedelta(days=self.days + 1)
+        timestamps, values = glucose_reader.load_series(db, user_id, start)
+        records = np.empty(timestamps.size, dtype=RECORD_DTYPE)
+        records["t"] = timestamps
+        records["v"] = values
+        self._write(user_id, records)
+        return records
+
+    def load_series(self, db: Session, user_id: int, start: datetime, end: datetime = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Même contrat que StatsService.load_series : (timestamps int64, valeurs float64).
+        """
+        with self._locked(user_id, exclusive=False):
+            result = self._slice(self._read(user_id), start, end)
+        if result is None:
+            with self._locked(user_id, exclusive=True):
+                # Un autre worker a pu charger le fichier entre-temps
+                records = self._read(user_id)
+                if records is None:
+                    records = self.warm(db, user_id)
+                result = self._slice(records, start, end)
+        return result
+
+    @staticmethod
+    def _slice(records, start: datetime, end: datetime):
+        if records is None:
+            return None
+        t = records["t"]
+        lo = np.searchsorted(t, to_epoch_seconds(start), side="left")
+        hi = np.searchsorted(t, to_epoch_seconds(end), side="left") if end is not None else t.size
+        timestamps = t[lo:hi].astype(np.int64)
+        values = records["v"][lo:hi].astype(np.float64)
+        # Copie faite : on relâche le mapping (os.replace ultérieur possible sous Windows)
+        del records, t
+        return timestamps, values
+
+    def stage(self, db: Session, user_id: int, entries: list[models.GlucoseEntry]):
+        """
+        Mémorise les nouvelles mesures dans la session ; elles ne sont écrites
+        dans le cache qu'après le commit (annulées en cas de rollback).
+        """
+        if not self.enabled or not entries:
+            return
+        points = [(e.timestamp, e.value) for e in entries if e.timestamp is not None and e.value is not None]
+        db.info.setdefault(_PENDING_KEY, []).append((user_id, points))
+
+    def append(self, user_id: int, points):
+        """
+        Ajoute des mesures au fichier d'un utilisateur déjà en cache.
+        Ajout en fin de fichier si les mesures sont plus récentes que la dernière,
+        sinon fusion triée et dédoublonnée (une mesure déjà lue par `warm` n'est pas
+        dupliquée) ; les mesures hors horizon sont purgées à cette occasion.
+        """
+        new_records = _to_records(points)
+        if new_records.size == 0:
+            return
+        with self._locked(user_id, exclusive=True):
+            existing = self._read(user_id)
+            if existing is None:
+                return  # Utilisateur froid : chargé depuis la base à la première lecture
+
+            horizon = self._horizon()
+            in_order = existing.size == 0 or new_records["t"][0] > existing["t"][-1]
+            stale = existing.size > 0 and existing["t"][0] < horizon - 86400
+            if in_order and not stale:
+                del existing
+                with open(self._path(user_id), "ab") as f:
+                    f.write(new_records.tobytes())
+                return
+
+            merged = np.concatenate([np.asarray(existing), new_records])
+            del existing
+            # np.unique trie par (t, v) et retire les doublons exacts
+            merged = np.unique(merged)
+            self._write(user_id, merged[merged["t"] >= horizon])
+
+    def evict(self, user_id: int):
+        with self._locked(user_id, exclusive=True):
+            path = self._path(user_id)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+hot_cache = GlucoseHotCache(
+    settings.HOT_CACHE_DIR,
+    days=settings.HOT_CACHE_DAYS,
+    enabled=settings.HOT_CACHE_ENABLED
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session):
+    for user_id, points in session.info.pop(_PENDING_KEY, []):
+        try:
+            hot_cache.append(user_id, points)
+        except OSError as e:
+            # Le cache est reconstructible : on l'invalide plutôt que de servir des données partielles
+            print(f"⚠️ Hot cache append failed for user {user_id}: {e}")
+            hot_cache.evict(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
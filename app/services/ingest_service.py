@@ -0,0 +1,56 @@
+from sqlalchemy.orm import Session
+from app.models import models
+from app.services.rollup_service import rollup_service
+from app.services.hot_cache import hot_cache
+from app.services.watermark_service import watermark_service
+from app.services.summary_service import summary_service
+from app.services.event_service import event_service
+from app.services.trend_service import trend_service
+from app.services.alert_service import alert_service
+from app.services.forecast_service import forecast_service
+from app.services.kinetic_service import kinetic_service
+from app.services.quality_service import quality_service
+from app.services.meal_response_service import meal_response_service
+from app.services.cold_tier_service import cold_tier_service
+from app.core.quality import ALERT_EXCLUDED
+
+
+class IngestService:
+    """
+    Point d'entrée unique pour l'écriture de nouvelles mesures glycémiques
+    (ping CGM, Nightscout, Medtrum, simulation). Les structures dérivées
+    sont mises à jour dans la même transaction que les mesures brutes,
+    à partir des seules mesures validées par le filtre qualité.
+    """
+
+    def add_entries(self, db: Session, user_id: int, entries: list[models.GlucoseEntry]):
+        """
+        Ajoute les mesures à la session et met à jour les agrégats.
+        Ne commit pas : l'appelant garde la main sur la transaction.
+        """
+        if not entries:
+            return
+        # Filtre qualité puis tendance avant l'INSERT : les colonnes partent avec la mesure (pas d'UPDATE)
+        clean = quality_service.apply_entries(db, user_id, entries)
+        trend_service.apply_entries(db, user_id, clean)
+        db.add_all(entries)
+        # Flush : ids attribués et agrégats d'un appel précédent visibles dans la transaction
+        db.flush()
+        rollup_service.apply_entries(db, user_id, clean)
+        # Clôture des jours précédents : lit les agrégats journaliers écrits ci-dessus
+        kinetic_service.apply_entries(db, user_id, clean)
+        # Épisodes avant le résumé : ils se basent sur la dernière mesure connue avant cet appel
+        event_service.apply_entries(db, user_id, clean)
+        summary_service.apply_entries(db, user_id, clean)
+        # Réponses aux repas après le résumé : fenêtres closes par la dernière mesure connue
+        meal_response_service.apply_entries(db, user_id, clean)
+        forecast_service.apply_entries(db, user_id, clean)
+        # Mesure tardive dans un mois exporté en Parquet : le mois repasse en lecture vive
+        cold_tier_service.apply_entries(db, user_id, clean)
+        hot_cache.stage(db, user_id, clean)
+        # Alertes après la tendance (règles de vitesse) ; envoi au notifier après le commit.
+        # Une compression probable reste évaluée : une vraie hypo ne doit jamais être masquée.
+        alert_service.apply_entries(db, user_id, [e for e in entries if not (e.quality or 0) & ALERT_EXCLUDED])
+        watermark_service.bump(db, user_id)
+
+ingest_service = IngestService()
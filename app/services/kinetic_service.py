@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.stability_engine import (
+    GLYCATION_HALF_LIFE_DAYS, estimate_hba1c_from_glucose, fold_daily_means, kinetic_mean_glucose
+)
+from app.models import models
+from app.services.rollup_service import bucket_start, to_utc_naive
+
+_EPOCH = datetime(1970, 1, 1)
+# Somme des poids d'un historique infini et complet (une moyenne par jour)
+SATURATED_WEIGHT = 1.0 / (1.0 - 0.5 ** (1.0 / GLYCATION_HALF_LIFE_DAYS))
+
+
+def _ordinal(day: datetime) -> int:
+    return (day - _EPOCH).days
+
+
+def _day(ordinal: int) -> datetime:
+    return _EPOCH + timedelta(days=ordinal)
+
+
+class KineticService:
+    """
+    HbA1c cinétique (app/core/stability_engine.py) : moyennes journalières pondérées par
+    le noyau de glycation, repliées dans glucose_kinetic_states à la clôture de chaque jour.
+    Un jour est clos dès qu'une mesure d'un jour suivant est ingérée ; sa moyenne est lue
+    dans l'agrégat journalier (glucose_rollups). Lecture de l'estimation : une ligne par clé primaire.
+    """
+
+    def _fold_rollups(self, db: Session, row: models.GlucoseKineticState, start, end: datetime):
+        """
+        Replie les agrégats journaliers de [start, end) (start None : depuis le début).
+        """
+        db.flush()  # Agrégats de la transaction en cours (autoflush désactivé)
+        rollup = models.GlucoseRollup
+        conditions = [
+            rollup.user_id == row.user_id,
+            rollup.resolution == "1d",
+            rollup.bucket_start < end,
+            rollup.value_count > 0
+        ]
+        if start is not None:
+            conditions.append(rollup.bucket_start >= start)
+        days = db.execute(
+            select(rollup.bucket_start, rollup.value_sum, rollup.value_count)
+            .where(*conditions)
+            .order_by(rollup.bucket_start)
+        ).all()
+        if days:
+            ordinals = np.array([_ordinal(day) for day, _, _ in days])
+            means = np.array([value_sum / count for _, value_sum, count in days])
+            last = _ordinal(row.last_day) if row.last_day is not None else None
+            weighted_sum, weight_total, last = fold_daily_means(
+                row.weighted_sum or 0.0, row.weight_total or 0.0, last, ordinals, means
+            )
+            row.weighted_sum = weighted_sum
+            row.weight_total = weight_total
+            row.last_day = _day(last)
+            row.day_count = (row.day_count or 0) + len(days)
+        row.closed_until = end
+
+    def apply_entries(self, db: Session, user_id: int, entries: list[models.GlucoseEntry]):
+        """
+        Replie les jours clos par ces mesures (après la mise à jour des agrégats). Ne commit pas.
+        Hors changement de jour, une seule lecture par clé primaire. Une mesure tardive
+        d'un jour déjà replié n'est prise en compte qu'au recalcul (`rebuild_user`).
+        """
+        timestamps = [to_utc_naive(e.timestamp) for e in entries if e.timestamp is not None and e.value is not None]
+        if not timestamps:
+            return
+        current_day = bucket_start(max(timestamps), "1d")
+        row = db.get(models.GlucoseKineticState, user_id)
+        if row is None:
+            row = models.GlucoseKineticState(user_id=user_id, weighted_sum=0.0, weight_total=0.0, day_count=0)
+            db.add(row)
+        elif row.closed_until is not None and current_day <= row.closed_until:
+            return
+        self._fold_rollups(db, row, row.closed_until, current_day)
+
+    def rebuild_user(self, db: Session, user_id: int, today: datetime = None) -> int:
+        """
+        Recalcule l'état sur tout l'historique (jours clos avant `today`) en un repli vectorisé.
+        Ne commit pas. Retourne le nombre de jours repliés.
+        """
+        row = db.get(models.GlucoseKineticState, user_id)
+        if row is None:
+            row = models.GlucoseKineticState(user_id=user_id)
+            db.add(row)
+        row.weighted_sum, row.weight_total, row.day_count, row.last_day = 0.0, 0.0, 0, None
+        self._fold_rollups(db, row, None, bucket_start(today or datetime.utcnow(), "1d"))
+        db.flush()
+        return row.day_count
+
+    def mean_glucose(self, db: Session, user_id: int):
+        row = db.get(models.GlucoseKineticState, user_id)
+        if row is None:
+            return None
+        return kinetic_mean_glucose(row.weighted_sum or 0.0, row.weight_total or 0.0)
+
+    def estimate(self, db: Session, user_id: int):
+        """
+        HbA1c cinétique estimée (sans offset profil), ou None sans jour clos.
+        """
+        row = db.get(models.GlucoseKineticState, user_id)
+        mean = kinetic_mean_glucose(row.weighted_sum or 0.0, row.weight_total or 0.0) if row else None
+        if mean is None:
+            return None
+        return {
+            "estimated_hba1c": estimate_hba1c_from_glucose(mean),
+            "kinetic_mean_glucose": mean,
+            "as_of": row.last_day,
+            "days": row.day_count,
+            # Part du poids d'un historique complet effectivement couverte (%)
+            "weight_coverage": round(min(100.0, row.weight_total / SATURATED_WEIGHT * 100), 1),
+        }
+
+kinetic_service = KineticService()
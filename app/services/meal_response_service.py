@@ -0,0 +1,211 @@
+import math
+from datetime import datetime, timedelta
+from sqlalchemy import select, or_, and_
+from sqlalchemy.orm import Session
+from app.core.meal_response import meal_excursions, food_key, WINDOW_MINUTES, BASELINE_MINUTES
+from app.models import models
+from app.models.database import upsert
+from app.services import glucose_reader
+from app.services.rollup_service import to_utc_naive
+from app.services.summary_service import summary_service
+
+WINDOW = timedelta(minutes=WINDOW_MINUTES)
+BASELINE = timedelta(minutes=BASELINE_MINUTES)
+PENDING_HORIZON = timedelta(days=1)  # Repas plus anciens sans réponse : scripts/backfill_meal_responses.py
+
+
+def _optional(value: float):
+    return None if math.isnan(value) else round(float(value), 1)
+
+
+def status(row) -> str:
+    if row is None:
+        return "pending"
+    return "complete" if row.peak_delta is not None else "insufficient_data"
+
+
+class MealResponseService:
+    """
+    Réponses glycémiques post-prandiales (app/core/meal_response.py), persistées par repas
+    dans meal_glucose_responses, et agrégat par aliment (food_glucose_responses : sommes
+    mises à jour par différence à chaque (re)calcul d'un repas).
+    Calcul à l'ingestion quand une mesure clôt la fenêtre de 2 h d'un repas, ou quand des
+    mesures tardives tombent dans la fenêtre d'un repas déjà calculé. Une seule lecture de
+    série pour tous les repas d'un appel.
+    """
+
+    def compute_meals(self, db: Session, user_id: int, meals: list) -> int:
+        """
+        (Re)calcule les réponses des repas [(id, timestamp, nom)]. Ne commit pas.
+        """
+        if not meals:
+            return 0
+        times = [to_utc_naive(ts) for _, ts, _ in meals]
+        timestamps, values = glucose_reader.load_series(
+            db, user_id, min(times) - BASELINE, max(times) + WINDOW + timedelta(seconds=1)
+        )
+        meal_seconds = [int((ts - datetime(1970, 1, 1)).total_seconds()) for ts in times]
+        metrics = meal_excursions(timestamps, values, meal_seconds)
+
+        # Lignes manquantes créées sans collision (GET et ingestion concurrents sur le même repas),
+        # puis verrouillées : la contribution retranchée de l'index est bien celle de la ligne en base
+        response = models.MealGlucoseResponse
+        table = response.__table__
+        db.execute(
+            upsert(db, table).on_conflict_do_nothing(index_elements=[table.c.meal_id]),
+            [{"meal_id": meal_id, "user_id": user_id, "food_key": food_key(name), "reading_count": 0}
+             for meal_id, _, name in meals]
+        )
+        existing = {
+            row.meal_id: row for row in db.query(response).filter(
+                response.meal_id.in_([meal_id for meal_id, _, _ in meals])
+            ).with_for_update().populate_existing()
+        }
+        deltas = {}
+        for i, (meal_id, _, name) in enumerate(meals):
+            row = existing[meal_id]
+            self._accumulate(deltas, row, -1)  # Sans effet pour une ligne juste créée (peak_delta nul)
+            row.food_key = food_key(name)
+            row.baseline = _optional(metrics["baseline"][i])
+            row.peak = _optional(metrics["peak"][i])
+            row.peak_delta = _optional(metrics["peak_delta"][i])
+            row.time_to_peak_minutes = _optional(metrics["time_to_peak"][i])
+            row.iauc = _optional(metrics["iauc"][i])
+            row.reading_count = int(metrics["count"][i])
+            row.computed_at = datetime.utcnow()
+            self._accumulate(deltas, row, 1)
+        self._apply_food_deltas(db, user_id, deltas)
+        db.flush()
+        return len(meals)
+
+    @staticmethod
+    def _accumulate(deltas: dict, row, sign: int):
+        if row.peak_delta is None:
+            return
+        delta = deltas.setdefault(row.food_key, [0, 0.0, 0.0, 0.0, 0.0])
+        delta[0] += sign
+        delta[1] += sign * row.peak_delta
+        delta[2] += sign * row.peak_delta * row.peak_delta
+        delta[3] += sign * row.time_to_peak_minutes
+        delta[4] += sign * row.iauc
+
+    def _apply_food_deltas(self, db: Session, user_id: int, deltas: dict):
+        # INSERT ... ON CONFLICT DO UPDATE : incréments SQL, création concurrente d'un aliment sans collision
+        table = models.FoodGlucoseResponse.__table__
+        statement = upsert(db, table)
+        excluded, current = statement.excluded, table.c
+        rows = [
+            {"user_id": user_id, "food_key": key, "meal_count": count, "peak_delta_sum": delta_sum,
+             "peak_delta_sum_sq": delta_sq, "time_to_peak_sum": ttp_sum, "iauc_sum": iauc_sum}
+            for key, (count, delta_sum, delta_sq, ttp_sum, iauc_sum) in deltas.items()
+            if count or delta_sum
+        ]
+        if not rows:
+            return
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[current.user_id, current.food_key],
+                set_={
+                    "meal_count": current.meal_count + excluded.meal_count,
+                    "peak_delta_sum": current.peak_delta_sum + excluded.peak_delta_sum,
+                    "peak_delta_sum_sq": current.peak_delta_sum_sq + excluded.peak_delta_sum_sq,
+                    "time_to_peak_sum": current.time_to_peak_sum + excluded.time_to_peak_sum,
+                    "iauc_sum": current.iauc_sum + excluded.iauc_sum,
+                }
+            ),
+            rows
+        )
+
+    def apply_entries(self, db: Session, user_id: int, entries: list[models.GlucoseEntry]):
+        """
+        Après la mise à jour du résumé utilisateur : calcule les repas récents dont la fenêtre
+        vient d'être close, et recalcule les repas clos dont la fenêtre contient une nouvelle mesure.
+        """
+        times = [to_utc_naive(e.timestamp) for e in entries if e.timestamp is not None]
+        summary = summary_service.get(db, user_id)
+        if not times or summary is None or summary.last_timestamp is None:
+            return
+        closed_before = summary.last_timestamp - WINDOW
+        meal, response = models.Meal, models.MealGlucoseResponse
+        rows = db.execute(
+            select(meal.id, meal.timestamp, meal.name)
+            .outerjoin(response, response.meal_id == meal.id)
+            .where(
+                meal.user_id == user_id,
+                meal.timestamp <= closed_before,
+                or_(
+                    and_(response.meal_id.is_(None), meal.timestamp >= closed_before - PENDING_HORIZON),
+                    and_(meal.timestamp >= min(times) - WINDOW, meal.timestamp <= max(times) + BASELINE)
+                )
+            )
+        ).all()
+        self.compute_meals(db, user_id, [tuple(row) for row in rows])
+
+    def compute_meal(self, db: Session, meal: models.Meal):
+        """
+        Réponse d'un repas (calculée si sa fenêtre est close et qu'elle manque), ou None si en attente.
+        """
+        if meal.glucose_response is None:
+            summary = summary_service.get(db, meal.user_id)
+            if summary is None or summary.last_timestamp is None or \
+                    to_utc_naive(meal.timestamp) + WINDOW > summary.last_timestamp:
+                return None
+            self.compute_meals(db, meal.user_id, [(meal.id, meal.timestamp, meal.name)])
+            db.refresh(meal)
+        return meal.glucose_response
+
+    def rebuild_user(self, db: Session, user_id: int) -> int:
+        """
+        Recalcule tous les repas clos de l'utilisateur et l'agrégat par aliment (backfill). Ne commit pas.
+        """
+        db.query(models.FoodGlucoseResponse).filter(models.FoodGlucoseResponse.user_id == user_id).delete()
+        db.query(models.MealGlucoseResponse).filter(models.MealGlucoseResponse.user_id == user_id).delete()
+        db.flush()
+        summary = summary_service.get(db, user_id)
+        if summary is None or summary.last_timestamp is None:
+            return 0
+        rows = db.execute(
+            select(models.Meal.id, models.Meal.timestamp, models.Meal.name).where(
+                models.Meal.user_id == user_id,
+                models.Meal.timestamp <= summary.last_timestamp - WINDOW
+            )
+        ).all()
+        return self.compute_meals(db, user_id, [tuple(row) for row in rows])
+
+    def foods(self, db: Session, user_id: int, min_meals: int = 1, limit: int = 50) -> list[dict]:
+        """
+        Aliments classés par pic moyen décroissant (moyennes dérivées des sommes de l'index).
+        """
+        food = models.FoodGlucoseResponse
+        # populate_existing : sommes mises à jour par INSERT ... ON CONFLICT, hors ORM
+        rows = db.query(food).filter(
+            food.user_id == user_id, food.meal_count >= max(min_meals, 1)
+        ).populate_existing().all()
+        result = []
+        for row in rows:
+            n = row.meal_count
+            mean = row.peak_delta_sum / n
+            result.append({
+                "food": row.food_key,
+                "meals": n,
+                "mean_peak_delta": round(mean, 1),
+                "sd_peak_delta": round(math.sqrt(max(row.peak_delta_sum_sq / n - mean * mean, 0.0)), 1),
+                "mean_time_to_peak_minutes": round(row.time_to_peak_sum / n, 1),
+                "mean_iauc": round(row.iauc_sum / n, 0),
+            })
+        result.sort(key=lambda f: f["mean_peak_delta"], reverse=True)
+        return result[:limit]
+
+    def format_context(self, foods: list[dict], top: int = 3) -> str:
+        """
+        Ligne de contexte coach : aliments aux plus fortes hausses post-prandiales observées.
+        """
+        if not foods:
+            return ""
+        items = [
+            f"{f['food']} {round(f['mean_peak_delta']):+d} mg/dL en {round(f['mean_time_to_peak_minutes'])} min ({f['meals']} repas)"
+            for f in foods[:top]
+        ]
+        return "- Réponses aux repas (pic moyen sur 2 h): " + "; ".join(items) + "\n"
+
+meal_response_service = MealResponseService()
@@ -4,6 +4,10 @@ from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from app.models import models
 from app.core.config import settings
+from app.core.quality import FLAG_SENSOR
+from app.services.ingest_service import ingest_service
+from app.services.glucose_reader import existing_timestamps
+from app.services.retention_service import retention_service
 
 class MedtrumService:
     BASE_URL = 'https://easyview.medtrum.fr' # Ou .com selon configuration utilisateur
@@ -64,15 +68,15 @@ class MedtrumService:
             data_response = r3.json()
             raw_data = data_response.get("data", [])
             
-            count_new = 0
+            # Déduplication : une requête pour toute la plage téléchargée (chunks compris)
+            known = existing_timestamps(db, user.id, start_date, now)
+            # Avant cette date, les mesures sont déjà comptées dans les agrégats de rétention
+            archived_until = retention_service.archived_until(db, user.id)
+            new_entries = []
             for point in raw_data:
                 # Format supposé : ["ID", Timestamp, Raw_Value, Calibrated_Value, "C", Status]
                 # Exemple : ["...", 1770120750.0, 11.0, 6.6, "C", 0.0]
                 try:
-                    # Filtre anti-bruit (Status != 0)
-                    if float(point[5]) != 0.0:
-                        continue
-
                     ts = datetime.fromtimestamp(point[1])
                     
                     # On prend l'index 3 (Valeur plus basse/cohérente)
@@ -80,25 +84,24 @@ class MedtrumService:
                     val_mgdl = val_mmol * 18.0182 # Conversion
                     
                     # Vérifier doublons
-                    exists = db.query(models.GlucoseEntry).filter(
-                        models.GlucoseEntry.user_id == user.id,
-                        models.GlucoseEntry.timestamp == ts
-                    ).first()
-                    
-                    if not exists:
+                    if ts not in known and (archived_until is None or ts >= archived_until):
+                        known.add(ts)
                         entry = models.GlucoseEntry(
                             user_id=user.id,
                             value=val_mgdl,
                             timestamp=ts,
-                            note="Medtrum Auto-Sync"
+                            note="Medtrum Auto-Sync",
+                            # Status != 0 : mesure bruitée selon le capteur, conservée comme artefact
+                            quality=FLAG_SENSOR if float(point[5]) != 0.0 else 0
                         )
-                        db.add(entry)
-                        count_new += 1
+                        new_entries.append(entry)
                 except Exception as e:
                     print(f"Skipping point {point}: {e}")
             
+            # Mesures + agrégats dans la même transaction
+            ingest_service.add_entries(db, user.id, new_entries)
             db.commit()
-            return {"status": "success", "new_entries": count_new}
+            return {"status": "success", "new_entries": len(new_entries)}
             
         except json.JSONDecodeError:
             raise Exception("Réponse Medtrum invalide (pas de JSON)")
@@ -5,6 +5,13 @@ from opik import track
 from app.models import models
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.quality import FLAG_SENSOR
+from app.services.ingest_service import ingest_service
+from app.services.glucose_reader import existing_timestamps
+from app.services.retention_service import retention_service
+from app.services.rollup_service import to_utc_naive
+
+NOISE_HEAVY = 4
 
 class NightscoutService:
     def __init__(self):
@@ -38,7 +45,7 @@ class NightscoutService:
         Fetches data from Nightscout and saves new entries to the database.
         """
         entries = await self.fetch_entries(url, token=token)
-        count = 0
+        parsed = []
         
         for entry in entries:
             # Nightscout fields: sgv (value), dateString (timestamp), device
@@ -49,27 +56,35 @@ class NightscoutService:
 
                 timestamp_str = entry.get("dateString")
                 timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-                
-                # Check if exists (deduplication)
-                exists = db.query(models.GlucoseEntry).filter(
-                    models.GlucoseEntry.user_id == user.id,
-                    models.GlucoseEntry.timestamp == timestamp
-                ).first()
-                
-                if not exists:
-                    new_entry = models.GlucoseEntry(
-                        user_id=user.id,
-                        value=sgv,
-                        timestamp=timestamp,
-                        note=f"Nightscout ({entry.get('device', 'Unknown')})"
-                    )
-                    db.add(new_entry)
-                    count += 1
+                # Bruit signalé par l'uploader (échelle Nightscout : 1 propre ... 4 fort)
+                flags = FLAG_SENSOR if (entry.get("noise") or 0) >= NOISE_HEAVY else 0
+                parsed.append((timestamp, sgv, entry.get('device', 'Unknown'), flags))
             except Exception as e:
                 print(f"⚠️ Error parsing entry: {e}")
                 continue
         
+        new_entries = []
+        if parsed:
+            # Check if exists (deduplication) : une requête pour tout le lot, chunks compris
+            known = existing_timestamps(db, user.id, min(p[0] for p in parsed), max(p[0] for p in parsed))
+            # Avant cette date, les mesures sont déjà comptées dans les agrégats de rétention
+            archived_until = retention_service.archived_until(db, user.id)
+            for timestamp, sgv, device, flags in parsed:
+                key = to_utc_naive(timestamp)
+                if key in known or (archived_until is not None and key < archived_until):
+                    continue
+                known.add(key)
+                new_entries.append(models.GlucoseEntry(
+                    user_id=user.id,
+                    value=sgv,
+                    timestamp=timestamp,
+                    note=f"Nightscout ({device})",
+                    quality=flags
+                ))
+        
+        # Mesures + agrégats dans la même transaction
+        ingest_service.add_entries(db, user.id, new_entries)
         db.commit()
-        return {"synced": count, "total_fetched": len(entries)}
+        return {"synced": len(new_entries), "total_fetched": len(entries)}
 
 nightscout_service = NightscoutService()
@@ -0,0 +1,76 @@
+import json
+import queue
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+import httpx
+from app.core.config import settings
+from app.core.logger import logger
+
+
+class Notifier(ABC):
+    """
+    Interface d'envoi des alertes. `send` est appelé après le commit de l'ingestion
+    et ne doit pas bloquer : les implémentations réseau passent par une file.
+    """
+
+    @abstractmethod
+    def send(self, alerts: list[dict]):
+        ...
+
+
+class StubNotifier(Notifier):
+    """
+    Notifier local (développement, tests) : les alertes sont journalisées et les
+    dernières conservées en mémoire.
+    """
+
+    def __init__(self, keep: int = 1000):
+        self.sent = deque(maxlen=keep)
+
+    def send(self, alerts: list[dict]):
+        for alert in alerts:
+            logger.info(f"Alerte user={alert['user_id']}: {alert['message']}")
+        self.sent.extend(alerts)
+
+
+class WebhookNotifier(Notifier):
+    """
+    POST JSON {"alerts": [...]} vers une URL, depuis un thread dédié (file FIFO) :
+    la latence du webhook n'est jamais payée par la requête d'ingestion.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="alert-webhook", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        with httpx.Client(timeout=self.timeout) as client:
+            while True:
+                alerts = self._queue.get()
+                try:
+                    payload = json.dumps({"alerts": alerts}, default=str, ensure_ascii=False)
+                    client.post(self.url, content=payload, headers={"Content-Type": "application/json"})
+                except httpx.HTTPError as e:
+                    logger.error(f"Webhook d'alerte en échec ({self.url}): {e}")
+                finally:
+                    self._queue.task_done()
+
+    def send(self, alerts: list[dict]):
+        self._ensure_worker()
+        self._queue.put(alerts)
+
+
+def build_notifier() -> Notifier:
+    if settings.ALERT_WEBHOOK_URL:
+        return WebhookNotifier(settings.ALERT_WEBHOOK_URL)
+    return StubNotifier()
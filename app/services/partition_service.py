@@ -0,0 +1,78 @@
+import re
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+PARENT_TABLE = "glucose_entries"
+_PARTITION_NAME = re.compile(r"^glucose_entries_y(\d{4})m(\d{2})$")
+
+
+def partition_name(month: date) -> str:
+    """
+    Nom de la partition mensuelle (même convention que glucose_entries_ensure_partitions).
+    """
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str):
+    """
+    Mois couvert par une partition, None pour la partition DEFAULT ou un nom inconnu.
+    """
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+class PartitionService:
+    """
+    Partitionnement mensuel de glucose_entries (PostgreSQL, voir la migration glucose_partitions_v1).
+    Sous SQLite, ou tant que la migration n'est pas appliquée, toutes les opérations sont des no-op.
+    """
+
+    def is_partitioned(self, bind) -> bool:
+        if bind.dialect.name != "postgresql":
+            return False
+        return bool(bind.execute(text(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:parent)"
+        ), {"parent": PARENT_TABLE}).scalar())
+
+    def ensure_partitions(self, bind, months_ahead: int = 3) -> int:
+        """
+        Crée les partitions des mois à venir. Retourne le nombre de partitions créées.
+        """
+        if isinstance(bind, Engine):
+            with bind.begin() as conn:
+                return self.ensure_partitions(conn, months_ahead)
+        if not self.is_partitioned(bind):
+            return 0
+        return bind.execute(
+            text("SELECT glucose_entries_ensure_partitions(:months_ahead)"),
+            {"months_ahead": months_ahead}
+        ).scalar()
+
+    def list_partitions(self, bind: Connection) -> list[str]:
+        """
+        Partitions attachées, par ordre de nom (donc chronologique), DEFAULT comprise.
+        """
+        if not self.is_partitioned(bind):
+            return []
+        rows = bind.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:parent) ORDER BY c.relname"
+        ), {"parent": PARENT_TABLE}).all()
+        return [row[0] for row in rows]
+
+    def detach_before(self, bind: Connection, month: date) -> list[str]:
+        """
+        Détache les partitions des mois antérieurs à `month`. Les tables détachées restent
+        en base (archive, pg_dump ou DROP au choix de l'exploitant) : opération de métadonnées,
+        sans réécriture ni DELETE ligne à ligne.
+        """
+        detached = []
+        for name in self.list_partitions(bind):
+            partition = partition_month(name)
+            if partition is not None and partition < month:
+                bind.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+                detached.append(name)
+        return detached
+
+partition_service = PartitionService()
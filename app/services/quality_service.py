@@ -0,0 +1,67 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.quality import QualityState, annotate, clean_condition, ARTIFACT, FLAG_COMPRESSION
+from app.models import models
+from app.services.rollup_service import to_utc_naive
+
+
+class QualityService:
+    """
+    Étape de filtrage de l'ingestion (app/core/quality.py) : chaque nouvelle mesure reçoit
+    ses drapeaux de qualité avant l'INSERT. Les artefacts sont enregistrés (historique,
+    export) mais ne sont transmis à aucune structure dérivée : agrégats, résumés, épisodes,
+    tendance et prévision les excluent sans relecture, et les lectures brutes filtrent quality = 0.
+    L'état du filtre est rechargé depuis la base à chaque lot (deux descentes d'index
+    user_id/timestamp) : correct quel que soit le worker et pour les re-sync tardives.
+    Sans détection (GLUCOSE_QUALITY_FILTER), seuls les drapeaux posés par la source sont appliqués.
+    """
+
+    def __init__(self, detect: bool = False):
+        self.detect = detect
+
+    def _seed(self, db: Session, user_id: int, before) -> QualityState:
+        entry = models.GlucoseEntry
+        base = select(entry.timestamp, entry.value, entry.quality).where(
+            entry.user_id == user_id, entry.timestamp < before
+        ).order_by(entry.timestamp.desc()).limit(1)
+        last = db.execute(base).first()
+        if last is None:
+            return QualityState()
+        ref = last if not last.quality & ARTIFACT else db.execute(
+            base.where(clean_condition(entry.quality))
+        ).first()
+        state = QualityState(last_ts=to_utc_naive(last.timestamp))
+        if ref is not None:
+            state.ref_ts, state.ref_value = to_utc_naive(ref.timestamp), float(ref.value)
+            if last.quality & FLAG_COMPRESSION:
+                # Épisode en cours : borné depuis la dernière mesure valide qui le précède
+                state.compression_since = state.ref_ts
+        return state
+
+    def apply_entries(self, db: Session, user_id: int, entries: list[models.GlucoseEntry]) -> list[models.GlucoseEntry]:
+        """
+        Renseigne `quality` (drapeaux source conservés, ex. erreur capteur posée par l'uploader).
+        Retourne les mesures valides, dans l'ordre chronologique. Ne commit pas.
+        """
+        ordered = sorted(
+            (e for e in entries if e.timestamp is not None),
+            key=lambda e: to_utc_naive(e.timestamp)
+        )
+        if not ordered:
+            return []
+        if not self.detect:
+            return [e for e in ordered if not (e.quality or 0) & ARTIFACT]
+        state = self._seed(db, user_id, to_utc_naive(ordered[0].timestamp))
+        points = (
+            (to_utc_naive(e.timestamp), float(e.value) if e.value is not None else None, e.quality or 0)
+            for e in ordered
+        )
+        clean = []
+        for entry, (_, _, flags) in zip(ordered, annotate(points, state)):
+            entry.quality = flags
+            if not flags & ARTIFACT:
+                clean.append(entry)
+        return clean
+
+quality_service = QualityService(detect=settings.GLUCOSE_QUALITY_FILTER)
@@ -0,0 +1,213 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, func, or_, and_
+from sqlalchemy.orm import Session
+from app.core.quality import clean_condition
+from app.models import models
+from app.models.database import upsert, least, greatest
+from app.models.records import GlucoseRow
+from app.services.chunk_service import chunk_service
+from app.services.rollup_service import TIR_LOW, TIR_HIGH, bucket_start, to_utc_naive
+from app.services.watermark_service import watermark_service
+
+AGGREGATE_STEP = timedelta(minutes=15)
+ONE_DAY = timedelta(days=1)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def aggregate_start(ts: datetime) -> datetime:
+    """
+    Début du bucket de 15 min contenant `ts`.
+    """
+    return _EPOCH + ((to_utc_naive(ts) - _EPOCH) // AGGREGATE_STEP) * AGGREGATE_STEP
+
+
+def _aggregate(points) -> dict:
+    """
+    (timestamp, value) -> {début de bucket 15 min: agrégat}.
+    """
+    buckets = {}
+    for ts, value in points:
+        value = float(value)
+        agg = buckets.setdefault(aggregate_start(ts), {
+            "count": 0, "sum": 0.0, "sum_sq": 0.0, "min": value, "max": value,
+            "low": 0, "normal": 0, "high": 0,
+        })
+        agg["count"] += 1
+        agg["sum"] += value
+        agg["sum_sq"] += value * value
+        agg["min"] = min(agg["min"], value)
+        agg["max"] = max(agg["max"], value)
+        if value < TIR_LOW:
+            agg["low"] += 1
+        elif value > TIR_HIGH:
+            agg["high"] += 1
+        else:
+            agg["normal"] += 1
+    return buckets
+
+
+class RetentionService:
+    """
+    Rétention : au-delà de l'horizon, les mesures 5 min (brutes ou compactées)
+    sont remplacées par des agrégats 15 min (moyenne / min / max / nombre) dans
+    glucose_aggregates. Les agrégats glucose_rollups ne sont pas touchés : les
+    statistiques journalières restent exactes. L'historique et les séries lisent
+    ce tier comme une mesure par bucket (timestamp = début du bucket, valeur = moyenne).
+    """
+
+    def _compact_day(self, db: Session, user_id: int, day: datetime) -> int:
+        entry = models.GlucoseEntry
+        aggregate = models.GlucoseAggregate
+        end = day + ONE_DAY
+
+        points = db.execute(
+            select(entry.timestamp, entry.value).where(
+                entry.user_id == user_id,
+                entry.timestamp >= day,
+                entry.timestamp < end,
+                entry.value.isnot(None),
+                clean_condition(entry.quality)
+            )
+        ).all()
+        points += [(r[0], r[2]) for r in chunk_service.iter_readings(db, user_id, day, end)]
+        if not points:
+            return 0
+
+        # Fusion côté SQL (INSERT ... ON CONFLICT DO UPDATE) : une compaction concurrente
+        # du même jour s'ajoute aux agrégats existants au lieu de les écraser
+        table = aggregate.__table__
+        statement = upsert(db, table)
+        excluded, current = statement.excluded, table.c
+        count = current.value_count + excluded.value_count
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[current.user_id, current.bucket_start],
+                set_={
+                    "value_mean": (current.value_mean * current.value_count
+                                   + excluded.value_mean * excluded.value_count) / count,
+                    "value_count": count,
+                    "value_min": least(db, current.value_min, excluded.value_min),
+                    "value_max": greatest(db, current.value_max, excluded.value_max),
+                    "value_sum_sq": current.value_sum_sq + excluded.value_sum_sq,
+                    "low_count": current.low_count + excluded.low_count,
+                    "normal_count": current.normal_count + excluded.normal_count,
+                    "high_count": current.high_count + excluded.high_count,
+                }
+            ),
+            [
+                {"user_id": user_id, "bucket_start": start, "value_count": agg["count"],
+                 "value_mean": agg["sum"] / agg["count"], "value_min": agg["min"], "value_max": agg["max"],
+                 "value_sum_sq": agg["sum_sq"], "low_count": agg["low"], "normal_count": agg["normal"],
+                 "high_count": agg["high"]}
+                for start, agg in _aggregate(points).items()
+            ]
+        )
+
+        db.execute(delete(entry).where(entry.user_id == user_id, entry.timestamp >= day, entry.timestamp < end))
+        db.execute(delete(models.GlucoseChunk).where(
+            models.GlucoseChunk.user_id == user_id,
+            models.GlucoseChunk.day == day
+        ))
+        return len(points)
+
+    def compact_user(self, db: Session, user_id: int, before: datetime, max_days: int = 7) -> dict:
+        """
+        Compacte au plus `max_days` journées UTC closes antérieures au jour de `before`,
+        des plus anciennes aux plus récentes. Ne commit pas : l'appelant enchaîne des
+        transactions courtes jusqu'à ce que `days` vaille 0.
+        """
+        before_day = bucket_start(before, "1d")
+        entry = models.GlucoseEntry
+        # Premier jour compactable : un jour sans mesure propre (artefacts, valeurs nulles)
+        # n'est jamais compacté et ferait repartir chaque passe de lui
+        first_raw = db.query(func.min(entry.timestamp)).filter(
+            entry.user_id == user_id,
+            entry.timestamp < before_day,
+            entry.value.isnot(None),
+            clean_condition(entry.quality)
+        ).scalar()
+        first_chunk = db.query(func.min(models.GlucoseChunk.day)).filter(
+            models.GlucoseChunk.user_id == user_id,
+            models.GlucoseChunk.day < before_day
+        ).scalar()
+        firsts = [bucket_start(ts, "1d") for ts in (first_raw, first_chunk) if ts is not None]
+        if not firsts:
+            return {"days": 0, "readings": 0}
+
+        days = 0
+        readings = 0
+        day = min(firsts)
+        while day < before_day and days < max_days:
+            compacted = self._compact_day(db, user_id, day)
+            if compacted:
+                readings += compacted
+                days += 1
+            day += ONE_DAY
+        if days:
+            # L'historique présente désormais des agrégats : les ETags en cache sont invalidés
+            watermark_service.bump(db, user_id)
+        return {"days": days, "readings": readings}
+
+    def archived_until(self, db: Session, user_id: int):
+        """
+        Fin du dernier bucket compacté (None si l'utilisateur n'a rien en rétention).
+        Une mesure antérieure est déjà comptée dans un agrégat : elle ne doit pas être réinsérée.
+        """
+        last = db.query(func.max(models.GlucoseAggregate.bucket_start)).filter(
+            models.GlucoseAggregate.user_id == user_id
+        ).scalar()
+        return last + AGGREGATE_STEP if last is not None else None
+
+    def iter_points(self, db: Session, user_id: int, start: datetime = None, end: datetime = None):
+        """
+        (début de bucket, moyenne) des agrégats de [start, end), dans l'ordre chronologique.
+        """
+        aggregate = models.GlucoseAggregate
+        query = select(aggregate.bucket_start, aggregate.value_mean).where(
+            aggregate.user_id == user_id
+        ).order_by(aggregate.bucket_start)
+        if start is not None:
+            query = query.where(aggregate.bucket_start >= to_utc_naive(start))
+        if end is not None:
+            query = query.where(aggregate.bucket_start < to_utc_naive(end))
+        return db.execute(query.execution_options(yield_per=1000))
+
+    def history_page(self, db: Session, user_id: int, limit: int, before: tuple = None,
+                     after: tuple = None, bound: datetime = None) -> list[GlucoseRow]:
+        """
+        Même contrat que ChunkService.history_page. Chaque agrégat est présenté comme
+        une mesure (id négatif pour ne pas entrer en collision avec glucose_entries).
+        """
+        aggregate = models.GlucoseAggregate
+        query = select(
+            aggregate.id, aggregate.bucket_start, aggregate.value_mean,
+            aggregate.value_count, aggregate.value_min, aggregate.value_max
+        ).where(aggregate.user_id == user_id)
+        # Clé (timestamp, id) de l'historique = (bucket_start, -aggregate.id)
+        if before is not None:
+            query = query.where(or_(
+                aggregate.bucket_start < before[0],
+                and_(aggregate.bucket_start == before[0], aggregate.id > -before[1])
+            ))
+        if after is not None:
+            query = query.where(or_(
+                aggregate.bucket_start > after[0],
+                and_(aggregate.bucket_start == after[0], aggregate.id < -after[1])
+            ))
+            if bound is not None:
+                query = query.where(aggregate.bucket_start <= bound)
+            query = query.order_by(aggregate.bucket_start.asc(), aggregate.id.desc())
+        else:
+            if bound is not None:
+                query = query.where(aggregate.bucket_start >= bound)
+            query = query.order_by(aggregate.bucket_start.desc(), aggregate.id.asc())
+
+        return [
+            GlucoseRow(
+                -aggregate_id, user_id, mean, start,
+                note=f"Moyenne 15 min ({count} mesures, {low:.0f}-{high:.0f})"
+            )
+            for aggregate_id, start, mean, count, low, high in db.execute(query.limit(limit))
+        ]
+
+retention_service = RetentionService()
@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.quality import clean_condition
+from app.models import models
+from app.models.database import upsert, least, greatest
+
+# Seuils de la plage cible (consensus international)
+TIR_LOW = 70
+TIR_HIGH = 180
+
+# Pas de grille de bucket_start / bucket_ceil (prévision 5 min, ETag, jours UTC)
+STEPS = {
+    "5m": timedelta(minutes=5),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+# Résolutions maintenues dans glucose_rollups : seul l'agrégat journalier a des lecteurs
+# (stats de fenêtre, fenêtre glissante, HbA1c cinétique, comparaison, tier froid)
+RESOLUTIONS = ("1d",)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_utc_naive(ts: datetime) -> datetime:
+    """
+    Les sources mélangent datetimes naïfs (UTC) et aware (Nightscout) : on normalise en UTC naïf.
+    """
+    if ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def bucket_start(ts: datetime, resolution: str) -> datetime:
+    """
+    Début du bucket de `resolution` contenant `ts`.
+    """
+    step = STEPS[resolution]
+    return _EPOCH + ((to_utc_naive(ts) - _EPOCH) // step) * step
+
+
+def bucket_ceil(ts: datetime, resolution: str) -> datetime:
+    """
+    Premier début de bucket >= `ts`.
+    """
+    start = bucket_start(ts, resolution)
+    return start if start == to_utc_naive(ts) else start + STEPS[resolution]
+
+
+def _empty_bucket() -> dict:
+    return {
+        "value_count": 0, "value_sum": 0.0, "value_sum_sq": 0.0,
+        "value_min": None, "value_max": None,
+        "low_count": 0, "normal_count": 0, "high_count": 0,
+    }
+
+
+def _accumulate(agg: dict, value: float) -> None:
+    agg["value_count"] += 1
+    agg["value_sum"] += value
+    agg["value_sum_sq"] += value * value
+    agg["value_min"] = value if agg["value_min"] is None else min(agg["value_min"], value)
+    agg["value_max"] = value if agg["value_max"] is None else max(agg["value_max"], value)
+    if value < TIR_LOW:
+        agg["low_count"] += 1
+    elif value > TIR_HIGH:
+        agg["high_count"] += 1
+    else:
+        agg["normal_count"] += 1
+
+
+def _combine(agg: dict, other: dict) -> None:
+    for key in ("value_count", "value_sum", "value_sum_sq", "low_count", "normal_count", "high_count"):
+        agg[key] += other[key]
+    agg["value_min"] = other["value_min"] if agg["value_min"] is None else min(agg["value_min"], other["value_min"])
+    agg["value_max"] = other["value_max"] if agg["value_max"] is None else max(agg["value_max"], other["value_max"])
+
+
+def aggregate_points(points) -> dict:
+    """
+    Agrège des couples (timestamp, value) par (résolution, début de bucket).
+    """
+    buckets = {}
+    for ts, value in points:
+        value = float(value)
+        for resolution in RESOLUTIONS:
+            key = (resolution, bucket_start(ts, resolution))
+            agg = buckets.get(key)
+            if agg is None:
+                agg = buckets[key] = _empty_bucket()
+            _accumulate(agg, value)
+    return buckets
+
+
+class RollupService:
+    def apply_entries(self, db: Session, user_id: int, entries: list[models.GlucoseEntry]):
+        """
+        Répercute de nouvelles mesures sur les agrégats journaliers.
+        Ne commit pas : les agrégats sont écrits dans la transaction de l'appelant,
+        en même temps que les mesures brutes.
+        """
+        if not entries:
+            return
+
+        buckets = aggregate_points((e.timestamp, e.value) for e in entries)
+
+        # Un seul INSERT ... ON CONFLICT DO UPDATE : incréments côté SQL, sans lecture préalable.
+        # Deux ingestions concurrentes sur le même bucket s'additionnent au lieu de s'écraser
+        # (ou d'échouer sur uq_glucose_rollups_bucket pour un bucket nouveau).
+        rollup = models.GlucoseRollup.__table__
+        statement = upsert(db, rollup)
+        excluded, current = statement.excluded, rollup.c
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[current.user_id, current.resolution, current.bucket_start],
+                set_={
+                    "value_count": current.value_count + excluded.value_count,
+                    "value_sum": current.value_sum + excluded.value_sum,
+                    "value_sum_sq": current.value_sum_sq + excluded.value_sum_sq,
+                    "value_min": least(db, func.coalesce(current.value_min, excluded.value_min), excluded.value_min),
+                    "value_max": greatest(db, func.coalesce(current.value_max, excluded.value_max), excluded.value_max),
+                    "low_count": current.low_count + excluded.low_count,
+                    "normal_count": current.normal_count + excluded.normal_count,
+                    "high_count": current.high_count + excluded.high_count,
+                }
+            ),
+            [
+                {"user_id": user_id, "resolution": resolution, "bucket_start": start, **agg}
+                for (resolution, start), agg in buckets.items()
+            ]
+        )
+
+    def rebuild_user(self, db: Session, user_id: int) -> int:
+        """
+        Recalcule tous les agrégats d'un utilisateur (backfill) depuis les mesures brutes
+        et les journées compactées, lues en flux (tuples, pas d'objets ORM).
+        Les journées passées en rétention contribuent par leurs agrégats 15 min. Ne commit pas.
+        """
+        # Import local : chunk_service dépend lui-même de rollup_service
+        from app.services.chunk_service import chunk_service
+
+        db.query(models.GlucoseRollup).filter(
+            models.GlucoseRollup.user_id == user_id
+        ).delete(synchronize_session=False)
+
+        points = db.query(models.GlucoseEntry.timestamp, models.GlucoseEntry.value).filter(
+            models.GlucoseEntry.user_id == user_id,
+            models.GlucoseEntry.value.isnot(None),
+            models.GlucoseEntry.timestamp.isnot(None),
+            clean_condition(models.GlucoseEntry.quality)
+        ).yield_per(5000)
+        packed = ((r[0], r[2]) for r in chunk_service.iter_readings(db, user_id))
+
+        buckets = aggregate_points(chain(points, packed))
+        for row in db.query(models.GlucoseAggregate).filter(models.GlucoseAggregate.user_id == user_id).yield_per(5000):
+            agg = {
+                "value_count": row.value_count, "value_sum": row.value_mean * row.value_count,
+                "value_sum_sq": row.value_sum_sq, "value_min": row.value_min, "value_max": row.value_max,
+                "low_count": row.low_count, "normal_count": row.normal_count, "high_count": row.high_count,
+            }
+            for resolution in RESOLUTIONS:
+                key = (resolution, bucket_start(row.bucket_start, resolution))
+                _combine(buckets.setdefault(key, _empty_bucket()), agg)
+
+        db.bulk_insert_mappings(
+            models.GlucoseRollup,
+            [
+                {"user_id": user_id, "resolution": resolution, "bucket_start": start, **agg}
+                for (resolution, start), agg in buckets.items()
+            ]
+        )
+        return len(buckets)
+
+rollup_service = RollupService()
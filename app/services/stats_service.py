@@ -0,0 +1,186 @@
+from datetime import datetime
+import numpy as np
+from sqlalchemy import select, func, case, union_all
+from sqlalchemy.orm import Session
+from app.core.quality import clean_condition
+from app.models import models
+from app.services.rollup_service import TIR_LOW, TIR_HIGH, bucket_ceil, bucket_start
+from app.services.hot_cache import hot_cache
+from app.services.chunk_service import chunk_service
+from app.services import glucose_reader
+
+
+def _raw_aggregate(user_id: int, start: datetime, end: datetime = None):
+    """
+    SELECT d'agrégat (une ligne) sur glucose_entries : comptages bas/normal/haut via SUM(CASE ...).
+    Portable SQLite / PostgreSQL, aucune ligne n'est matérialisée côté Python.
+    """
+    entry = models.GlucoseEntry
+    conditions = [entry.user_id == user_id, entry.timestamp >= start, clean_condition(entry.quality)]
+    if end is not None:
+        conditions.append(entry.timestamp < end)
+
+    return select(
+        func.count(entry.value).label("n"),
+        func.sum(entry.value).label("s"),
+        func.sum(entry.value * entry.value).label("sq"),
+        func.min(entry.value).label("mn"),
+        func.max(entry.value).label("mx"),
+        func.sum(case((entry.value < TIR_LOW, 1), else_=0)).label("low"),
+        func.sum(case((entry.value.between(TIR_LOW, TIR_HIGH), 1), else_=0)).label("normal"),
+        func.sum(case((entry.value > TIR_HIGH, 1), else_=0)).label("high")
+    ).where(*conditions)
+
+
+def _daily_rollup_aggregate(user_id: int, start: datetime):
+    """
+    Même forme que `_raw_aggregate`, sur les agrégats journaliers à partir de `start`.
+    """
+    rollup = models.GlucoseRollup
+    return select(
+        func.sum(rollup.value_count).label("n"),
+        func.sum(rollup.value_sum).label("s"),
+        func.sum(rollup.value_sum_sq).label("sq"),
+        func.min(rollup.value_min).label("mn"),
+        func.max(rollup.value_max).label("mx"),
+        func.sum(rollup.low_count).label("low"),
+        func.sum(rollup.normal_count).label("normal"),
+        func.sum(rollup.high_count).label("high")
+    ).where(
+        rollup.user_id == user_id,
+        rollup.resolution == "1d",
+        rollup.bucket_start >= start
+    )
+
+
+def _retention_aggregate(user_id: int, start: datetime, end: datetime):
+    """
+    Même forme que `_raw_aggregate`, sur les agrégats 15 min de rétention de [start, end).
+    """
+    aggregate = models.GlucoseAggregate
+    return select(
+        func.sum(aggregate.value_count).label("n"),
+        func.sum(aggregate.value_mean * aggregate.value_count).label("s"),
+        func.sum(aggregate.value_sum_sq).label("sq"),
+        func.min(aggregate.value_min).label("mn"),
+        func.max(aggregate.value_max).label("mx"),
+        func.sum(aggregate.low_count).label("low"),
+        func.sum(aggregate.normal_count).label("normal"),
+        func.sum(aggregate.high_count).label("high")
+    ).where(
+        aggregate.user_id == user_id,
+        aggregate.bucket_start >= start,
+        aggregate.bucket_start < end
+    )
+
+
+def _as_summary(row) -> dict:
+    return {
+        "count": int(row.n or 0),
+        "sum": float(row.s or 0.0),
+        "sum_sq": float(row.sq or 0.0),
+        "min": row.mn,
+        "max": row.mx,
+        "low": int(row.low or 0),
+        "normal": int(row.normal or 0),
+        "high": int(row.high or 0),
+    }
+
+
+def summarize_values(values: np.ndarray) -> dict:
+    """
+    Même forme que les agrégats SQL, calculée sur un tableau de valeurs (cache chaud).
+    """
+    if values.size == 0:
+        return {"count": 0, "sum": 0.0, "sum_sq": 0.0, "min": None, "max": None, "low": 0, "normal": 0, "high": 0}
+    low = int(np.count_nonzero(values < TIR_LOW))
+    high = int(np.count_nonzero(values > TIR_HIGH))
+    return {
+        "count": int(values.size),
+        "sum": float(values.sum()),
+        "sum_sq": float(np.dot(values, values)),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "low": low,
+        "normal": int(values.size) - low - high,
+        "high": high,
+    }
+
+
+def combine_summaries(a: dict, b: dict) -> dict:
+    """
+    Fusionne deux agrégats de fenêtres disjointes.
+    """
+    def pick(f, x, y):
+        present = [v for v in (x, y) if v is not None]
+        return f(present) if present else None
+    return {
+        "count": a["count"] + b["count"],
+        "sum": a["sum"] + b["sum"],
+        "sum_sq": a["sum_sq"] + b["sum_sq"],
+        "min": pick(min, a["min"], b["min"]),
+        "max": pick(max, a["max"], b["max"]),
+        "low": a["low"] + b["low"],
+        "normal": a["normal"] + b["normal"],
+        "high": a["high"] + b["high"],
+    }
+
+
+class StatsService:
+    def load_series(self, db: Session, user_id: int, start: datetime, end: datetime = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Charge la fenêtre [start, end) en deux tableaux NumPy triés chronologiquement :
+        timestamps (secondes epoch, int64) et valeurs (mg/dL, float64).
+        Lecture depuis le cache chaud s'il est activé et couvre la fenêtre,
+        sinon depuis la base : tuples bruts + journées compactées (pas d'objets ORM).
+        """
+        if hot_cache.covers(start):
+            return hot_cache.load_series(db, user_id, start, end)
+        return glucose_reader.load_series(db, user_id, start, end)
+
+    def raw_window_stats(self, db: Session, user_id: int, start: datetime, end: datetime = None) -> dict:
+        """
+        Agrégat exact sur les mesures brutes de [start, end) en une seule requête.
+        """
+        return _as_summary(db.execute(_raw_aggregate(user_id, start, end)).one())
+
+    def window_stats(self, db: Session, user_id: int, start: datetime) -> dict:
+        """
+        Agrégat exact des mesures depuis `start`, en une seule requête :
+        mesures brutes du premier jour partiel (via l'index user_id/timestamp)
+        UNION ALL agrégats de rétention de ce jour s'il a été compacté
+        UNION ALL agrégats journaliers pour les jours pleins suivants.
+        Retourne count, sum, sum_sq, min, max, low, normal, high.
+        Servi par le cache chaud s'il est activé et couvre la fenêtre.
+        """
+        if hot_cache.covers(start):
+            _, values = self.load_series(db, user_id, start)
+            return summarize_values(values)
+
+        day_boundary = bucket_ceil(start, "1d")
+        head_day = bucket_start(start, "1d")
+        if head_day < day_boundary and chunk_service.has_chunk(db, user_id, head_day):
+            # Premier jour compacté : la partie brute est décodée, les jours pleins restent en SQL
+            _, head_values = self.load_series(db, user_id, start, day_boundary)
+            days = _as_summary(db.execute(_daily_rollup_aggregate(user_id, day_boundary)).one())
+            return combine_summaries(summarize_values(head_values), days)
+
+        parts = union_all(
+            _raw_aggregate(user_id, start, day_boundary),
+            _retention_aggregate(user_id, start, day_boundary),
+            _daily_rollup_aggregate(user_id, day_boundary)
+        ).subquery()
+
+        stmt = select(
+            func.sum(parts.c.n).label("n"),
+            func.sum(parts.c.s).label("s"),
+            func.sum(parts.c.sq).label("sq"),
+            func.min(parts.c.mn).label("mn"),
+            func.max(parts.c.mx).label("mx"),
+            func.sum(parts.c.low).label("low"),
+            func.sum(parts.c.normal).label("normal"),
+            func.sum(parts.c.high).label("high")
+        )
+        return _as_summary(db.execute(stmt).one())
+
+stats_service = StatsService()
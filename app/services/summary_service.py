@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from app.models import models
+from app.core.metrics import READINGS_PER_DAY
+from app.core.quality import clean_condition
+from app.services.rollup_service import to_utc_naive, bucket_start
+
+ROLLING_DAYS = 90  # Fenêtre glissante : jour courant + 89 jours précédents (jours UTC)
+
+
+def window_start(now: datetime = None, days: int = ROLLING_DAYS) -> datetime:
+    return bucket_start(now or datetime.utcnow(), "1d") - timedelta(days=days - 1)
+
+
+def _daily_totals(db: Session, user_id: int, start: datetime, end: datetime = None) -> tuple[int, float]:
+    """
+    (nombre, somme) des agrégats journaliers de [start, end) : au plus ROLLING_DAYS lignes.
+    """
+    rollup = models.GlucoseRollup
+    conditions = [rollup.user_id == user_id, rollup.resolution == "1d", rollup.bucket_start >= start]
+    if end is not None:
+        conditions.append(rollup.bucket_start < end)
+    count, total = db.query(func.sum(rollup.value_count), func.sum(rollup.value_sum)).filter(*conditions).one()
+    return int(count or 0), float(total or 0.0)
+
+
+class SummaryService:
+    """
+    Compteurs glycémiques par utilisateur (nombre total de mesures, somme, première
+    et dernière mesure), mis à jour dans la transaction de chaque ingestion.
+    Le détail par jour (nombre, somme) est porté par les agrégats journaliers glucose_rollups.
+    Totaux glissants 90 jours (window_*) : les mesures du jour courant et des 89 précédents
+    sont ajoutées à l'ingestion ; les jours sortis de la fenêtre sont retranchés depuis leurs
+    agrégats journaliers lorsque la fenêtre avance.
+    """
+
+    def apply_entries(self, db: Session, user_id: int, entries: list[models.GlucoseEntry]):
+        """
+        Répercute de nouvelles mesures sur la ligne de l'utilisateur. Ne commit pas.
+        """
+        points = [(to_utc_naive(e.timestamp), float(e.value)) for e in entries
+                  if e.timestamp is not None and e.value is not None]
+        if not points:
+            return
+        first = min(ts for ts, _ in points)
+        last = max(ts for ts, _ in points)
+        count = len(points)
+        total = sum(value for _, value in points)
+
+        summary = models.GlucoseUserSummary
+        row = db.get(summary, user_id)
+        target = window_start()
+        if row is None:
+            in_window = [value for ts, value in points if ts >= target]
+            db.add(summary(user_id=user_id, reading_count=count, value_sum=total,
+                           first_timestamp=first, last_timestamp=last, window_start=target,
+                           window_count=len(in_window), window_sum=sum(in_window)))
+        else:
+            self._apply_window(db, row, points, target)
+            # Expressions SQL : deux ingestions concurrentes ne perdent pas de mise à jour
+            row.reading_count = summary.reading_count + count
+            row.value_sum = summary.value_sum + total
+            row.first_timestamp = case(
+                (summary.first_timestamp.is_(None), first),
+                (summary.first_timestamp > first, first),
+                else_=summary.first_timestamp
+            )
+            row.last_timestamp = case(
+                (summary.last_timestamp.is_(None), last),
+                (summary.last_timestamp < last, last),
+                else_=summary.last_timestamp
+            )
+        db.flush()
+
+    def _apply_window(self, db: Session, row: models.GlucoseUserSummary, points, target: datetime):
+        """
+        Ajoute les mesures de la fenêtre courante (tardives comprises), puis avance la fenêtre
+        jusqu'à `target` en retranchant les jours sortis. Les mesures d'un jour sorti sont
+        ajoutées puis retranchées avec leur jour : l'agrégat journalier les contient déjà.
+        """
+        summary = models.GlucoseUserSummary
+        start = row.window_start
+        if start is None or start > target or target - start >= timedelta(days=ROLLING_DAYS):
+            # Fenêtre absente ou entièrement périmée : recalcul depuis au plus 90 agrégats
+            db.flush()  # Agrégats journaliers de cette ingestion
+            row.window_count, row.window_sum = _daily_totals(db, row.user_id, target)
+            row.window_start = target
+            return
+
+        in_window = [value for ts, value in points if ts >= start]
+        if in_window:
+            row.window_count = summary.window_count + len(in_window)
+            row.window_sum = summary.window_sum + sum(in_window)
+        if start < target:
+            db.flush()
+            expired_count, expired_sum = _daily_totals(db, row.user_id, start, target)
+            # Conditionné à l'ancienne borne : une ingestion concurrente qui a déjà avancé
+            # la fenêtre n'est pas retranchée deux fois
+            row.window_count = case(
+                (summary.window_start == start, summary.window_count - expired_count), else_=summary.window_count
+            )
+            row.window_sum = case(
+                (summary.window_start == start, summary.window_sum - expired_sum), else_=summary.window_sum
+            )
+            row.window_start = target
+
+    def get(self, db: Session, user_id: int):
+        return db.get(models.GlucoseUserSummary, user_id)
+
+    def rolling_window(self, db: Session, user_id: int, now: datetime = None) -> dict:
+        """
+        Totaux des 90 derniers jours (jour courant compris) sans écriture :
+        totaux glissants de la ligne utilisateur, moins les jours sortis depuis la dernière
+        ingestion (au plus 90 agrégats journaliers lus, aucun si la fenêtre est à jour).
+        """
+        target = window_start(now)
+        row = self.get(db, user_id)
+        start = row.window_start if row is not None else None
+        if start is None or start > target or target - start >= timedelta(days=ROLLING_DAYS):
+            count, total = _daily_totals(db, user_id, target)
+        else:
+            count, total = int(row.window_count or 0), float(row.window_sum or 0.0)
+            if start < target:
+                expired_count, expired_sum = _daily_totals(db, user_id, start, target)
+                count, total = count - expired_count, total - expired_sum
+        return {"start": target, "count": count, "sum": total}
+
+    def coverage(self, db: Session, user_id: int, start: datetime, count: int, end: datetime = None) -> float:
+        """
+        Couverture capteur (%) de [start, end) : mesures présentes / mesures attendues
+        (une toutes les 5 min), la fenêtre commençant au plus tôt à la première mesure.
+        """
+        row = self.get(db, user_id)
+        if row is None or row.first_timestamp is None or not count:
+            return 0.0
+        end = to_utc_naive(end) if end is not None else datetime.utcnow()
+        start = max(to_utc_naive(start), row.first_timestamp)
+        expected = (end - start).total_seconds() / 86400 * READINGS_PER_DAY
+        if expected <= 0:
+            return 100.0
+        return round(min(100.0, count / expected * 100), 1)
+
+    def rebuild_user(self, db: Session, user_id: int):
+        """
+        Recalcule la ligne d'un utilisateur (backfill) : totaux depuis les agrégats journaliers,
+        bornes depuis les mesures brutes, les journées compactées et la rétention. Ne commit pas.
+        """
+        rollup = models.GlucoseRollup
+        count, total = db.query(func.sum(rollup.value_count), func.sum(rollup.value_sum)).filter(
+            rollup.user_id == user_id,
+            rollup.resolution == "1d"
+        ).one()
+
+        bounds = [
+            db.query(func.min(models.GlucoseEntry.timestamp), func.max(models.GlucoseEntry.timestamp)).filter(
+                models.GlucoseEntry.user_id == user_id, models.GlucoseEntry.value.isnot(None),
+                clean_condition(models.GlucoseEntry.quality)
+            ).one(),
+            db.query(func.min(models.GlucoseChunk.first_timestamp), func.max(models.GlucoseChunk.last_timestamp)).filter(
+                models.GlucoseChunk.user_id == user_id
+            ).one(),
+            db.query(func.min(models.GlucoseAggregate.bucket_start), func.max(models.GlucoseAggregate.bucket_start)).filter(
+                models.GlucoseAggregate.user_id == user_id
+            ).one(),
+        ]
+        firsts = [to_utc_naive(b[0]) for b in bounds if b[0] is not None]
+        lasts = [to_utc_naive(b[1]) for b in bounds if b[1] is not None]
+
+        row = self.get(db, user_id)
+        if row is None:
+            row = models.GlucoseUserSummary(user_id=user_id)
+            db.add(row)
+        row.reading_count = int(count or 0)
+        row.value_sum = float(total or 0.0)
+        row.first_timestamp = min(firsts) if firsts else None
+        row.last_timestamp = max(lasts) if lasts else None
+        row.window_start = window_start()
+        row.window_count, row.window_sum = _daily_totals(db, user_id, row.window_start)
+        return row
+
+summary_service = SummaryService()
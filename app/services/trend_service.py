@@ -0,0 +1,112 @@
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.quality import clean_condition
+from app.core.trend import SMOOTHING_WINDOW, rate_of_change, trend_direction, describe_trend
+from app.models import models
+from app.services.rollup_service import to_utc_naive
+from app.services.summary_service import summary_service
+
+BUFFER_SIZE = 6  # 15 min à 5 min d'intervalle + marge pour les capteurs à 1 min (Libre)
+FRESHNESS = timedelta(minutes=30)  # Au-delà, la tendance n'est plus "actuelle"
+
+
+class TrendService:
+    """
+    Vitesse de variation et flèche de tendance calculées à l'ingestion.
+    Un petit tampon circulaire par utilisateur (deque, en mémoire du process) garde les
+    dernières mesures (timestamp, valeur, vitesse, direction) : le calcul d'une nouvelle
+    mesure ne relit pas l'historique, et la dernière tendance est servie sans requête.
+    Le tampon est rechargé depuis la base (quelques lignes via l'index user_id/timestamp)
+    s'il ne se termine pas sur la dernière mesure connue du résumé utilisateur
+    (redémarrage, autre worker, transaction annulée).
+    Le verrou ne protège que le dictionnaire des tampons (lecture d'une copie, remplacement) :
+    les requêtes sont faites hors verrou et ne sérialisent pas les autres utilisateurs.
+    """
+
+    def __init__(self):
+        self._buffers: dict[int, deque] = {}
+        self._lock = threading.Lock()
+
+    def _seed(self, db: Session, user_id: int, before) -> deque:
+        entry = models.GlucoseEntry
+        conditions = [entry.user_id == user_id, entry.value.isnot(None), clean_condition(entry.quality)]
+        if before is not None:
+            conditions.append(entry.timestamp <= before)
+        rows = db.execute(
+            select(entry.timestamp, entry.value, entry.rate_of_change, entry.trend)
+            .where(*conditions)
+            .order_by(entry.timestamp.desc())
+            .limit(BUFFER_SIZE)
+        ).all()
+        return deque(
+            ((to_utc_naive(ts), value, rate, trend) for ts, value, rate, trend in reversed(rows)),
+            maxlen=BUFFER_SIZE
+        )
+
+    def _buffer(self, db: Session, user_id: int) -> deque:
+        """
+        Copie du tampon de l'utilisateur, rechargé depuis la base s'il n'est pas à jour.
+        """
+        summary = summary_service.get(db, user_id)
+        last_timestamp = summary.last_timestamp if summary is not None else None
+        with self._lock:
+            buffer = self._buffers.get(user_id)
+            if buffer is not None and (buffer[-1][0] if buffer else None) == last_timestamp:
+                return deque(buffer, maxlen=BUFFER_SIZE)
+        buffer = self._seed(db, user_id, last_timestamp)
+        self._store(user_id, buffer)
+        return deque(buffer, maxlen=BUFFER_SIZE)
+
+    def _store(self, user_id: int, buffer: deque):
+        with self._lock:
+            self._buffers[user_id] = buffer
+
+    def apply_entries(self, db: Session, user_id: int, entries: list[models.GlucoseEntry]):
+        """
+        Renseigne rate_of_change / trend des nouvelles mesures (avant leur INSERT).
+        Doit être appelé avant la mise à jour du résumé utilisateur. Les mesures antérieures
+        à la dernière mesure connue (re-sync tardive) restent sans tendance.
+        """
+        buffer = self._buffer(db, user_id)
+        for entry in sorted(
+            (e for e in entries if e.timestamp is not None and e.value is not None),
+            key=lambda e: to_utc_naive(e.timestamp)
+        ):
+            ts = to_utc_naive(entry.timestamp)
+            if buffer and ts <= buffer[-1][0]:
+                continue
+            window = [(t, v) for t, v, _, _ in buffer if ts - t <= SMOOTHING_WINDOW]
+            rate = rate_of_change(window + [(ts, float(entry.value))])
+            entry.rate_of_change = round(rate, 2) if rate is not None else None
+            entry.trend = trend_direction(rate)
+            buffer.append((ts, float(entry.value), entry.rate_of_change, entry.trend))
+        # Ingestion concurrente du même utilisateur : la dernière écriture gagne, et un tampon
+        # qui ne finit pas sur la dernière mesure du résumé est rechargé au prochain appel
+        self._store(user_id, buffer)
+
+    def latest(self, db: Session, user_id: int):
+        """
+        Dernière mesure connue (timestamp, valeur, vitesse, direction) ou None.
+        Servie par le tampon s'il est à jour, sinon rechargée depuis la base.
+        """
+        buffer = self._buffer(db, user_id)
+        return buffer[-1] if buffer else None
+
+    def current(self, db: Session, user_id: int, now: datetime = None):
+        """
+        (valeur, libellé de tendance) de la dernière mesure si elle date de moins de 30 minutes, sinon None.
+        """
+        latest = self.latest(db, user_id)
+        if latest is None or (now or datetime.utcnow()) - latest[0] > FRESHNESS:
+            return None
+        _, value, rate, direction = latest
+        return value, describe_trend(direction, rate)
+
+    def reset(self):
+        with self._lock:
+            self._buffers.clear()
+
+trend_service = TrendService()
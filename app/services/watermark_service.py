@@ -0,0 +1,56 @@
+import hashlib
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.models import models
+from app.models.database import upsert
+
+
+class WatermarkService:
+    """
+    Watermark de données par utilisateur : (version, date de dernière ingestion).
+    Incrémenté dans la transaction de chaque écriture ; les endpoints de lecture
+    en dérivent un ETag fort et répondent 304 sans calculer d'agrégat.
+    """
+
+    def bump(self, db: Session, user_id: int):
+        """
+        Nouvelle version des données de l'utilisateur. Ne commit pas.
+        """
+        # INSERT ... ON CONFLICT DO UPDATE avec incrément côté SQL : deux ingestions concurrentes
+        # ne produisent pas la même version, ni de collision à la création de la ligne
+        table = models.UserDataWatermark.__table__
+        statement = upsert(db, table).values(user_id=user_id, data_version=1, last_ingest_at=datetime.utcnow())
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={
+                "data_version": table.c.data_version + 1,
+                "last_ingest_at": statement.excluded.last_ingest_at,
+            }
+        ))
+
+    def version(self, db: Session, user_id: int) -> int:
+        """
+        Version courante (0 si l'utilisateur n'a jamais rien écrit). Une lecture par clé primaire.
+        """
+        return db.query(models.UserDataWatermark.data_version).filter(
+            models.UserDataWatermark.user_id == user_id
+        ).scalar() or 0
+
+    def etag(self, db: Session, user_id: int, *parts) -> str:
+        """
+        ETag fort : version des données + paramètres de la requête.
+        """
+        key = ":".join(str(p) for p in (user_id, self.version(db, user_id), *parts))
+        return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-Match : liste de tags (comparaison faible, RFC 9110) ou "*".
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+watermark_service = WatermarkService()
@@ -11,6 +11,10 @@ from app.core.config import settings
 from app.api import auth, endpoints
 from app.models.database import engine, Base
 from app.core.logger import request_id_context, logger
+from app.services.partition_service import partition_service
+from app.services.alert_service import alert_service
+from app.models.database import SessionLocal
+import threading
 import uuid
 import time
 
@@ -23,6 +27,44 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+@app.on_event("startup")
+def ensure_glucose_partitions():
+    """
+    Crée à l'avance les partitions mensuelles de glucose_entries (PostgreSQL uniquement).
+    """
+    try:
+        created = partition_service.ensure_partitions(engine)
+        if created:
+            logger.info(f"{created} partition(s) glucose_entries créée(s)")
+    except Exception as e:
+        # Non bloquant : les mesures hors partition tombent dans glucose_entries_default
+        logger.error(f"Création des partitions impossible: {e}")
+
+def _sweep_missing_data_loop(period: int):
+    while True:
+        time.sleep(period)
+        db = SessionLocal()
+        try:
+            alert_service.sweep_missing(db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Vérification des alertes 'missing' impossible: {e}")
+        finally:
+            db.close()
+
+@app.on_event("startup")
+def start_missing_data_sweep():
+    """
+    Vérifie périodiquement les règles d'alerte "absence de données" (aucune mesure à l'ingestion pour les déclencher).
+    Balayage lu en base (dernière mesure du résumé, état d'alerte verrouillé) : sans doublon entre workers.
+    """
+    if settings.ALERT_MISSING_SWEEP_SECONDS > 0:
+        threading.Thread(
+            target=_sweep_missing_data_loop, args=(settings.ALERT_MISSING_SWEEP_SECONDS,),
+            name="alert-missing-sweep", daemon=True
+        ).start()
+
 @app.get("/health")
 @track(name="api_health")
 def health_check():
@@ -0,0 +1,48 @@
+import sys
+import os
+import argparse
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.models.database import SessionLocal
+from app.models import models
+from app.core.config import settings
+from app.services.cold_tier_service import cold_tier_service, month_start
+
+def archive_cold_tier(user_id: int = None):
+    """
+    Job du tier froid (à planifier, ex. cron quotidien) : exporte en Parquet les mois clos
+    nouveaux ou modifiés depuis le dernier export. Une transaction par utilisateur.
+    """
+    if not settings.COLD_TIER_ENABLED:
+        print("COLD_TIER_ENABLED vaut False : tier froid désactivé.")
+        return
+
+    db = SessionLocal()
+    try:
+        query = db.query(models.User.id)
+        if user_id is not None:
+            query = query.filter(models.User.id == user_id)
+        user_ids = [row[0] for row in query.all()]
+
+        print(f"Archivage avant {month_start(datetime.utcnow()):%Y-%m} vers {settings.COLD_TIER_DIR} "
+              f"pour {len(user_ids)} utilisateur(s)...")
+        for uid in user_ids:
+            try:
+                result = cold_tier_service.archive_user(db, uid)
+                db.commit()
+                print(f"- User {uid}: {result['months']} mois exportés ({result['readings']} lignes)")
+            except Exception as e:
+                db.rollback()
+                print(f"- User {uid}: erreur {e}")
+        print("Archivage terminé.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tier froid : export Parquet des mois clos")
+    parser.add_argument("--user-id", type=int, default=None, help="Limiter à un utilisateur")
+    args = parser.parse_args()
+    archive_cold_tier(args.user_id)
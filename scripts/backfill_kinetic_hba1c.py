@@ -0,0 +1,44 @@
+import sys
+import os
+import argparse
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.models.database import SessionLocal
+from app.models import models
+from app.services.kinetic_service import kinetic_service
+
+def backfill_kinetic_hba1c(user_id: int = None):
+    """
+    Recalcule l'état de l'HbA1c cinétique (glucose_kinetic_states) depuis les agrégats
+    journaliers : un repli vectorisé par utilisateur, une transaction par utilisateur.
+    À lancer après scripts/backfill_rollups.py si les agrégats ont eux-mêmes été recalculés.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(models.User.id)
+        if user_id is not None:
+            query = query.filter(models.User.id == user_id)
+        user_ids = [row[0] for row in query.all()]
+
+        print(f"HbA1c cinétique pour {len(user_ids)} utilisateur(s)...")
+        for uid in user_ids:
+            try:
+                days = kinetic_service.rebuild_user(db, uid)
+                db.commit()
+                estimate = kinetic_service.estimate(db, uid)
+                detail = f", HbA1c {estimate['estimated_hba1c']:.2f}%" if estimate else ""
+                print(f"- User {uid}: {days} jours{detail}")
+            except Exception as e:
+                db.rollback()
+                print(f"- User {uid}: erreur {e}")
+        print("Terminé.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill de l'HbA1c cinétique")
+    parser.add_argument("--user-id", type=int, default=None, help="Limiter à un utilisateur")
+    args = parser.parse_args()
+    backfill_kinetic_hba1c(args.user_id)
@@ -0,0 +1,42 @@
+import sys
+import os
+import argparse
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.models.database import SessionLocal
+from app.models import models
+from app.services.meal_response_service import meal_response_service
+
+def backfill_meal_responses(user_id: int = None):
+    """
+    Recalcule les réponses post-prandiales de tous les repas clos et l'index par aliment
+    (historique antérieur à la fonctionnalité, ou après correction des mesures).
+    Une transaction par utilisateur.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(models.User.id)
+        if user_id is not None:
+            query = query.filter(models.User.id == user_id)
+        user_ids = [row[0] for row in query.all()]
+
+        print(f"Recalcul des réponses aux repas pour {len(user_ids)} utilisateur(s)...")
+        for uid in user_ids:
+            try:
+                count = meal_response_service.rebuild_user(db, uid)
+                db.commit()
+                print(f"- User {uid}: {count} repas")
+            except Exception as e:
+                db.rollback()
+                print(f"- User {uid}: erreur {e}")
+        print("Recalcul terminé.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill des réponses glycémiques post-prandiales")
+    parser.add_argument("--user-id", type=int, default=None, help="Limiter à un utilisateur")
+    args = parser.parse_args()
+    backfill_meal_responses(args.user_id)
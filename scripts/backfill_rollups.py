@@ -0,0 +1,53 @@
+import sys
+import os
+import argparse
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.models.database import SessionLocal
+from app.models import models
+from app.services.rollup_service import rollup_service
+from app.services.summary_service import summary_service
+from app.services.event_service import event_service
+from app.services.forecast_service import forecast_service
+from app.services.kinetic_service import kinetic_service
+
+def backfill_rollups(user_id: int = None):
+    """
+    Recalcule les agrégats journaliers glucose_rollups depuis glucose_entries,
+    puis les compteurs par utilisateur (glucose_user_summaries), les épisodes (glucose_events)
+    le modèle de prévision (glucose_forecast_models, 14 derniers jours) et l'HbA1c cinétique.
+    Une transaction par utilisateur pour éviter les verrous longs.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(models.User.id)
+        if user_id is not None:
+            query = query.filter(models.User.id == user_id)
+        user_ids = [row[0] for row in query.all()]
+
+        print(f"Backfill des agrégats pour {len(user_ids)} utilisateur(s)...")
+        for uid in user_ids:
+            try:
+                buckets = rollup_service.rebuild_user(db, uid)
+                db.flush()
+                summary = summary_service.rebuild_user(db, uid)
+                events = event_service.rebuild_user(db, uid)
+                steps = forecast_service.rebuild_user(db, uid)
+                kinetic_service.rebuild_user(db, uid)
+                db.commit()
+                print(f"- User {uid}: {buckets} buckets, {summary.reading_count} mesures, {events} épisodes, "
+                      f"{steps} pas de prévision")
+            except Exception as e:
+                db.rollback()
+                print(f"- User {uid}: erreur {e}")
+        print("Backfill terminé.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill des agrégats glycémiques")
+    parser.add_argument("--user-id", type=int, default=None, help="Limiter à un utilisateur")
+    args = parser.parse_args()
+    backfill_rollups(args.user_id)
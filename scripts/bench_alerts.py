@@ -0,0 +1,126 @@
+import sys
+import os
+import time
+import random
+import logging
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.alerts import RuleState, UserAlertState, evaluate
+from app.core.logger import logger
+from app.models.database import Base
+from app.models import models
+from app.services.alert_service import alert_service
+from app.services.notifier import StubNotifier
+
+USERS = 1000
+READINGS = 100_000  # 100 mesures par utilisateur, entrelacées comme un flux réel
+TARGET_RATE = 10_000  # mesures/s à tenir (moteur en mémoire)
+DB_USERS = 200
+DB_READINGS = 10_000  # Une ingestion (transaction) par mesure
+DB_TARGET_P99_MS = 5.0  # Surcoût du moteur par ingestion (SQLite en mémoire)
+RULES = (
+    ("below", 70.0, 0),
+    ("below", 54.0, 15),
+    ("above", 250.0, 30),
+    ("above", 300.0, 0),
+    ("rate", -2.0, 0),
+    ("rate", 3.0, 0),
+    ("missing", None, 20),
+)
+
+def _stream(users, readings, start):
+    random.seed(0)
+    values = [100.0] * users
+    for i in range(readings):
+        user = i % users
+        values[user] = min(400.0, max(40.0, values[user] + random.gauss(0, 12)))
+        yield user, start + timedelta(minutes=5 * (i // users)), values[user], random.gauss(0, 1.5)
+
+def _report(label, count, elapsed, latencies):
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] / 1000
+    p99 = latencies[int(len(latencies) * 0.99)] / 1000
+    worst = latencies[-1] / 1000
+    print(f"{label}")
+    print(f"  Débit   : {count / elapsed:,.0f} mesures/s")
+    print(f"  Latence : p50 {p50:.1f} µs, p99 {p99:.1f} µs, max {worst:.1f} µs")
+    return p99
+
+def bench_engine():
+    """Moteur seul (app/core/alerts.py) : évaluation d'une mesure sur un état en mémoire."""
+    states = [
+        UserAlertState(user_id, [RuleState(i, kind, threshold, duration) for i, (kind, threshold, duration) in enumerate(RULES)])
+        for user_id in range(USERS)
+    ]
+    stream = list(_stream(USERS, READINGS, datetime(2026, 1, 1)))
+
+    latencies = []
+    fired = 0
+    t_start = time.perf_counter()
+    for user, ts, value, rate in stream:
+        t0 = time.perf_counter_ns()
+        fired += len(evaluate(states[user], ts, value, rate))
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - t_start
+
+    p99 = _report(f"Moteur en mémoire : {READINGS} mesures, {USERS} utilisateurs, {len(RULES)} règles, {fired} alertes",
+                  READINGS, elapsed, latencies)
+    assert READINGS / elapsed >= TARGET_RATE, "Débit insuffisant"
+    assert p99 < 1000, "Évaluation au-delà de la milliseconde"
+
+def bench_ingest_path():
+    """
+    Chemin d'ingestion : alert_service.apply_entries (requête des règles, ligne d'état
+    SELECT ... FOR UPDATE créée au besoin, réécriture de l'état, alertes) puis flush,
+    une transaction par mesure. SQLite ignore FOR UPDATE : le coût du verrou de ligne
+    PostgreSQL n'est pas mesuré.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    users = [models.User(email=f"bench{i}@diaside.com", hashed_password="x") for i in range(DB_USERS)]
+    db.add_all(users)
+    db.flush()
+    db.add_all([
+        models.AlertRule(user_id=user.id, kind=kind, threshold=threshold, duration_minutes=duration, enabled=True)
+        for user in users for kind, threshold, duration in RULES
+    ])
+    db.commit()
+    user_ids = [user.id for user in users]
+
+    now = datetime.utcnow()
+    start = now - timedelta(minutes=5 * (DB_READINGS // DB_USERS))
+    latencies = []
+    t_start = time.perf_counter()
+    for user, ts, value, rate in _stream(DB_USERS, DB_READINGS, start):
+        entry = models.GlucoseEntry(user_id=user_ids[user], timestamp=ts, value=value, rate_of_change=rate)
+        t0 = time.perf_counter_ns()
+        alert_service.apply_entries(db, user_ids[user], [entry], now=now)
+        db.flush()
+        latencies.append(time.perf_counter_ns() - t0)
+        db.commit()
+    elapsed = time.perf_counter() - t_start
+    alerts = db.query(models.GlucoseAlert).count()
+
+    p99 = _report(f"apply_entries + flush (SQLite) : {DB_READINGS} ingestions, {DB_USERS} utilisateurs, {alerts} alertes",
+                  DB_READINGS, elapsed, latencies)
+    assert p99 < DB_TARGET_P99_MS * 1000, "Surcoût des alertes à l'ingestion trop élevé"
+
+def run_benchmark():
+    logger.setLevel(logging.WARNING)  # StubNotifier journalise chaque alerte
+    alert_service.notifier = StubNotifier()
+    bench_engine()
+    bench_ingest_path()
+    print(f"OK : moteur sous la milliseconde à {TARGET_RATE:,} mesures/s ; "
+          f"surcoût par ingestion p99 < {DB_TARGET_P99_MS} ms.")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,72 @@
+import sys
+import os
+import time
+import tempfile
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base
+from app.models import models
+from app.services.chunk_service import chunk_service, decode_readings
+from app.services.stats_service import stats_service
+
+DAYS = 90
+POINTS_PER_DAY = 288 # Every 5 mins
+
+def file_size(engine, path):
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+    return os.path.getsize(path)
+
+def run_benchmark():
+    path = os.path.join(tempfile.mkdtemp(), "bench_chunks.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    user = models.User(email="bench@diaside.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    n = DAYS * POINTS_PER_DAY
+    now = datetime.utcnow()
+    start = now - timedelta(days=DAYS)
+    print(f"Génération de {n} mesures...")
+    db.bulk_insert_mappings(models.GlucoseEntry, [
+        {"user_id": user_id, "value": 100 + (i * 7) % 120, "timestamp": start + timedelta(minutes=5 * i),
+         "note": "Nightscout (xDrip)"}
+        for i in range(n)
+    ])
+    db.commit()
+    raw_bytes = file_size(engine, path)
+
+    _, before = stats_service.load_series(db, user_id, start)
+    t0 = time.perf_counter()
+    result = chunk_service.pack_user(db, user_id, now + timedelta(days=1))
+    db.commit()
+    pack_ms = (time.perf_counter() - t0) * 1000
+    packed_bytes = file_size(engine, path)
+
+    blobs = [row[0] for row in db.query(models.GlucoseChunk.data).all()]
+    blob_bytes = sum(len(b) for b in blobs)
+    t0 = time.perf_counter()
+    decoded = sum(len(decode_readings(b)) for b in blobs)
+    decode_s = time.perf_counter() - t0
+
+    print(f"Compactage : {result['days']} jours, {pack_ms:.0f} ms")
+    print(f"Fichier SQLite : {raw_bytes / n:.1f} -> {packed_bytes / n:.1f} octets/mesure")
+    print(f"Blobs seuls     : {blob_bytes / n:.2f} octets/mesure")
+    print(f"Décodage        : {decoded / decode_s / 1e6:.2f} M mesures/s")
+
+    _, after = stats_service.load_series(db, user_id, start)
+    assert before.tolist() == after.tolist() and after.size == decoded
+    print("Séries identiques avant / après compactage.")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.core import forecast
+
+USERS = 5000
+STEPS = 288  # Une journée de pas de 5 minutes
+
+def run_benchmark():
+    rng = np.random.default_rng(0)
+    t = np.arange(STEPS + forecast.ORDER)
+    phases = rng.uniform(0, 2 * np.pi, USERS)[:, None]
+    series = forecast.normalize(140 + 60 * np.sin(2 * np.pi * t / 48 + phases) + rng.normal(0, 3, (USERS, t.size)))
+
+    # 1. Un ping : désérialisation, mise à jour RLS, sérialisation (chemin d'ingestion)
+    theta, covariance = forecast.initial_state()
+    blobs = (theta.tobytes(), covariance.tobytes())
+    k = forecast.ORDER + 1
+    t0 = time.perf_counter()
+    for step in range(STEPS):
+        theta = np.frombuffer(blobs[0]).copy()
+        covariance = np.frombuffer(blobs[1]).reshape(k, k).copy()
+        forecast.rls_update(theta, covariance, series[0, step:step + forecast.ORDER], series[0, step + forecast.ORDER])
+        blobs = (theta.tobytes(), covariance.tobytes())
+    per_ping = (time.perf_counter() - t0) / STEPS * 1e6
+    print(f"Mise à jour par ping      : {per_ping:.1f} µs ({1e6 / per_ping:,.0f} pings/s sur un cœur)")
+
+    # 2. Lot : tous les utilisateurs avancent d'un pas en un appel vectorisé
+    theta, covariance = forecast.initial_state((USERS,))
+    t0 = time.perf_counter()
+    for step in range(STEPS):
+        forecast.rls_update(theta, covariance, series[:, step:step + forecast.ORDER], series[:, step + forecast.ORDER])
+    batch = (time.perf_counter() - t0) / STEPS
+    print(f"Lot de {USERS} utilisateurs : {batch * 1000:.2f} ms par pas ({USERS / batch:,.0f} mises à jour/s)")
+
+    # 3. Prévision 60 min pour tous les utilisateurs
+    t0 = time.perf_counter()
+    predicted = forecast.predict(theta, series[:, -forecast.ORDER:], 12)
+    print(f"Prévision 60 min (lot)    : {(time.perf_counter() - t0) * 1000:.2f} ms")
+
+    expected = 140 + 60 * np.sin(2 * np.pi * (t[-1] + np.arange(1, 13)) / 48 + phases)
+    mae = np.abs(forecast.denormalize(predicted) - expected)
+    print(f"Erreur absolue moyenne    : 30 min {mae[:, 5].mean():.1f} mg/dL, 60 min {mae[:, 11].mean():.1f} mg/dL")
+
+if __name__ == "__main__":
+    run_benchmark()
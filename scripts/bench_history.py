@@ -0,0 +1,76 @@
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base
+from app.models import models, schemas
+from app.models.records import dump_rows
+from app.services import glucose_reader
+
+ROWS = 10_000
+RUNS = 10
+ADAPTER = TypeAdapter(list[schemas.GlucoseEntry])
+
+def legacy_page(db, user_id):
+    """Ancienne implémentation : objets ORM, puis validation response_model (from_attributes) et sérialisation."""
+    entries = db.query(models.GlucoseEntry).filter(
+        models.GlucoseEntry.user_id == user_id
+    ).order_by(models.GlucoseEntry.timestamp.desc(), models.GlucoseEntry.id.desc()).limit(ROWS).all()
+    return ADAPTER.dump_json(ADAPTER.validate_python(entries, from_attributes=True))
+
+def construct_page(db, user_id):
+    """Variante intermédiaire : lecture Core, modèles Pydantic via model_construct (sans validation)."""
+    rows = glucose_reader.history_rows(db, user_id, ROWS)
+    return ADAPTER.dump_json([
+        schemas.GlucoseEntry.model_construct(**row.as_dict()) for row in rows
+    ])
+
+def core_page(db, user_id):
+    """Implémentation actuelle : lecture Core -> GlucoseRow (__slots__) -> JSON."""
+    return dump_rows(glucose_reader.history_rows(db, user_id, ROWS))
+
+def measure(label, fn, db):
+    t0 = time.perf_counter()
+    for _ in range(RUNS):
+        db.expunge_all()
+        result = fn()
+    elapsed = (time.perf_counter() - t0) / RUNS
+    print(f"{label:<34} {elapsed * 1000:8.2f} ms/page   {elapsed / ROWS * 1e6:6.2f} µs/ligne")
+    return result
+
+def run_benchmark():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    user = models.User(email="bench@diaside.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    start = datetime.utcnow() - timedelta(minutes=5 * ROWS)
+    print(f"Génération de {ROWS} mesures...")
+    db.bulk_insert_mappings(models.GlucoseEntry, [
+        {"user_id": user_id, "value": 60 + (i * 7) % 220, "timestamp": start + timedelta(minutes=5 * i),
+         "rate_of_change": 0.5, "trend": "Flat"}
+        for i in range(ROWS)
+    ])
+    db.commit()
+
+    before = measure("Avant (ORM + response_model)", lambda: legacy_page(db, user_id), db)
+    measure("Core + model_construct", lambda: construct_page(db, user_id), db)
+    after = measure("Après (Core + GlucoseRow)", lambda: core_page(db, user_id), db)
+    assert before == after
+    print("JSON identique.")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,42 @@
+import sys
+import os
+import math
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.core.metrics import compute_cgm_metrics, mage
+
+DAYS = 90
+POINTS_PER_DAY = 288  # Une mesure toutes les 5 minutes
+RUNS = 20
+TARGET_MS = 50.0  # Métriques du consensus sur 90 jours, un appel
+
+def run_benchmark():
+    rng = np.random.default_rng(0)
+    n = DAYS * POINTS_PER_DAY
+    values = 140 + 40 * np.sin(np.arange(n) / POINTS_PER_DAY * 2 * math.pi) + rng.normal(0, 10, n)
+    sd = float(values.std(ddof=1))
+
+    compute_cgm_metrics(values, days=DAYS)  # Préchauffage
+    timings = []
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        compute_cgm_metrics(values, days=DAYS)
+        timings.append(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for _ in range(RUNS):
+        mage(values, sd)
+    mage_ms = (time.perf_counter() - t0) / RUNS * 1000
+
+    median_ms = sorted(timings)[RUNS // 2] * 1000
+    print(f"compute_cgm_metrics ({DAYS} jours, {n} mesures) : médiane {median_ms:.2f} ms, max {max(timings) * 1000:.2f} ms")
+    print(f"  dont MAGE : {mage_ms:.2f} ms")
+    assert median_ms < TARGET_MS, "Métriques 90 jours trop lentes"
+    print(f"OK : sous {TARGET_MS:.0f} ms.")
+
+if __name__ == "__main__":
+    run_benchmark()
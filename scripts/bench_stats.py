@@ -0,0 +1,77 @@
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base
+from app.models import models
+from app.services.rollup_service import rollup_service
+from app.services.stats_service import stats_service
+
+DAYS = 90
+POINTS_PER_DAY = 288 # Every 5 mins
+RUNS = 20
+
+def legacy_tir(db, user_id, start):
+    """Ancienne implémentation : .all() + boucles Python."""
+    entries = db.query(models.GlucoseEntry).filter(
+        models.GlucoseEntry.user_id == user_id,
+        models.GlucoseEntry.timestamp >= start
+    ).all()
+    total = len(entries)
+    low = sum(1 for e in entries if e.value < 70)
+    normal = sum(1 for e in entries if 70 <= e.value <= 180)
+    high = sum(1 for e in entries if e.value > 180)
+    return {"count": total, "low": low, "normal": normal, "high": high, "sum": sum(e.value for e in entries)}
+
+def measure(label, fn, db):
+    loaded = []
+    listener = lambda target, context: loaded.append(1)
+    event.listen(models.GlucoseEntry, "load", listener)
+    try:
+        t0 = time.perf_counter()
+        for _ in range(RUNS):
+            db.expunge_all()
+            result = fn()
+        elapsed = (time.perf_counter() - t0) / RUNS
+    finally:
+        event.remove(models.GlucoseEntry, "load", listener)
+    print(f"{label:<28} {elapsed * 1000:8.2f} ms/appel   lignes ORM matérialisées/appel: {len(loaded) // RUNS}")
+    return result
+
+def run_benchmark():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    user = models.User(email="bench@diaside.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    now = datetime.utcnow()
+    start = now - timedelta(days=DAYS)
+    print(f"Génération de {DAYS * POINTS_PER_DAY} mesures...")
+    db.bulk_insert_mappings(models.GlucoseEntry, [
+        {"user_id": user_id, "value": 60 + (i * 7) % 220, "timestamp": start + timedelta(minutes=5 * i)}
+        for i in range(DAYS * POINTS_PER_DAY)
+    ])
+    rollup_service.rebuild_user(db, user_id)
+    db.commit()
+
+    window_start = now - timedelta(days=DAYS)
+    before = measure("Avant (ORM .all())", lambda: legacy_tir(db, user_id, window_start), db)
+    after = measure("Après (SUM(CASE) + rollups)", lambda: stats_service.window_stats(db, user_id, window_start), db)
+    assert before["count"] == after["count"]
+    assert (before["low"], before["normal"], before["high"]) == (after["low"], after["normal"], after["high"])
+    print("Résultats identiques.")
+
+if __name__ == "__main__":
+    run_benchmark()
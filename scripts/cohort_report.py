@@ -0,0 +1,32 @@
+import sys
+import os
+import argparse
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.services.cold_tier_service import cold_tier_service, month_start
+
+def cohort_report(months: int = 12):
+    """
+    Rapport de cohorte sur le tier froid (DuckDB, sans la base vive) : par mois archivé,
+    nombre d'utilisateurs et quartiles de la glycémie moyenne et du TIR par utilisateur.
+    """
+    end = month_start(datetime.utcnow())
+    start = month_start(end - timedelta(days=31 * months))
+    rows = cold_tier_service.cohort_stats(start, end)
+    if not rows:
+        print(f"Aucun mois archivé dans {cold_tier_service.directory}.")
+        return
+    print(f"{'Mois':<8} {'Users':>5}  {'Moyenne Q1/Q2/Q3 (mg/dL)':<26} TIR Q1/Q2/Q3 (%)")
+    for row in rows:
+        mean_q = "/".join(f"{v:.0f}" for v in row["mean_quartiles"])
+        tir_q = "/".join(f"{v:.0f}" for v in row["tir_quartiles"])
+        print(f"{row['month']:%Y-%m}  {row['users']:>5}  {mean_q:<26} {tir_q}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rapport de cohorte sur les archives Parquet")
+    parser.add_argument("--months", type=int, default=12, help="Nombre de mois clos couverts")
+    args = parser.parse_args()
+    cohort_report(args.months)
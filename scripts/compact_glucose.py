@@ -0,0 +1,56 @@
+import sys
+import os
+import argparse
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.models.database import SessionLocal
+from app.models import models
+from app.core.config import settings
+from app.services.retention_service import retention_service
+
+def compact_glucose(user_id: int = None, batch_days: int = 7):
+    """
+    Job de rétention (à planifier, ex. cron quotidien) : au-delà de GLUCOSE_RETENTION_DAYS,
+    les mesures 5 min sont remplacées par des agrégats 15 min.
+    Transactions courtes : au plus `batch_days` journées d'un utilisateur par commit.
+    """
+    if settings.GLUCOSE_RETENTION_DAYS <= 0:
+        print("GLUCOSE_RETENTION_DAYS vaut 0 : rétention désactivée.")
+        return
+
+    db = SessionLocal()
+    try:
+        query = db.query(models.User.id)
+        if user_id is not None:
+            query = query.filter(models.User.id == user_id)
+        user_ids = [row[0] for row in query.all()]
+
+        before = datetime.utcnow() - timedelta(days=settings.GLUCOSE_RETENTION_DAYS)
+        print(f"Rétention avant {before:%Y-%m-%d} pour {len(user_ids)} utilisateur(s)...")
+        for uid in user_ids:
+            days = readings = 0
+            try:
+                while True:
+                    result = retention_service.compact_user(db, uid, before, max_days=batch_days)
+                    db.commit()
+                    if not result["days"]:
+                        break
+                    days += result["days"]
+                    readings += result["readings"]
+                print(f"- User {uid}: {readings} mesures agrégées sur {days} jours")
+            except Exception as e:
+                db.rollback()
+                print(f"- User {uid}: erreur {e}")
+        print("Rétention terminée.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rétention : agrégation 15 min des mesures anciennes")
+    parser.add_argument("--user-id", type=int, default=None, help="Limiter à un utilisateur")
+    parser.add_argument("--batch-days", type=int, default=7, help="Journées par transaction")
+    args = parser.parse_args()
+    compact_glucose(args.user_id, args.batch_days)
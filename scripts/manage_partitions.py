@@ -0,0 +1,37 @@
+import sys
+import os
+import argparse
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.models.database import engine
+from app.services.partition_service import partition_service
+
+def manage_partitions(months_ahead: int = 3, detach_before: str = None):
+    """
+    Maintenance des partitions mensuelles de glucose_entries (PostgreSQL) :
+    création des mois à venir, et détachement optionnel des mois anciens.
+    """
+    with engine.begin() as conn:
+        if not partition_service.is_partitioned(conn):
+            print("glucose_entries n'est pas partitionnée (SQLite ou migration non appliquée) : rien à faire.")
+            return
+
+        created = partition_service.ensure_partitions(conn, months_ahead)
+        print(f"{created} partition(s) créée(s).")
+
+        if detach_before:
+            month = datetime.strptime(detach_before, "%Y-%m").date()
+            for name in partition_service.detach_before(conn, month):
+                print(f"- {name} détachée")
+
+        print("Partitions attachées : " + ", ".join(partition_service.list_partitions(conn)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partitions mensuelles de glucose_entries (PostgreSQL)")
+    parser.add_argument("--months-ahead", type=int, default=3, help="Mois à créer à l'avance")
+    parser.add_argument("--detach-before", default=None, help="Détacher les mois antérieurs (AAAA-MM)")
+    args = parser.parse_args()
+    manage_partitions(args.months_ahead, args.detach_before)
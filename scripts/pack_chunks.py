@@ -0,0 +1,55 @@
+import sys
+import os
+import argparse
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.models.database import SessionLocal
+from app.models import models
+from app.core.config import settings
+from app.services.chunk_service import chunk_service
+
+def pack_chunks(user_id: int = None, unpack: bool = False):
+    """
+    Compacte les journées closes (plus anciennes que GLUCOSE_CHUNK_AFTER_DAYS) en glucose_chunks,
+    ou restaure les mesures brutes avec --unpack.
+    Une transaction par utilisateur pour éviter les verrous longs.
+    """
+    if not unpack and not settings.GLUCOSE_CHUNK_STORAGE:
+        print("GLUCOSE_CHUNK_STORAGE est désactivé : rien à faire.")
+        return
+
+    db = SessionLocal()
+    try:
+        query = db.query(models.User.id)
+        if user_id is not None:
+            query = query.filter(models.User.id == user_id)
+        user_ids = [row[0] for row in query.all()]
+
+        before = datetime.utcnow() - timedelta(days=settings.GLUCOSE_CHUNK_AFTER_DAYS)
+        print(f"{'Restauration' if unpack else 'Compactage'} pour {len(user_ids)} utilisateur(s)...")
+        for uid in user_ids:
+            try:
+                if unpack:
+                    restored = chunk_service.unpack_user(db, uid)
+                    db.commit()
+                    print(f"- User {uid}: {restored} mesures restaurées")
+                else:
+                    result = chunk_service.pack_user(db, uid, before)
+                    db.commit()
+                    print(f"- User {uid}: {result['readings']} mesures compactées en {result['days']} jours")
+            except Exception as e:
+                db.rollback()
+                print(f"- User {uid}: erreur {e}")
+        print("Terminé.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compactage des mesures glycémiques par journée")
+    parser.add_argument("--user-id", type=int, default=None, help="Limiter à un utilisateur")
+    parser.add_argument("--unpack", action="store_true", help="Restaurer les mesures brutes")
+    args = parser.parse_args()
+    pack_chunks(args.user_id, args.unpack)
@@ -5,6 +5,11 @@ sys.path.append(os.getcwd())
 from app.models.database import SessionLocal, engine, Base
 from app.models import models
 from app.core import security
+from app.services.rollup_service import rollup_service
+from app.services.summary_service import summary_service
+from app.services.event_service import event_service
+from app.services.forecast_service import forecast_service
+from app.services.kinetic_service import kinetic_service
 from datetime import datetime, timedelta
 import random
 import math
@@ -93,6 +98,12 @@ def seed():
                 for p in points
             ]
         )
+        # Agrégats (bulk insert -> pas de passage par l'ingestion)
+        rollup_service.rebuild_user(db, user.id)
+        summary_service.rebuild_user(db, user.id)
+        event_service.rebuild_user(db, user.id)
+        forecast_service.rebuild_user(db, user.id)
+        kinetic_service.rebuild_user(db, user.id)
         db.commit()
         print("Seeding Complete!") # Removed emoji
         
@@ -0,0 +1,66 @@
+import json
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base
+from app.models import models, schemas
+from app.services.ingest_service import ingest_service
+
+
+@pytest.fixture
+def db():
+    """Session SQLite en mémoire, schéma créé à partir des modèles."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def user(db):
+    db_user = models.User(email="patient@diaside.com", hashed_password="x")
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+
+@pytest.fixture
+def ingest(db, user):
+    """
+    Ingère des mesures de `user` par IngestService et retourne les GlucoseEntry créées.
+    `values` : une mesure toutes les `step` minutes depuis `start` (décalée de `offset` pas) ;
+    `points` : couples (timestamp, valeur) explicites. `note` : texte, ou fonction de l'index.
+    """
+    def _ingest(values=(), start=None, step=5, offset=0, points=None, note=None, commit=True):
+        if points is None:
+            points = [(start + timedelta(minutes=step * (offset + i)), v) for i, v in enumerate(values)]
+        entries = [
+            models.GlucoseEntry(user_id=user.id, value=v, timestamp=ts, note=note(i) if callable(note) else note)
+            for i, (ts, v) in enumerate(points)
+        ]
+        ingest_service.add_entries(db, user.id, entries)
+        if commit:
+            db.commit()
+        return entries
+    return _ingest
+
+
+@pytest.fixture
+def history_page():
+    """Corps JSON de GET /history -> mesures (le endpoint sérialise directement)."""
+    def _page(raw):
+        return [schemas.GlucoseEntry.model_validate(e) for e in json.loads(raw.body)]
+    return _page
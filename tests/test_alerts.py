@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+
+from app.api.endpoints import replace_alert_rules, get_alerts
+from app.core.alerts import RuleState, UserAlertState, evaluate, check_missing
+from app.models import models, schemas
+from app.services.alert_service import alert_service, AlertService
+from app.services.notifier import StubNotifier
+from app.services.trend_service import trend_service
+
+T0 = datetime(2026, 7, 1, 12, 0)
+
+
+@pytest.fixture
+def notifier(monkeypatch):
+    stub = StubNotifier()
+    monkeypatch.setattr(alert_service, "notifier", stub)
+    trend_service.reset()
+    return stub
+
+
+def _feed(state, values, start=T0, rates=None):
+    fired = []
+    for i, value in enumerate(values):
+        rate = rates[i] if rates else None
+        fired.extend(evaluate(state, start + timedelta(minutes=5 * i), value, rate))
+    return fired
+
+
+def test_threshold_fires_once_then_rearms():
+    state = UserAlertState(1, [RuleState(1, "below", 70)])
+    fired = _feed(state, [100, 65, 60, 80, 62])
+    assert [a["value"] for a in fired] == [65, 62]
+    assert fired[0]["message"] == "Glycémie basse : 65 mg/dL (< 70)"
+
+
+def test_sustained_rule_needs_continuous_condition():
+    state = UserAlertState(1, [RuleState(7, "above", 250, duration_minutes=15)])
+    assert _feed(state, [260, 270, 280]) == []  # 10 min
+    (alert,) = _feed(state, [290], start=T0 + timedelta(minutes=15))
+    assert alert["rule_id"] == 7 and alert["message"].endswith("depuis 15 min")
+
+    # Un trou capteur remet le compteur à zéro
+    state = UserAlertState(1, [RuleState(7, "above", 250, duration_minutes=15)])
+    _feed(state, [260, 270])
+    assert _feed(state, [280, 280], start=T0 + timedelta(hours=2)) == []
+
+
+def test_rate_rule_and_late_readings():
+    state = UserAlertState(1, [RuleState(3, "rate", -2.0)])
+    fired = _feed(state, [150, 140, 125], rates=[None, -2.0, -3.0])
+    assert [a["value"] for a in fired] == [140]
+    assert "Chute rapide : -2.0 mg/dL/min" in fired[0]["message"]
+    assert evaluate(state, T0, 50, -5.0) == []  # Antérieure à la dernière mesure
+
+
+def test_missing_data_rule():
+    state = UserAlertState(1, [RuleState(4, "missing", None, duration_minutes=20)])
+    assert check_missing(state, T0) == []  # Jamais vu
+    _feed(state, [100])
+    assert check_missing(state, T0 + timedelta(minutes=10)) == []
+    (alert,) = check_missing(state, T0 + timedelta(minutes=25))
+    assert alert["message"] == "Pas de données capteur depuis 25 min"
+    assert check_missing(state, T0 + timedelta(minutes=30)) == []  # Déjà signalé
+    _feed(state, [100], start=T0 + timedelta(minutes=35))
+    assert len(check_missing(state, T0 + timedelta(minutes=60))) == 1
+
+
+def test_first_state_row_is_created_once(db, user, notifier):
+    # Deux évaluations avant tout flush (ingestions concurrentes) : une seule ligne d'état
+    entries = [models.GlucoseEntry(user_id=user.id, value=v, timestamp=T0 + timedelta(minutes=5 * i))
+               for i, v in enumerate((120, 60))]
+    alert_service.apply_entries(db, user.id, entries[:1], now=T0)
+    alert_service.apply_entries(db, user.id, entries[1:], now=T0)
+    db.commit()
+    row = db.query(models.GlucoseAlertState).one()
+    assert row.last_timestamp == T0 + timedelta(minutes=5)
+    assert [a["kind"] for a in notifier.sent] == ["below"]
+
+
+def test_default_rules_at_ingest_dispatch_after_commit_only(db, user, ingest, notifier):
+    start = datetime.utcnow() - timedelta(minutes=30)
+    ingest([120, 320], start, commit=False)
+    assert len(notifier.sent) == 0  # Pas encore commité
+    db.commit()
+    assert [a["kind"] for a in notifier.sent] == ["above"]
+
+    ingest([60], start + timedelta(minutes=10), commit=False)
+    db.rollback()
+    assert len(notifier.sent) == 1
+
+    alerts = get_alerts(days=1, current_user=user, db=db)
+    assert [(a.kind, a.value, a.rule_id) for a in alerts] == [("above", 320, None)]
+
+
+def test_history_import_updates_state_without_notifying(db, user, ingest, notifier):
+    ingest([50, 50], datetime.utcnow() - timedelta(days=2), commit=False)
+    db.commit()
+    assert len(notifier.sent) == 0
+
+
+def test_user_rules_replace_defaults(db, user, ingest, notifier):
+    rules = replace_alert_rules(
+        [schemas.AlertRuleBase(kind="above", threshold=200), schemas.AlertRuleBase(kind="rate", threshold=-2)],
+        current_user=user, db=db
+    )
+    start = datetime.utcnow() - timedelta(minutes=30)
+    ingest([190, 210, 195, 180, 165], start, commit=False)
+    db.commit()
+    assert [(a["kind"], a["rule_id"]) for a in notifier.sent] == [("above", rules[0].id), ("rate", rules[1].id)]
+
+    with pytest.raises(ValidationError):
+        schemas.AlertRuleBase(kind="missing")
+    with pytest.raises(ValidationError):
+        schemas.AlertRuleBase(kind="below")
+
+
+def test_state_survives_restart_and_rollback(db, user, ingest, notifier):
+    replace_alert_rules([schemas.AlertRuleBase(kind="above", threshold=250, duration_minutes=10)], current_user=user, db=db)
+    start = datetime.utcnow() - timedelta(minutes=30)
+    ingest([260, 270, 280], start, commit=False)
+    db.commit()
+    assert len(notifier.sent) == 1
+
+    # Nouveau process : l'état vient de la base, la condition soutenue ne se redéclenche pas
+    restarted = AlertService(notifier=notifier)
+    restarted.apply_entries(db, user.id, [
+        models.GlucoseEntry(user_id=user.id, value=290, timestamp=start + timedelta(minutes=15))
+    ])
+    db.commit()
+    assert len(notifier.sent) == 1
+
+    # Rollback : l'état n'avance pas, la même mesure est réévaluée à la transaction suivante
+    ingest([120], start + timedelta(minutes=20), commit=False)
+    db.rollback()
+    state = db.get(models.GlucoseAlertState, user.id)
+    assert state.last_timestamp == start + timedelta(minutes=15)
+    assert list(state.rules.values()) == [[start.isoformat(), True]]
+
+
+def test_missing_sweep_reads_database(db, user, ingest, notifier):
+    replace_alert_rules([schemas.AlertRuleBase(kind="missing", duration_minutes=20)], current_user=user, db=db)
+    now = datetime.utcnow()
+    ingest([120], now - timedelta(minutes=30), commit=False)
+    db.commit()
+
+    # Autre worker, sans état en mémoire : la dernière mesure vient du résumé utilisateur
+    other = AlertService(notifier=notifier)
+    assert other.sweep_missing(db, now=now) == 1
+    db.commit()
+    assert notifier.sent[0]["message"] == "Pas de données capteur depuis 30 min"
+    assert alert_service.sweep_missing(db, now=now + timedelta(minutes=5)) == 0  # Déjà signalé
+
+    ingest([120], now, commit=False)
+    db.commit()
+    assert alert_service.sweep_missing(db, now=now + timedelta(minutes=10)) == 0
+    assert other.sweep_missing(db, now=now + timedelta(minutes=25)) == 1
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app.api.endpoints import receive_cgm_batch
+from app.models import models, schemas
+from app.services.trend_service import trend_service
+
+START = datetime(2026, 6, 1, 8, 0)
+
+
+def _batch(points, device_id="phone"):
+    return schemas.CGMBatch(device_id=device_id, readings=[
+        schemas.CGMBatchReading(value=v, timestamp=START + timedelta(minutes=m)) for m, v in points
+    ])
+
+
+def test_batch_single_transaction_and_statuses(db, user):
+    trend_service.reset()
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(session))
+
+    points = [(5 * i, 100 + i) for i in range(300)]
+    result = receive_cgm_batch(_batch(points), current_user=user, db=db)
+    assert (result["accepted"], result["duplicates"]) == (300, 0)
+    assert len(commits) == 1
+    assert db.query(models.GlucoseEntry).count() == 300
+
+    ids = {item["id"] for item in result["items"]}
+    assert None not in ids and len(ids) == 300
+    last = db.get(models.GlucoseEntry, result["items"][-1]["id"])
+    assert last.note == "CGM Upload (phone)" and last.trend is not None
+
+
+def test_batch_duplicates(db, user):
+    trend_service.reset()
+    receive_cgm_batch(_batch([(0, 100), (5, 105)]), current_user=user, db=db)
+    # Renvoi partiel (chevauchement), doublon interne au lot, même instant exprimé en UTC aware
+    batch = _batch([(5, 105), (10, 110), (10, 111), (15, 115)])
+    batch.readings.append(schemas.CGMBatchReading(value=100, timestamp=START.replace(tzinfo=timezone.utc)))
+    result = receive_cgm_batch(batch, current_user=user, db=db)
+
+    assert [item["status"] for item in result["items"]] == [
+        "duplicate", "accepted", "duplicate", "accepted", "duplicate"
+    ]
+    assert (result["accepted"], result["duplicates"]) == (2, 3)
+    assert result["items"][2]["id"] is None
+    values = [e.value for e in db.query(models.GlucoseEntry).order_by(models.GlucoseEntry.timestamp)]
+    assert values == [100, 105, 110, 115]
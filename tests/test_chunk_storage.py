@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime, timedelta
+from fastapi import Response
+
+from app.api.endpoints import read_history
+from app.core.pagination import encode_cursor
+from app.core.chunk_codec import encode_chunk, decode_chunk, to_epoch_micros
+from app.models import models
+from app.services.chunk_service import chunk_service
+from app.services.glucose_reader import existing_timestamps
+from app.services.nightscout_service import nightscout_service
+from app.services.stats_service import stats_service
+
+START = datetime(2026, 1, 1)
+
+
+def _values(n):
+    return [60 + (i * 7) % 220 for i in range(n)]
+
+
+def _note(i):
+    return "Medtrum Auto-Sync" if i % 50 else None
+
+
+def test_codec_roundtrip_is_lossless():
+    timestamps = [to_epoch_micros(START + timedelta(minutes=5 * i, microseconds=i * 13)) for i in range(300)]
+    timestamps[100] += 7_000_000  # Cadence irrégulière
+    ids = [1000 + i * (2 if i % 3 else 1) for i in range(300)]
+    values = [100.0, 100.0, 108.1092, 0.1 + 0.2] + [60 + (i * 7.3) % 220 for i in range(296)]
+    notes = [None, None, "Nightscout (xDrip)", "é"] + ["Medtrum Auto-Sync"] * 296
+    rates = [None, 0.0, -2.35, 1 / 3] + [round((i % 17 - 8) * 0.37, 2) for i in range(296)]
+    trends = [None, "Flat", "SingleDown", "FortyFiveUp"] + ["Flat"] * 296
+
+    blob = encode_chunk(timestamps, ids, values, notes, rates, trends)
+    assert decode_chunk(blob) == (timestamps, ids, values, notes, rates, trends)
+    assert decode_chunk(encode_chunk([], [], [], [])) == ([], [], [], [], [], [])
+
+    # Chunk version 1 (sans vitesses ni tendances) : toujours décodable.
+    # Colonnes vides en fin de blob v2 : 2 x 5 octets (dictionnaire {None}, un run)
+    v1 = bytearray(encode_chunk(timestamps[:4], ids[:4], values[:4], notes[:4]))[:-10]
+    v1[0] = 1
+    assert decode_chunk(bytes(v1)) == (timestamps[:4], ids[:4], values[:4], notes[:4], [None] * 4, [None] * 4)
+
+    # Cadence régulière, valeurs entières (sgv Nightscout) : ~4 octets par mesure
+    regular = [to_epoch_micros(START + timedelta(minutes=5 * i)) for i in range(288)]
+    blob = encode_chunk(regular, list(range(288)), [float(100 + i % 40) for i in range(288)], [None] * 288)
+    assert len(blob) < 288 * 5
+
+
+def test_pack_keeps_history_pages_and_ids(db, user, ingest, history_page):
+    ingest(_values(3 * 288), START, note=_note)
+    expected = [(e.id, e.value, e.note) for e in db.query(models.GlucoseEntry).order_by(models.GlucoseEntry.timestamp.desc())]
+
+    result = chunk_service.pack_user(db, user.id, START + timedelta(days=2, hours=6))
+    db.commit()
+    assert result == {"days": 2, "readings": 2 * 288}
+    assert db.query(models.GlucoseEntry).count() == 288
+
+    seen = []
+    before = None
+    while True:
+        response = Response()
+        page = history_page(read_history(response=response, limit=100, before=before, after=None, current_user=user, db=db))
+        if not page:
+            break
+        seen.extend((e.id, e.value, e.note) for e in page)
+        before = response.headers["X-Next-Cursor"]
+    assert seen == expected
+
+    # Pagination ascendante (curseurs `after`) à travers la frontière compacté / brut
+    newer = []
+    after = encode_cursor(START, expected[-1][0])
+    while True:
+        response = Response()
+        page = history_page(read_history(response=response, limit=100, before=None, after=after, current_user=user, db=db))
+        if not page:
+            break
+        newer = [(e.id, e.value, e.note) for e in page] + newer
+        after = response.headers["X-Prev-Cursor"]
+    assert newer == expected[:-1]
+
+
+def test_window_stats_are_exact_on_packed_head_day(db, user, ingest):
+    ingest(_values(4 * 288), START, note=_note)
+    window_start = START + timedelta(days=1, hours=7, minutes=2)
+    before = stats_service.window_stats(db, user.id, window_start)
+    _, values_before = stats_service.load_series(db, user.id, window_start)
+
+    chunk_service.pack_user(db, user.id, START + timedelta(days=3))
+    db.commit()
+    after = stats_service.window_stats(db, user.id, window_start)
+    _, values_after = stats_service.load_series(db, user.id, window_start)
+
+    assert after["count"] == before["count"]
+    assert (after["low"], after["normal"], after["high"]) == (before["low"], before["normal"], before["high"])
+    assert abs(after["sum"] - before["sum"]) < 1e-6
+    assert values_after.tolist() == values_before.tolist()
+
+
+def test_unpack_restores_raw_rows(db, user, ingest):
+    ingest(_values(2 * 288), START, note=_note)
+    ids = sorted(r[0] for r in db.query(models.GlucoseEntry.id))
+    chunk_service.pack_user(db, user.id, START + timedelta(days=5))
+    db.commit()
+    assert db.query(models.GlucoseEntry).count() == 0
+
+    assert chunk_service.unpack_user(db, user.id) == 2 * 288
+    db.commit()
+    assert sorted(r[0] for r in db.query(models.GlucoseEntry.id)) == ids
+    assert db.query(models.GlucoseChunk).count() == 0
+
+
+def test_trend_survives_pack_and_unpack(db, user, ingest, history_page):
+    ingest(_values(288 + 10), START, note=_note)
+    entry = models.GlucoseEntry
+    expected = [(e.id, e.rate_of_change, e.trend) for e in db.query(entry).order_by(entry.timestamp.desc())]
+    assert expected[0][2] is not None
+
+    chunk_service.pack_user(db, user.id, START + timedelta(days=1))
+    db.commit()
+    page = history_page(read_history(response=Response(), limit=len(expected), before=None, after=None,
+                              current_user=user, db=db))
+    assert [(e.id, e.rate_of_change, e.trend) for e in page] == expected
+
+    chunk_service.unpack_user(db, user.id)
+    db.commit()
+    assert [(e.id, e.rate_of_change, e.trend) for e in db.query(entry).order_by(entry.timestamp.desc())] == expected
+
+
+def test_sync_dedup_sees_packed_days(db, user, ingest, monkeypatch):
+    ingest(_values(288), START, note=_note)
+    chunk_service.pack_user(db, user.id, START + timedelta(days=1))
+    db.commit()
+    known = existing_timestamps(db, user.id, START, START + timedelta(days=1))
+    assert len(known) == 288
+
+    payload = [
+        {"sgv": 120, "dateString": (START + timedelta(minutes=5 * i)).isoformat() + "Z", "device": "xDrip"}
+        for i in range(286, 290)
+    ]
+    payload.append(dict(payload[-1]))  # Doublon dans le même lot
+
+    async def fake_fetch(url, token=None):
+        return payload
+    monkeypatch.setattr(nightscout_service, "fetch_entries", fake_fetch)
+
+    added = asyncio.run(nightscout_service.sync_user_data(db, user, "https://ns.example"))
+    assert added["synced"] == 2
+    assert stats_service.window_stats(db, user.id, START)["count"] == 290
@@ -0,0 +1,130 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Response
+
+from app.api.endpoints import get_stats_long_range
+from app.models import models
+from app.services.cold_tier_service import ColdTierService, month_start, next_month
+from app.services import cold_tier_service as cold_tier_module
+from app.services.retention_service import retention_service
+
+pytest.importorskip("duckdb")
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def cold(tmp_path, monkeypatch):
+    service = ColdTierService(str(tmp_path / "cold"), enabled=True)
+    monkeypatch.setattr(cold_tier_module, "cold_tier_service", service)
+    monkeypatch.setattr("app.api.endpoints.cold_tier_service", service)
+    monkeypatch.setattr("app.services.ingest_service.cold_tier_service", service)
+    return service
+
+
+def _history(now, months=3):
+    start = month_start(now)
+    for _ in range(months):
+        start = month_start(start - timedelta(days=1))
+    points, ts, i = [], start, 0
+    while ts < now:
+        points.append((ts, 60 + (i * 37) % 200))
+        ts += timedelta(hours=2)
+        i += 1
+    points.append((now, 120.0))
+    return start, points
+
+
+def test_archive_matches_live_stats(db, user, ingest, cold):
+    now = datetime.utcnow()
+    start, points = _history(now)
+    ingest(points=points)
+    live = cold.monthly_stats(db, user.id, start, now)
+    assert {m["source"] for m in live} == {"live"}
+
+    result = cold.archive_user(db, user.id, now)
+    db.commit()
+    assert result["months"] == 3
+    assert os.path.exists(cold.month_path(user.id, start))
+    assert not os.path.exists(cold.month_path(user.id, month_start(now)))
+
+    mixed = cold.monthly_stats(db, user.id, start, now)
+    assert [m["source"] for m in mixed] == ["archive"] * 3 + ["live"]
+    for a, b in zip(live, mixed):
+        assert {k: v for k, v in a.items() if k != "source"} == {k: v for k, v in b.items() if k != "source"}
+
+    # Rien de nouveau : aucun ré-export
+    assert cold.archive_user(db, user.id, now)["months"] == 0
+
+
+def test_late_reading_falls_back_to_live_until_reexported(db, user, ingest, cold):
+    now = datetime.utcnow()
+    start, points = _history(now)
+    ingest(points=points)
+    cold.archive_user(db, user.id, now)
+    db.commit()
+
+    ingest(points=[(start + timedelta(minutes=7), 45.0)])
+    stats = cold.monthly_stats(db, user.id, start, now)
+    assert stats[0]["source"] == "live" and stats[1]["source"] == "archive"
+
+    assert cold.archive_user(db, user.id, now)["months"] == 1
+    db.commit()
+    refreshed = cold.monthly_stats(db, user.id, start, now)
+    assert refreshed[0]["source"] == "archive"
+    assert refreshed[0]["count"] == stats[0]["count"] and refreshed[0]["tbr"] == stats[0]["tbr"]
+
+
+def test_cohort_stats_reads_partitions(db, user, ingest, cold):
+    now = datetime.utcnow()
+    start, points = _history(now, months=1)
+    ingest(points=points)
+    cold.archive_user(db, user.id, now)
+    db.commit()
+
+    rows = cold.cohort_stats(start, next_month(start))
+    assert len(rows) == 1
+    assert rows[0]["month"] == start and rows[0]["users"] == 1
+    monthly = cold.monthly_stats(db, user.id, start, start)[0]
+    assert rows[0]["mean_quartiles"][1] == monthly["mean"]
+    assert rows[0]["tir_quartiles"][1] == monthly["tir"]
+
+
+def test_long_range_endpoint(db, user, ingest, cold):
+    now = datetime.utcnow()
+    _, points = _history(now, months=2)
+    ingest(points=points)
+    cold.archive_user(db, user.id, now)
+    db.commit()
+
+    body = get_stats_long_range(response=Response(), months=2, if_none_match=None, current_user=user, db=db)
+    assert [m["source"] for m in body["months"]] == ["archive", "live"]
+    assert body["months"][-1]["month"] == month_start(now)
+
+
+def test_archive_and_live_agree_after_retention(db, user, ingest, cold, monkeypatch):
+    # Mois le plus ancien à 5 min puis passé en rétention (agrégats 15 min) avant l'export
+    now = datetime.utcnow()
+    start, points = _history(now, months=2)
+    oldest = [(start + timedelta(minutes=5 * i), 60 + (i * 37) % 200) for i in range(8 * 288)]
+    ingest(points=oldest)
+    ingest(points=[p for p in points if p[0] >= next_month(start)])
+    while retention_service.compact_user(db, user.id, next_month(start))["days"]:
+        db.commit()
+    assert db.query(models.GlucoseAggregate).count() == 8 * 96
+    live = cold.monthly_stats(db, user.id, start, now)
+
+    cold.archive_user(db, user.id, now)
+    db.commit()
+    scanned = []
+    monthly_totals = cold._monthly_totals
+    monkeypatch.setattr(cold, "_monthly_totals", lambda db, uid, s=None, e=None: scanned.append(s) or monthly_totals(db, uid, s, e))
+    mixed = cold.monthly_stats(db, user.id, start, now)
+
+    assert [m["source"] for m in mixed] == ["archive", "archive", "live"]
+    # Agrégats vifs lus seulement pour le mois non archivé
+    assert scanned == [month_start(now)]
+    assert mixed[0]["count"] == 8 * 288
+    for a, b in zip(live, mixed):
+        assert {k: v for k, v in a.items() if k != "source"} == {k: v for k, v in b.items() if k != "source"}
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from fastapi import Response
+
+from app.api.endpoints import get_stats_compare
+from app.services.comparison_service import comparison_service, window_bounds
+
+NOW = datetime(2026, 5, 10, 12, 0)
+
+
+def test_window_bounds_are_day_aligned():
+    assert window_bounds("1d", NOW) == (datetime(2026, 5, 9), datetime(2026, 5, 10), datetime(2026, 5, 11))
+    assert window_bounds("7d", NOW) == (datetime(2026, 4, 27), datetime(2026, 5, 4), datetime(2026, 5, 11))
+
+
+def test_compare_today_vs_yesterday(db, user, ingest):
+    # Hier : 50 % en cible + une hypo de 20 min ; aujourd'hui : 100 % en cible
+    ingest([120] * 4 + [60] * 4 + [120] * 4 + [200] * 4, datetime(2026, 5, 9))
+    ingest([100, 140] * 8, datetime(2026, 5, 10))
+    ingest([300] * 10, datetime(2026, 5, 7))  # Hors des deux périodes
+
+    result = comparison_service.compare(db, user.id, "1d", now=NOW)
+    current, previous, delta = result["current"], result["previous"], result["delta"]
+    assert (current["count"], previous["count"]) == (16, 16)
+    assert (current["tir"], previous["tir"], delta["tir"]) == (100.0, 50.0, 50.0)
+    assert (current["mean"], previous["mean"], delta["mean"]) == (120.0, 125.0, -5.0)
+    assert current["cv"] == round(20 / 120 * 100, 1)
+    assert (previous["low_episodes"], previous["high_episodes"], current["low_episodes"]) == (1, 1, 0)
+    assert delta["low_episodes"] == -1
+
+    context = comparison_service.format_context(result)
+    assert "TIR: 100.0% vs 50.0% (+50.0 pts)" in context
+
+
+def test_compare_without_previous_data(db, user, ingest):
+    ingest([100] * 6, datetime(2026, 5, 10))
+    result = comparison_service.compare(db, user.id, "7d", now=NOW)
+    assert result["previous"]["count"] == 0 and result["previous"]["tir"] is None
+    assert result["delta"]["tir"] is None
+    assert "insuffisantes" in comparison_service.format_context(result)
+
+
+def test_compare_endpoint_etag(db, user, ingest):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    ingest([100] * 3, today)
+
+    response = Response()
+    result = get_stats_compare(response, window="1d", if_none_match=None, current_user=user, db=db)
+    assert result["current"]["count"] == 3
+    cached = get_stats_compare(Response(), window="1d", if_none_match=response.headers["ETag"],
+                               current_user=user, db=db)
+    assert cached.status_code == 304
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+
+from app.api.endpoints import get_glucose_series
+from app.core.downsampling import lttb, lttb_indices
+from app.models import models
+from app.services.ingest_service import ingest_service
+
+
+def _reference_lttb(x, y, threshold):
+    """Implémentation de référence (boucle pure, Steinarsson 2013)."""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(np.floor(i * every)) + 1
+        end = int(np.floor((i + 1) * every)) + 1
+        next_end = min(int(np.floor((i + 2) * every)) + 1, n)
+        if i == threshold - 3:
+            cx, cy = x[n - 1], y[n - 1]
+        else:
+            cx, cy = np.mean(x[end:next_end]), np.mean(y[end:next_end])
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - cx) * (y[j] - y[a]) - (x[a] - x[j]) * (cy - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def test_matches_reference_implementation():
+    rng = np.random.default_rng(7)
+    x = np.cumsum(rng.integers(250, 350, size=2000)).astype(np.float64)
+    y = 140 + 60 * np.sin(np.arange(2000) / 40) + rng.normal(0, 8, 2000)
+    for threshold in (3, 10, 97, 500):
+        assert lttb_indices(x, y, threshold).tolist() == _reference_lttb(x, y, threshold)
+
+
+def test_short_series_is_returned_unchanged():
+    x = np.arange(5.0)
+    assert lttb(x, x * 2, 500)[1].tolist() == [0, 2, 4, 6, 8]
+
+
+def test_quarter_is_reduced_and_keeps_extremes():
+    n = 90 * 288
+    x = np.arange(n) * 300
+    y = 140 + 50 * np.sin(np.arange(n) / 50.0)
+    y[1234], y[20000] = 40.0, 390.0  # Hypo et hyper isolées
+    sx, sy = lttb(x, y, 500)
+    assert sx.size == 500
+    assert sy.min() == 40.0 and sy.max() == 390.0
+    assert np.all(np.diff(sx) > 0)
+
+
+def test_series_endpoint(db, user):
+    start = datetime(2026, 1, 1)
+    ingest_service.add_entries(db, user.id, [
+        models.GlucoseEntry(user_id=user.id, value=100 + i % 60, timestamp=start + timedelta(minutes=5 * i))
+        for i in range(2000)
+    ])
+    db.commit()
+
+    result = get_glucose_series(from_=start, to=start + timedelta(days=30), max_points=100, current_user=user, db=db)
+    assert result["raw_points"] == 2000
+    assert len(result["points"]) == 100
+    assert result["points"][0] == {"timestamp": start, "value": 100.0}
+
+    with pytest.raises(HTTPException):
+        get_glucose_series(from_=start, to=start, max_points=100, current_user=user, db=db)
@@ -0,0 +1,78 @@
+import json
+from datetime import datetime, timedelta
+from fastapi import Response
+from sqlalchemy import event
+
+from app.api.endpoints import read_history, get_tir_stats, get_hba1c_stats, update_profile
+from app.models import models, schemas
+from app.services.watermark_service import etag_matches, watermark_service
+
+
+def _count_queries(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_matching_tag_short_circuits_before_aggregates(db, user, ingest):
+    ingest([100, 200], datetime.utcnow() - timedelta(hours=1))
+    response = Response()
+    first = get_tir_stats(response=response, days=1, if_none_match=None, current_user=user, db=db)
+    etag = response.headers["ETag"]
+    assert first["count"] == 2 and etag.startswith('"')
+
+    statements = _count_queries(db)
+    cached = get_tir_stats(response=Response(), days=1, if_none_match=etag, current_user=user, db=db)
+    assert cached.status_code == 304 and cached.headers["ETag"] == etag
+    assert len(statements) == 1 and "user_data_watermarks" in statements[0]
+
+    # Autre fenêtre : autre tag
+    other = Response()
+    get_tir_stats(response=other, days=7, if_none_match=etag, current_user=user, db=db)
+    assert other.headers["ETag"] != etag
+
+
+def test_ingest_invalidates_tags(db, user, ingest):
+    ingest([120], datetime.utcnow() - timedelta(hours=1))
+    response = Response()
+    read_history(response=response, limit=10, before=None, after=None, if_none_match=None, current_user=user, db=db)
+    etag = response.headers["ETag"]
+    assert read_history(response=Response(), limit=10, before=None, after=None,
+                        if_none_match=etag, current_user=user, db=db).status_code == 304
+
+    ingest([130], datetime.utcnow())
+    page = read_history(response=Response(), limit=10, before=None, after=None,
+                        if_none_match=etag, current_user=user, db=db)
+    assert [e["value"] for e in json.loads(page.body)] == [130, 120]
+    assert db.get(models.UserDataWatermark, user.id).data_version == 2
+
+
+def test_profile_update_invalidates_hba1c(db, user, ingest):
+    ingest([150], datetime.utcnow() - timedelta(hours=1))
+    response = Response()
+    get_hba1c_stats(response=response, days=90, if_none_match=None, current_user=user, db=db)
+    etag = response.headers["ETag"]
+
+    update_profile(profile_data=schemas.QuestionnaireCreate(
+        age=40, weight=70, height=175, diabetes_type="T1", target_glucose_min=70, target_glucose_max=180,
+        hba1c_offset=0.3
+    ), current_user=user, db=db)
+    db.refresh(user)
+    result = get_hba1c_stats(response=Response(), days=90, if_none_match=etag, current_user=user, db=db)
+    assert result["offset"] == 0.3
+
+
+def test_if_none_match_parsing():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"x"')
+    assert not etag_matches(None, '"x"')
+    assert not etag_matches('"a"', '"b"')
+
+
+def test_bump_upserts_the_watermark(db, user):
+    assert watermark_service.version(db, user.id) == 0
+    watermark_service.bump(db, user.id)  # Création
+    watermark_service.bump(db, user.id)  # Conflit : incrément côté SQL
+    db.commit()
+    assert watermark_service.version(db, user.id) == 2
+    assert db.get(models.UserDataWatermark, user.id).last_ingest_at is not None
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from app.api.endpoints import get_glucose_events
+from app.models import models
+from app.services.event_service import event_service
+
+START = datetime(2026, 3, 1, 2, 0)
+
+
+def _events(db, user):
+    return db.query(models.GlucoseEvent).filter(models.GlucoseEvent.user_id == user.id).order_by(
+        models.GlucoseEvent.start_time).all()
+
+
+def test_low_episode_spanning_two_ingests(db, user, ingest):
+    ingest([100, 65, 60], START)
+    (event,) = _events(db, user)
+    assert event.end_time is None and event.kind == "low"
+
+    ingest([55, 62, 75, 90], START, offset=3)
+    (event,) = _events(db, user)
+    assert event.start_time == START + timedelta(minutes=5)
+    assert event.end_time == START + timedelta(minutes=25)
+    assert (event.extreme_value, event.extreme_time) == (55, START + timedelta(minutes=15))
+    assert event.reading_count == 4 and event.threshold == 70
+
+
+def test_short_excursions_and_sensor_gaps(db, user, ingest):
+    ingest([100, 190, 100, 100], START)  # 5 min au-dessus : bruit
+    assert _events(db, user) == []
+
+    ingest([60, 60, 60, 60], START, offset=10)
+    ingest([58], START, offset=40)  # Trou de 2 h : l'épisode précédent est clos
+    first, second = _events(db, user)
+    assert first.end_time == START + timedelta(minutes=5 * 13 + 5)
+    assert second.end_time is None and second.start_time == START + timedelta(minutes=200)
+
+
+def test_thresholds_come_from_profile(db, user, ingest):
+    db.add(models.Questionnaire(user_id=user.id, age=40, weight=70, height=175, diabetes_type="T1",
+                                target_glucose_min=80, target_glucose_max=160))
+    db.commit()
+    ingest([75, 75, 75, 75, 100, 170, 170, 170, 170, 100], START)
+    low, high = _events(db, user)
+    assert (low.kind, low.threshold, high.kind, high.threshold) == ("low", 80, "high", 160)
+
+
+def test_rebuild_matches_incremental_and_includes_late_readings(db, user, ingest):
+    values = [120, 60, 55, 50, 65, 110, 200, 260, 250, 210, 150, 140]
+    ingest(values[:5], START)
+    ingest(values[5:], START, offset=5)
+    incremental = [(e.kind, e.start_time, e.end_time, e.extreme_value) for e in _events(db, user)]
+
+    event_service.rebuild_user(db, user.id)
+    db.commit()
+    assert [(e.kind, e.start_time, e.end_time, e.extreme_value) for e in _events(db, user)] == incremental
+
+    # Mesures tardives (re-sync) : ignorées à l'ingestion, prises en compte au rebuild
+    ingest([50, 50, 50, 50, 100], start=START - timedelta(hours=1))
+    assert len(_events(db, user)) == 2
+    event_service.rebuild_user(db, user.id)
+    db.commit()
+    assert len(_events(db, user)) == 3
+
+
+def test_nocturnal_filter(db, user, ingest, monkeypatch):
+    ingest([60, 60, 60, 60, 100], START)  # 02:00 UTC
+    ingest([60, 60, 60, 60, 100], start=START + timedelta(hours=10))  # 12:00 UTC
+
+    all_lows = event_service.list_events(db, user.id, START - timedelta(days=1), kind="low")
+    night = event_service.list_events(db, user.id, START - timedelta(days=1), kind="low", nocturnal=True)
+    assert len(all_lows) == 2 and len(night) == 1
+    assert night[0]["duration_minutes"] == 20
+    # UTC+5 : 02:00 UTC -> 07:00, 12:00 UTC -> 17:00 : aucune hypo nocturne
+    assert event_service.list_events(db, user.id, START - timedelta(days=1), nocturnal=True, tz_offset_minutes=300) == []
+
+    result = get_glucose_events(kind="low", days=3650, nocturnal=True, tz_offset_minutes=0, current_user=user, db=db)
+    assert result["summary"]["low"] == {"count": 1, "nocturnal": 1, "avg_duration_minutes": 20, "extreme_value": 60}
+
+
+def test_open_episode_expires_when_sensor_goes_silent(db, user, ingest):
+    ingest([100, 60, 60, 60, 60], START)
+    last = START + timedelta(minutes=20)
+    since = START - timedelta(days=1)
+    (low,) = event_service.list_events(db, user.id, since, now=last)
+    assert low["ongoing"]
+
+    # Capteur muet au-delà de MAX_GAP : l'épisode est rendu clos à sa dernière mesure
+    (low,) = event_service.list_events(db, user.id, since, now=last + timedelta(minutes=31))
+    assert not low["ongoing"] and low["end_time"] == START + timedelta(minutes=25)
+    assert low["duration_minutes"] == 20
+
+    # La prochaine ingestion persiste la même fin ; une hyper muette de 5 min est écartée comme bruit
+    ingest([190], START + timedelta(hours=2))
+    high, persisted = event_service.list_events(db, user.id, since, now=START + timedelta(hours=2))
+    assert persisted == low and high["ongoing"]
+    assert event_service.list_events(db, user.id, since, now=START + timedelta(hours=3)) == [low]
@@ -0,0 +1,75 @@
+import asyncio
+import csv
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+
+from app.api.endpoints import export_glucose
+from app.services import export_service
+from app.services.chunk_service import chunk_service
+from app.services.retention_service import retention_service
+
+START = datetime(2026, 1, 1)
+
+
+def _values(n):
+    return [100 + i % 50 for i in range(n)]
+
+
+def _body(db, user, fmt, start=None, end=None):
+    chunks = list(export_service.stream_export(db, user.id, fmt, start, end))
+    return b"".join(c.encode() if isinstance(c, str) else c for c in chunks), len(chunks)
+
+
+def test_csv_streams_in_batches_across_storage_tiers(db, user, ingest, monkeypatch):
+    monkeypatch.setattr(export_service, "BATCH_SIZE", 100)
+    ingest(_values(3 * 288), START, note="CGM")
+    retention_service.compact_user(db, user.id, START + timedelta(days=1))
+    chunk_service.pack_user(db, user.id, START + timedelta(days=2))
+    db.commit()
+
+    body, n_chunks = _body(db, user, "csv")
+    rows = list(csv.reader(io.StringIO(body.decode())))
+    assert rows[0] == ["timestamp", "value", "note"]
+    assert len(rows) - 1 == 96 + 2 * 288
+    timestamps = [r[0] for r in rows[1:]]
+    assert timestamps == sorted(timestamps)
+    assert n_chunks == 7
+
+
+def test_ndjson_respects_range(db, user, ingest):
+    ingest(_values(288), START, note="CGM")
+    body, _ = _body(db, user, "ndjson", START + timedelta(hours=1), START + timedelta(hours=2))
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+    assert len(lines) == 12
+    assert lines[0] == {"timestamp": "2026-01-01T01:00:00", "value": 112, "note": "CGM"}
+
+
+def test_parquet_is_written_in_row_groups(db, user, ingest, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(export_service, "BATCH_SIZE", 100)
+    ingest(_values(288), START, note="CGM")
+
+    body, _ = _body(db, user, "parquet")
+    parquet = pq.ParquetFile(io.BytesIO(body))
+    assert parquet.metadata.num_rows == 288
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column("value").to_pylist()[:3] == [100, 101, 102]
+
+
+def test_endpoint_headers_and_invalid_range(db, user, ingest):
+    ingest(_values(10), START, note="CGM")
+    response = export_glucose(format="ndjson", from_=None, to=None, current_user=user, db=db)
+    assert response.media_type == "application/x-ndjson"
+    assert response.headers["content-disposition"].endswith('.ndjson"')
+
+    async def consume():
+        return [chunk async for chunk in response.body_iterator]
+    assert len("".join(asyncio.run(consume())).splitlines()) == 10
+
+    with pytest.raises(HTTPException) as exc:
+        export_glucose(format="csv", from_=START, to=START, current_user=user, db=db)
+    assert exc.value.status_code == 400
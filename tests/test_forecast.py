@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.api.endpoints import get_glucose_forecast
+from app.core import forecast
+from app.models import models
+from app.services.forecast_service import forecast_service, MIN_UPDATES, STALE_AFTER
+
+START = datetime(2026, 8, 1, 6, 0)
+
+
+def _sine(n, offset=0):
+    return [140 + 60 * np.sin(2 * np.pi * (offset + i) / 48) for i in range(n)]
+
+
+def test_rls_learns_ar_process_and_batch_matches_single():
+    rng = np.random.default_rng(1)
+    series = forecast.normalize(_sine(600)) + rng.normal(0, 0.002, 600)
+
+    theta, covariance = forecast.initial_state()
+    batch_theta, batch_cov = forecast.initial_state((3,))
+    for t in range(forecast.ORDER, series.size):
+        history = series[t - forecast.ORDER:t]
+        forecast.rls_update(theta, covariance, history, series[t])
+        forecast.rls_update(batch_theta, batch_cov, np.tile(history, (3, 1)), np.full(3, series[t]))
+    np.testing.assert_allclose(batch_theta, np.tile(theta, (3, 1)))
+
+    predicted = forecast.denormalize(forecast.predict(theta, series[-forecast.ORDER:], 12))
+    expected = np.array(_sine(612))[600:]
+    assert np.abs(predicted - expected).max() < 5
+
+
+def test_forecast_is_updated_incrementally_at_ingest(db, user, ingest):
+    ingest(_sine(10), START)
+    assert forecast_service.forecast(db, user.id, now=START + timedelta(minutes=50)) is None  # Pas assez de données
+
+    for chunk in range(0, 200, 25):
+        ingest(_sine(25, 10 + chunk), START, offset=10 + chunk)
+    now = START + timedelta(minutes=5 * 210)
+    incremental = forecast_service.forecast(db, user.id, 60, now=now)
+    assert incremental["updates"] >= MIN_UPDATES
+    assert incremental["last_timestamp"] == START + timedelta(minutes=5 * 209)
+    assert len(incremental["points"]) == 12
+    expected = _sine(12, 210)
+    assert max(abs(p["value"] - e) for p, e in zip(incremental["points"], expected)) < 10
+
+    # Le réajustement complet donne le même modèle que l'ajustement incrémental
+    forecast_service.rebuild_user(db, user.id, days=3650)
+    db.commit()
+    rebuilt = forecast_service.forecast(db, user.id, 60, now=now)
+    assert rebuilt["updates"] == incremental["updates"]
+    np.testing.assert_allclose([p["value"] for p in rebuilt["points"]], [p["value"] for p in incremental["points"]])
+
+
+def test_resampling_gaps_and_late_readings(db, user, ingest):
+    ingest([100, 110, 120, 130, 140, 150, 160], START)
+    row = db.get(models.GlucoseForecastModel, user.id)
+    assert row.update_count == 1
+
+    ingest([180], START, offset=9)  # 2 pas manquants : interpolés
+    assert row.update_count == 4
+    ingest([90], START, offset=5)  # Tardive : ignorée
+    assert row.update_count == 4
+
+    ingest([150], START, offset=30)  # Trou > 30 min : historique réinitialisé
+    assert np.frombuffer(row.history).size == 1 and row.update_count == 4
+
+
+def test_forecast_endpoint(db, user, ingest):
+    assert get_glucose_forecast(horizon=30, current_user=user, db=db)["available"] is False
+    ingest(_sine(60), start=datetime.utcnow() - timedelta(minutes=5 * 59))
+    result = get_glucose_forecast(horizon=30, current_user=user, db=db)
+    assert result["available"] and len(result["points"]) == 6
+    assert all(forecast.MIN_VALUE <= p["value"] <= forecast.MAX_VALUE for p in result["points"])
+
+
+def test_stale_model_is_not_published(db, user, ingest):
+    ingest(_sine(60), START)
+    last = db.get(models.GlucoseForecastModel, user.id).last_bucket
+    assert forecast_service.forecast(db, user.id, 30, now=last + STALE_AFTER) is not None
+    assert forecast_service.forecast(db, user.id, 30, now=last + STALE_AFTER + timedelta(minutes=1)) is None
+    # Données d'août : le endpoint ne publie pas une prévision issue d'un modèle périmé
+    assert get_glucose_forecast(horizon=30, current_user=user, db=db)["available"] is False
@@ -0,0 +1,70 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException, Response
+from pydantic import TypeAdapter
+
+from app.api.endpoints import read_history
+from app.core.pagination import encode_cursor, decode_cursor
+from app.models import models, schemas
+
+
+START = datetime(2026, 1, 1)
+
+
+def test_cursor_roundtrip():
+    ts = datetime(2026, 3, 4, 12, 30)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("pas-un-curseur")
+
+
+def test_keyset_pages_cover_history(db, user, ingest, history_page):
+    ingest([100 + i for i in range(25)], START)
+
+    seen = []
+    before = None
+    while True:
+        response = Response()
+        page = history_page(read_history(response=response, limit=10, before=before, after=None, current_user=user, db=db))
+        if not page:
+            break
+        seen.extend(e.value for e in page)
+        before = response.headers["X-Next-Cursor"]
+
+    assert seen == [100 + i for i in reversed(range(25))]
+
+
+def test_after_cursor_returns_newer_entries(db, user, ingest, history_page):
+    ingest([100 + i for i in range(5)], START)
+    response = Response()
+    first = history_page(read_history(response=response, limit=2, before=None, after=None, current_user=user, db=db))
+    prev_cursor = response.headers["X-Prev-Cursor"]
+
+    db.add(models.GlucoseEntry(user_id=user.id, value=500, timestamp=first[0].timestamp + timedelta(minutes=5)))
+    db.commit()
+
+    newer = history_page(read_history(response=Response(), limit=10, before=None, after=prev_cursor, current_user=user, db=db))
+    assert [e.value for e in newer] == [500]
+
+
+def test_invalid_cursor_is_rejected(db, user):
+    with pytest.raises(HTTPException) as exc:
+        read_history(response=Response(), limit=10, before="%%%", after=None, current_user=user, db=db)
+    assert exc.value.status_code == 400
+
+
+def test_history_body_matches_response_model(db, user, ingest):
+    ingest([100 + i for i in range(3)], START)
+    db.add(models.GlucoseEntry(user_id=user.id, value=140, timestamp=datetime(2026, 1, 2), note="repas",
+                               rate_of_change=-1.5, trend="FortyFiveDown"))
+    db.commit()
+    response = Response()
+    raw = read_history(response=response, limit=10, before=None, after=None, if_none_match=None,
+                       current_user=user, db=db)
+
+    # Même JSON que la revalidation FastAPI de response_model=list[schemas.GlucoseEntry]
+    orm = db.query(models.GlucoseEntry).order_by(models.GlucoseEntry.timestamp.desc()).all()
+    expected = TypeAdapter(list[schemas.GlucoseEntry]).dump_json([schemas.GlucoseEntry.model_validate(e) for e in orm])
+    assert raw.body == expected
+    assert raw.headers["X-Next-Cursor"] == response.headers["X-Next-Cursor"]
+    assert raw.headers["ETag"] == response.headers["ETag"]
@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+from app.models import models
+from app.services.hot_cache import GlucoseHotCache, hot_cache, RECORD_DTYPE, fcntl
+from app.services.stats_service import stats_service
+
+
+@pytest.fixture
+def enabled_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(hot_cache, "enabled", True)
+    monkeypatch.setattr(hot_cache, "directory", str(tmp_path))
+    return hot_cache
+
+
+def test_cold_user_is_warmed_from_db_then_appended_after_commit(db, user, ingest, enabled_cache):
+    start = datetime.utcnow() - timedelta(days=2)
+    ingest([100, 110, 120], start)
+    assert not os.path.exists(enabled_cache._path(user.id))
+
+    _, values = stats_service.load_series(db, user.id, start)
+    assert values.tolist() == [100, 110, 120]
+
+    ingest([130], start + timedelta(minutes=15))
+    _, values = stats_service.load_series(db, user.id, start)
+    assert values.tolist() == [100, 110, 120, 130]
+    assert os.path.getsize(enabled_cache._path(user.id)) == 4 * RECORD_DTYPE.itemsize
+
+
+def test_rolled_back_readings_never_reach_cache(db, user, ingest, enabled_cache):
+    start = datetime.utcnow() - timedelta(hours=1)
+    stats_service.load_series(db, user.id, start)  # fichier vide créé
+
+    ingest([150], start, commit=False)
+    db.rollback()
+    _, values = stats_service.load_series(db, user.id, start)
+    assert values.size == 0
+
+
+def test_out_of_order_append_is_merged_and_deduplicated(db, user, ingest, enabled_cache):
+    start = datetime.utcnow() - timedelta(hours=2)
+    ingest([140], start + timedelta(minutes=30))
+    stats_service.load_series(db, user.id, start)
+
+    enabled_cache.append(user.id, [(start + timedelta(minutes=30), 140.0), (start, 90.0)])
+    timestamps, values = stats_service.load_series(db, user.id, start)
+    assert values.tolist() == [90, 140]
+    assert np.all(np.diff(timestamps) > 0)
+
+
+def test_window_stats_from_cache_creates_no_orm_objects(db, user, ingest, enabled_cache):
+    start = datetime.utcnow() - timedelta(days=1)
+    ingest([60, 100, 200, 150], start)
+
+    loaded = []
+    listener = lambda target, context: loaded.append(target)
+    event.listen(models.GlucoseEntry, "load", listener)
+    try:
+        summary = stats_service.window_stats(db, user.id, start)
+    finally:
+        event.remove(models.GlucoseEntry, "load", listener)
+
+    assert (summary["count"], summary["low"], summary["normal"], summary["high"]) == (4, 1, 2, 1)
+    assert summary["sum"] == 510
+    assert loaded == []
+
+
+def _append_from_worker(directory, user_id, start, parity):
+    cache = GlucoseHotCache(directory, enabled=True)
+    for i in range(parity, 200, 2):
+        cache.append(user_id, [(start + timedelta(seconds=10 * i), 100.0 + i)])
+
+
+@pytest.mark.skipif(fcntl is None, reason="flock indisponible")
+def test_concurrent_workers_do_not_lose_appends(tmp_path):
+    cache = GlucoseHotCache(str(tmp_path), enabled=True)
+    cache._write(1, np.empty(0, dtype=RECORD_DTYPE))
+    start = datetime.utcnow().replace(microsecond=0) - timedelta(hours=1)
+
+    # Deux workers entrelacés : ajouts en fin de fichier et réécritures (fusion) concurrents
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_append_from_worker, args=(str(tmp_path), 1, start, p)) for p in (0, 1)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    records = np.fromfile(cache._path(1), dtype=RECORD_DTYPE)
+    assert records["v"].tolist() == [100.0 + i for i in range(200)]
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.api.endpoints import _kinetic_hba1c_context, _rolling_avg_90d, get_kinetic_hba1c, rebuild_kinetic_hba1c
+from app.core.stability_engine import fold_daily_means, glycation_weights, kinetic_mean_glucose
+from app.models import models
+from app.services.kinetic_service import kinetic_service
+
+DAY0 = datetime(2026, 1, 1)
+
+
+def test_incremental_fold_matches_vectorized_fold():
+    rng = np.random.default_rng(3)
+    days = np.sort(rng.choice(np.arange(200), 150, replace=False))  # Jours manquants
+    means = rng.uniform(90, 220, days.size)
+
+    state = (0.0, 0.0, None)
+    for day, mean in zip(days, means):
+        state = fold_daily_means(*state, [day], [mean])
+    vectorized = fold_daily_means(0.0, 0.0, None, days, means)
+    assert state[2] == vectorized[2] == days[-1]
+    assert state[0] == pytest.approx(vectorized[0]) and state[1] == pytest.approx(vectorized[1])
+
+    assert glycation_weights(30) == pytest.approx(0.5)
+    # Glycémie constante : la pondération ne change rien
+    assert kinetic_mean_glucose(*fold_daily_means(0.0, 0.0, None, days, np.full(days.size, 150.0))[:2]) == pytest.approx(150)
+
+
+def test_recent_days_weigh_more_than_flat_average():
+    days = np.arange(90)
+    means = np.where(days >= 60, 200.0, 120.0)  # Dernier mois dégradé
+    weighted = kinetic_mean_glucose(*fold_daily_means(0.0, 0.0, None, days, means)[:2])
+    assert weighted > means.mean() + 10
+
+
+def test_days_are_folded_when_closed_and_rebuild_matches(db, user, ingest):
+    ingest([100] * 4, DAY0, step=6 * 60)
+    assert kinetic_service.estimate(db, user.id) is None  # Jour en cours : pas encore clos
+
+    ingest([200] * 4, DAY0 + timedelta(days=1), step=6 * 60)
+    ingest([150] * 4, DAY0 + timedelta(days=4), step=6 * 60)  # Jours 2-3 sans données
+    estimate = kinetic_service.estimate(db, user.id)
+    assert estimate["days"] == 2 and estimate["as_of"] == DAY0 + timedelta(days=1)
+    w = 0.5 ** (1 / 30)
+    assert estimate["kinetic_mean_glucose"] == pytest.approx((100 * w + 200) / (w + 1))
+    assert estimate["estimated_hba1c"] == pytest.approx((estimate["kinetic_mean_glucose"] + 46.7) / 28.7)
+
+    # Multi-jours dans une seule ingestion (re-sync) : les jours clos sont repliés ensemble
+    ingest(points=[(DAY0 + timedelta(days=d, hours=1), v) for d, v in ((5, 180), (6, 90), (7, 110))])
+    incremental = kinetic_service.estimate(db, user.id)
+    assert incremental["days"] == 5 and incremental["as_of"] == DAY0 + timedelta(days=6)
+
+    kinetic_service.rebuild_user(db, user.id, today=DAY0 + timedelta(days=7))
+    db.commit()
+    rebuilt = kinetic_service.estimate(db, user.id)
+    assert rebuilt["days"] == 5
+    assert rebuilt["kinetic_mean_glucose"] == pytest.approx(incremental["kinetic_mean_glucose"])
+
+
+def test_kinetic_endpoints(db, user, ingest):
+    assert get_kinetic_hba1c(current_user=user, db=db)["estimated_hba1c"] is None
+    db.add(models.Questionnaire(user_id=user.id, age=40, weight=70, height=175, diabetes_type="T1", hba1c_offset=0.3))
+    db.commit()
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    for d in range(10, 0, -1):
+        ingest([154.2] * 4, today - timedelta(days=d), step=6 * 60)
+
+    result = get_kinetic_hba1c(current_user=user, db=db)
+    assert result["raw_hba1c"] == pytest.approx(7.0)
+    assert result["estimated_hba1c"] == pytest.approx(7.3)
+    assert 0 < result["weight_coverage"] < 100
+
+    rebuilt = rebuild_kinetic_hba1c(current_user=user, db=db)
+    assert rebuilt["days"] == 10 and rebuilt["estimated_hba1c"] == pytest.approx(7.0)
+
+
+def test_stability_reference_stays_on_90_day_average(db, user, ingest):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    for d in range(40, 0, -1):
+        ingest([200.0 if d <= 10 else 120.0] * 4, today - timedelta(days=d), step=6 * 60)
+
+    # analyze_stability : moyenne plate de la fenêtre, pas la moyenne cinétique (plus haute)
+    assert _rolling_avg_90d(db, user.id, snapshot=None) == pytest.approx(140.0)
+    estimate = kinetic_service.estimate(db, user.id)
+    assert estimate["kinetic_mean_glucose"] > 145
+    # L'estimation cinétique est exposée à part dans le contexte coach
+    assert f"{estimate['estimated_hba1c']:.1f} %" in _kinetic_hba1c_context(db, user.id)
+    assert "39 jours" in _kinetic_hba1c_context(db, user.id)  # Dernier jour pas encore clos
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.api.endpoints import get_meal_response, get_meal_foods, log_meal
+from app.core.meal_response import meal_excursions, food_key, MIN_READINGS
+from app.models import models, schemas
+from app.services.ai_service import _meal_response_suffix
+from app.services.meal_response_service import meal_response_service
+
+T0 = datetime(2026, 7, 1, 12, 0)
+
+
+def _naive(timestamps, values, meal):
+    base = [v for t, v in zip(timestamps, values) if meal - 1800 <= t <= meal]
+    post = [(t, v) for t, v in zip(timestamps, values) if meal < t <= meal + 7200]
+    if not base or len(post) < MIN_READINGS:
+        return None
+    baseline = sum(base) / len(base)
+    peak_t, peak = max(post, key=lambda p: p[1])
+    area, prev_t, prev_a = 0.0, meal, 0.0
+    for t, v in post:
+        above = max(v - baseline, 0.0)
+        area += (above + prev_a) / 2 * (t - prev_t) / 60
+        prev_t, prev_a = t, above
+    return baseline, peak, (peak_t - meal) / 60, area
+
+
+def _curve(minutes):
+    # Montée post-prandiale : pic de +60 mg/dL vers 50 min
+    return 100 + 60 * np.exp(-((minutes - 50) / 30) ** 2)
+
+
+def _curve_points(start, end, step=5):
+    """Mesures de la courbe type, de `start` à `end` minutes après le repas de T0."""
+    return [(T0 + timedelta(minutes=m), float(_curve(m))) for m in range(start, end + 1, step)]
+
+
+def _meal(db, user, name, at=T0):
+    meal = models.Meal(user_id=user.id, name=name, timestamp=at, carbs=60)
+    db.add(meal)
+    db.commit()
+    return meal
+
+
+def test_vectorized_matches_naive():
+    rng = np.random.default_rng(3)
+    timestamps = np.cumsum(rng.integers(240, 420, 600)).astype(np.int64)
+    values = rng.normal(140, 30, 600)
+    meals = np.sort(rng.integers(0, int(timestamps[-1]), 40)).astype(np.int64)
+    result = meal_excursions(timestamps, values, meals)
+    for i, meal in enumerate(meals):
+        expected = _naive(timestamps.tolist(), values.tolist(), int(meal))
+        if expected is None:
+            assert np.isnan(result["peak_delta"][i])
+            continue
+        baseline, peak, time_to_peak, iauc = expected
+        assert result["baseline"][i] == pytest.approx(baseline)
+        assert result["peak"][i] == pytest.approx(peak)
+        assert result["peak_delta"][i] == pytest.approx(peak - baseline)
+        assert result["time_to_peak"][i] == pytest.approx(time_to_peak)
+        assert result["iauc"][i] == pytest.approx(iauc)
+
+
+def test_food_key():
+    assert food_key("  Pâtes   Bolognaise ") == "pates bolognaise"
+
+
+def test_response_computed_when_window_closes(db, user, ingest):
+    meal = _meal(db, user, "Pâtes")
+    ingest(points=_curve_points(-30, 115))
+    assert meal_response_service.compute_meal(db, meal) is None
+    body = get_meal_response(meal_id=meal.id, current_user=user, db=db)
+    assert body["status"] == "pending"
+
+    # La mesure qui clôt la fenêtre n'est pas dans la fenêtre (arrivée 125 min après le repas)
+    ingest(points=_curve_points(125, 130))
+    db.refresh(meal)
+    row = meal.glucose_response
+    assert row is not None and row.food_key == "pates"
+    assert row.peak_delta == pytest.approx(59, abs=1)
+    assert row.time_to_peak_minutes == 50
+    assert row.reading_count == 23
+
+    body = get_meal_response(meal_id=meal.id, current_user=user, db=db)
+    assert body["status"] == "complete"
+    assert body["response"].iauc == row.iauc
+    with pytest.raises(HTTPException):
+        get_meal_response(meal_id=meal.id + 1, current_user=user, db=db)
+
+
+def test_insufficient_data(db, user, ingest):
+    meal = _meal(db, user, "Pomme")
+    ingest(points=_curve_points(0, 130, step=30))
+    body = get_meal_response(meal_id=meal.id, current_user=user, db=db)
+    assert body["status"] == "insufficient_data"
+    assert body["response"].peak is None
+    assert get_meal_foods(min_meals=1, limit=50, current_user=user, db=db) == {"foods": []}
+
+
+def test_repeated_computation_of_a_meal_counts_once(db, user, ingest):
+    ingest(points=_curve_points(-30, 130))
+    meal = _meal(db, user, "Riz")  # Ajouté hors log_meal : réponse pas encore calculée
+    # GET /meals/{id}/response puis ingestion : ligne créée par upsert, contribution remplacée
+    meal_response_service.compute_meals(db, user.id, [(meal.id, meal.timestamp, meal.name)])
+    meal_response_service.compute_meals(db, user.id, [(meal.id, meal.timestamp, meal.name)])
+    db.commit()
+
+    row = db.query(models.MealGlucoseResponse).one()
+    (food,) = meal_response_service.foods(db, user.id)
+    assert food["meals"] == 1
+    assert food["mean_peak_delta"] == row.peak_delta
+
+
+def test_late_logged_meal_and_food_index(db, user, ingest):
+    ingest(points=_curve_points(-30, 400))
+    first = log_meal(schemas.MealCreate(name="Riz", timestamp=T0), current_user=user, db=db)
+    assert first.glucose_response is not None
+    log_meal(schemas.MealCreate(name="riz ", timestamp=T0 + timedelta(minutes=240)), current_user=user, db=db)
+    log_meal(schemas.MealCreate(name="Salade", timestamp=T0 + timedelta(minutes=60)), current_user=user, db=db)
+
+    foods = get_meal_foods(min_meals=1, limit=50, current_user=user, db=db)["foods"]
+    assert [f["food"] for f in foods] == ["riz", "salade"]
+    assert foods[0]["meals"] == 2
+    assert foods[1]["mean_peak_delta"] < foods[0]["mean_peak_delta"]
+
+    # Mesures tardives dans la fenêtre d'un repas : recalcul, index mis à jour par différence
+    before = foods[1]["mean_peak_delta"]
+    ingest([260.0], T0 + timedelta(minutes=152))
+    foods = {f["food"]: f for f in get_meal_foods(min_meals=1, limit=50, current_user=user, db=db)["foods"]}
+    assert foods["salade"]["mean_peak_delta"] > before
+    assert foods["salade"]["meals"] == 1
+
+    assert meal_response_service.rebuild_user(db, user.id) == 3
+    db.commit()
+    assert {f["food"]: f for f in meal_response_service.foods(db, user.id)} == foods
+
+
+def test_context_formats_negative_peak_delta():
+    foods = [
+        {"food": "riz", "meals": 3, "mean_peak_delta": 54.6, "mean_time_to_peak_minutes": 45.0},
+        {"food": "salade", "meals": 2, "mean_peak_delta": -7.4, "mean_time_to_peak_minutes": 30.0},
+    ]
+    line = meal_response_service.format_context(foods)
+    assert "riz +55 mg/dL en 45 min (3 repas)" in line
+    assert "salade -7 mg/dL en 30 min (2 repas)" in line
+
+    meal = SimpleNamespace(glucose_response=SimpleNamespace(peak_delta=-12.2, time_to_peak_minutes=20.0))
+    assert _meal_response_suffix(meal) == ", pic -12 mg/dL à 20 min"
+    meal.glucose_response.peak_delta = 0.3
+    assert _meal_response_suffix(meal) == ", pic +0 mg/dL à 20 min"
@@ -0,0 +1,96 @@
+import math
+import numpy as np
+from datetime import datetime, timedelta
+
+from app.core.metrics import compute_cgm_metrics, time_in_ranges, mage, risk_indices, ambulatory_glucose_profile
+from app.api.endpoints import get_cgm_metrics
+from app.models import models
+
+
+def test_time_in_ranges_boundaries():
+    values = np.array([50, 54, 69, 70, 180, 181, 250, 251, 120, 100], dtype=float)
+    ranges = time_in_ranges(values)
+    assert ranges == {"tbr_level2": 10.0, "tbr_level1": 20.0, "tir": 40.0, "tar_level1": 20.0, "tar_level2": 10.0}
+
+
+def test_mage_counts_only_excursions_above_one_sd():
+    # Oscillation 100 <-> 200 : toutes les excursions valent 100
+    values = np.array([100, 150, 200, 150, 100, 150, 200, 200, 150, 100], dtype=float)
+    assert mage(values, sd=40.0) == 100.0
+    assert mage(values, sd=150.0) == 0.0
+
+
+def test_mage_is_robust_to_sensor_noise():
+    # Sinusoïde de 100 mg/dL crête à crête (période 6 h) sur 14 jours, puis bruit capteur σ = 3 mg/dL
+    t = np.arange(14 * 288)
+    clean = 150 + 50 * np.sin(2 * np.pi * t / 72)
+    noisy = clean + np.random.default_rng(0).normal(0, 3, t.size)
+    reference = mage(clean, float(clean.std()))
+    assert abs(reference - 100) < 2
+    # Les retournements du bruit ne fragmentent plus les excursions
+    assert abs(mage(noisy, float(noisy.std())) - reference) < 0.1 * reference
+
+
+def test_risk_indices_are_symmetric_around_112():
+    lbgi, hbgi = risk_indices(np.array([112.5]))
+    assert lbgi < 0.01 and hbgi < 0.01
+    lbgi, hbgi = risk_indices(np.array([50.0]))
+    assert lbgi > 10 and hbgi == 0.0
+
+
+def test_compute_cgm_metrics_summary():
+    values = np.array([100.0, 140.0, 180.0, 140.0])
+    metrics = compute_cgm_metrics(values, days=1)
+    assert metrics["mean"] == 140.0
+    assert metrics["sd"] == round(float(np.std(values, ddof=1)), 1)
+    assert metrics["gmi"] == round(3.31 + 0.02392 * 140, 2)
+    assert metrics["coverage"] == round(4 / 288 * 100, 1)
+    assert compute_cgm_metrics(np.array([])) == {"count": 0}
+
+
+def test_compute_cgm_metrics_on_90_days():
+    # Durée de calcul : scripts/bench_metrics.py
+    rng = np.random.default_rng(0)
+    values = 140 + 40 * np.sin(np.arange(288 * 90) / 288 * 2 * math.pi) + rng.normal(0, 10, 288 * 90)
+    metrics = compute_cgm_metrics(values, days=90)
+    assert metrics["count"] == 288 * 90 and metrics["coverage"] == 100.0
+    assert metrics["mean"] == round(float(values.mean()), 1)
+    assert sum(metrics[k] for k in ("tbr_level2", "tbr_level1", "tir", "tar_level1", "tar_level2")) == 100.0
+    assert 0 < metrics["mage"] <= values.max() - values.min()
+
+
+def test_cgm_metrics_endpoint(db, user):
+    now = datetime.utcnow()
+    db.add_all([
+        models.GlucoseEntry(user_id=user.id, value=v, timestamp=now - timedelta(minutes=5 * i))
+        for i, v in enumerate([60, 120, 200, 120])
+    ])
+    db.commit()
+    metrics = get_cgm_metrics(days=1, current_user=user, db=db)
+    assert metrics["days"] == 1
+    assert metrics["count"] == 4
+    assert metrics["tir"] == 50.0
+
+
+def test_agp_matches_numpy_percentiles_per_bin():
+    rng = np.random.default_rng(1)
+    timestamps = np.arange(0, 86400 * 14, 300, dtype=np.int64) + 1_700_000_000 // 86400 * 86400
+    values = rng.normal(140, 35, timestamps.size)
+
+    agp = ambulatory_glucose_profile(timestamps, values)
+    assert len(agp["bins"]) == 96
+
+    bins = (timestamps % 86400) // 900
+    for i in (0, 37, 95):
+        expected = np.percentile(values[bins == i], [5, 25, 50, 75, 95])
+        got = [agp["bins"][i][f"p{p}"] for p in (5, 25, 50, 75, 95)]
+        assert got == [round(float(v), 1) for v in expected]
+
+
+def test_agp_empty_bins_and_timezone_shift():
+    # Une seule mesure à 23:50 UTC -> tranche 00:45 en UTC+1
+    timestamps = np.array([86400 * 20000 + 23 * 3600 + 50 * 60])
+    agp = ambulatory_glucose_profile(timestamps, np.array([150.0]), tz_offset_minutes=60)
+    filled = [b for b in agp["bins"] if b["count"]]
+    assert [(b["time"], b["p50"]) for b in filled] == [("00:45", 150.0)]
+    assert agp["bins"][0]["p50"] is None
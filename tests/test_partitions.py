@@ -0,0 +1,17 @@
+from datetime import date
+
+from app.services.partition_service import partition_service, partition_name, partition_month
+
+
+def test_partition_names_roundtrip():
+    assert partition_name(date(2026, 3, 1)) == "glucose_entries_y2026m03"
+    assert partition_month("glucose_entries_y2026m03") == date(2026, 3, 1)
+    assert partition_month("glucose_entries_default") is None
+
+
+def test_sqlite_is_left_unchanged(db):
+    conn = db.connection()
+    assert not partition_service.is_partitioned(conn)
+    assert partition_service.ensure_partitions(conn) == 0
+    assert partition_service.list_partitions(conn) == []
+    assert partition_service.detach_before(conn, date(2030, 1, 1)) == []
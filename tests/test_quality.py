@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.quality import (
+    QualityState, annotate, describe, FLAG_DUPLICATE, FLAG_SENSOR, FLAG_JUMP, FLAG_COMPRESSION, FLAG_GAP
+)
+from app.models import models
+from app.services.nightscout_service import nightscout_service
+from app.services.quality_service import quality_service
+from app.services.stats_service import stats_service
+
+T0 = datetime(2026, 7, 1, 2, 0)
+
+
+def _annotate(points, state=None):
+    return [flags for _, _, flags in annotate(((T0 + timedelta(minutes=m), v, 0) for m, v in points),
+                                              state or QualityState())]
+
+
+@pytest.fixture
+def detect(monkeypatch):
+    monkeypatch.setattr(quality_service, "detect", True)
+
+
+def test_flags():
+    assert _annotate([(0, 120), (5, 118), (5.5, 118), (10, 250), (15, 116), (45, 110), (50, 20)]) == [
+        0, 0, FLAG_DUPLICATE, FLAG_JUMP, 0, FLAG_GAP, FLAG_SENSOR
+    ]
+    # Compression : chute rapide sous 70, épisode jusqu'au retour dans la cible
+    assert _annotate([(0, 120), (5, 105), (10, 62), (15, 55), (20, 58), (25, 95), (30, 100)]) == [
+        0, 0, FLAG_COMPRESSION, FLAG_COMPRESSION, FLAG_COMPRESSION, 0, 0
+    ]
+    # Descente progressive vers l'hypo : mesures valides
+    assert _annotate([(5 * i, 110 - 8 * i) for i in range(7)]) == [0] * 7
+    # Hypo prolongée au-delà de 45 min : considérée comme réelle
+    flags = _annotate([(0, 110), (5, 60)] + [(5 * i, 58) for i in range(2, 14)])
+    assert flags[1] == FLAG_COMPRESSION and flags[-1] == 0
+    assert describe(FLAG_COMPRESSION | FLAG_GAP) == ["compression", "gap"]
+
+
+def test_jump_reference_recovers_after_level_shift():
+    # Décalage de niveau réel : accepté dès que la vitesse depuis la dernière mesure valide redevient plausible
+    flags = _annotate([(0, 100)] + [(5 * i, 200) for i in range(1, 6)])
+    assert flags[1] == FLAG_JUMP and flags[-1] == 0
+
+
+def test_artifacts_stored_but_excluded_from_stats(db, user, ingest, detect):
+    entries = ingest([120, 118, 60, 55, 100, 102], T0)
+    assert [e.quality for e in entries] == [0, 0, FLAG_COMPRESSION, FLAG_COMPRESSION, 0, 0]
+
+    stats = stats_service.window_stats(db, user.id, T0)
+    assert stats["count"] == 4 and stats["low"] == 0
+    daily = db.query(models.GlucoseRollup).filter(models.GlucoseRollup.resolution == "1d").one()
+    assert daily.value_count == 4
+    assert db.query(models.GlucoseEntry).count() == 6
+    assert entries[2].trend is None and entries[4].trend is not None
+
+
+def test_state_carries_across_single_reading_ingests(db, user, ingest, detect):
+    ingest([120], T0)
+    ingest([115], T0, offset=1)
+    (low,) = ingest([58], T0, offset=2)
+    (still_low,) = ingest([56], T0, offset=3)
+    (dup,) = ingest([56], T0 + timedelta(minutes=15.5))
+    assert (low.quality, still_low.quality, dup.quality) == (FLAG_COMPRESSION, FLAG_COMPRESSION, FLAG_DUPLICATE)
+    assert stats_service.window_stats(db, user.id, T0)["count"] == 2
+
+
+def test_source_noise_flag_applies_without_detection(db, user, monkeypatch):
+    assert not quality_service.detect
+    payload = [
+        {"sgv": 110 + i, "dateString": (T0 + timedelta(minutes=5 * i)).isoformat() + "Z", "noise": 4 if i == 2 else 1}
+        for i in range(4)
+    ]
+
+    async def fake_fetch(url, token=None):
+        return payload
+    monkeypatch.setattr(nightscout_service, "fetch_entries", fake_fetch)
+
+    result = asyncio.run(nightscout_service.sync_user_data(db, user, "https://ns.example"))
+    assert result["synced"] == 4
+    flags = [e.quality for e in db.query(models.GlucoseEntry).order_by(models.GlucoseEntry.timestamp)]
+    assert flags == [0, 0, FLAG_SENSOR, 0]
+    assert stats_service.window_stats(db, user.id, T0)["count"] == 3
@@ -0,0 +1,163 @@
+import asyncio
+from datetime import datetime, timedelta
+from fastapi import Response
+from sqlalchemy import event
+
+from app.api.endpoints import read_history
+from app.core.quality import FLAG_SENSOR
+from app.models import models
+from app.services.chunk_service import chunk_service
+from app.services.nightscout_service import nightscout_service
+from app.services.retention_service import retention_service
+from app.services.rollup_service import rollup_service
+from app.services.stats_service import stats_service
+
+START = datetime(2026, 1, 1)
+
+
+def _values(n):
+    return [50 + (i * 7) % 230 for i in range(n)]
+
+
+def _compact(db, user, before, batch_days=1):
+    total = 0
+    while True:
+        result = retention_service.compact_user(db, user.id, before, max_days=batch_days)
+        db.commit()
+        if not result["days"]:
+            return total
+        total += result["days"]
+
+
+def test_compaction_replaces_old_days_with_15_minute_aggregates(db, user, ingest):
+    ingest(_values(3 * 288), START)
+    assert _compact(db, user, START + timedelta(days=2, hours=3)) == 2
+
+    assert db.query(models.GlucoseEntry).count() == 288
+    rows = db.query(models.GlucoseAggregate).order_by(models.GlucoseAggregate.bucket_start).all()
+    assert len(rows) == 2 * 96
+    first = rows[0]
+    assert (first.value_count, first.value_min, first.value_max) == (3, 50, 64)
+    assert first.value_mean == 57
+    # Idempotent : rien de plus à compacter
+    assert _compact(db, user, START + timedelta(days=2, hours=3)) == 0
+
+
+def test_compaction_merges_into_existing_aggregates(db, user, ingest):
+    ingest(_values(288), START)
+    _compact(db, user, START + timedelta(days=1))
+    # Mesure arrivée après la compaction (hors ingestion) dans le premier bucket de 15 min
+    db.add(models.GlucoseEntry(user_id=user.id, value=100, timestamp=START + timedelta(minutes=1)))
+    db.commit()
+    assert _compact(db, user, START + timedelta(days=1)) == 1
+
+    first = db.query(models.GlucoseAggregate).order_by(models.GlucoseAggregate.bucket_start).first()
+    assert (first.value_count, first.value_min, first.value_max) == (4, 50, 100)
+    assert first.value_mean == (50 + 57 + 64 + 100) / 4
+    assert first.value_sum_sq == 50 ** 2 + 57 ** 2 + 64 ** 2 + 100 ** 2
+    assert db.query(models.GlucoseAggregate).count() == 96
+
+
+def test_artifact_only_day_does_not_restart_the_walk(db, user, ingest):
+    ingest(_values(288), START)
+    # Un an plus tôt : une journée d'artefacts et une mesure sans valeur, jamais compactables
+    db.add_all([
+        models.GlucoseEntry(user_id=user.id, value=20, quality=FLAG_SENSOR, timestamp=START - timedelta(days=365)),
+        models.GlucoseEntry(user_id=user.id, value=None, timestamp=START - timedelta(days=300)),
+    ])
+    db.commit()
+
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        assert _compact(db, user, START + timedelta(days=1)) == 1
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert len(statements) < 20  # Pas de parcours jour par jour depuis l'artefact
+    assert db.query(models.GlucoseEntry).count() == 2
+
+
+def test_window_stats_read_across_tiers(db, user, ingest):
+    ingest(_values(4 * 288), START)
+    window_start = START + timedelta(hours=9, minutes=15)
+    before = stats_service.window_stats(db, user.id, window_start)
+
+    _compact(db, user, START + timedelta(days=2))
+    after = stats_service.window_stats(db, user.id, window_start)
+
+    assert after["count"] == before["count"]
+    assert (after["low"], after["normal"], after["high"]) == (before["low"], before["normal"], before["high"])
+    assert (after["min"], after["max"]) == (before["min"], before["max"])
+    assert abs(after["sum"] - before["sum"]) < 1e-6
+    assert abs(after["sum_sq"] - before["sum_sq"]) < 1e-3
+
+
+def test_rebuild_keeps_daily_rollups_of_compacted_days(db, user, ingest):
+    ingest(_values(2 * 288), START)
+    _compact(db, user, START + timedelta(days=1))
+
+    def rollups():
+        return [
+            (r.resolution, r.bucket_start, r.value_count, r.value_sum, r.value_min, r.value_max,
+             r.low_count, r.high_count)
+            for r in db.query(models.GlucoseRollup).order_by(models.GlucoseRollup.bucket_start)
+        ]
+    before = rollups()
+    assert [r[0] for r in before] == ["1d", "1d"]
+
+    rollup_service.rebuild_user(db, user.id)
+    db.commit()
+    assert rollups() == before
+
+
+def test_packed_days_are_compacted_too(db, user, ingest):
+    ingest(_values(2 * 288), START)
+    chunk_service.pack_user(db, user.id, START + timedelta(days=2))
+    db.commit()
+
+    _compact(db, user, START + timedelta(days=1))
+    assert db.query(models.GlucoseChunk).count() == 1
+    assert db.query(models.GlucoseAggregate).count() == 96
+    _, values = stats_service.load_series(db, user.id, START)
+    assert values.size == 96 + 288
+
+
+def test_history_pages_through_raw_then_aggregates(db, user, ingest, history_page):
+    ingest(_values(2 * 288), START)
+    _compact(db, user, START + timedelta(days=1))
+
+    seen = []
+    before = None
+    while True:
+        response = Response()
+        page = history_page(read_history(response=response, limit=50, before=before, after=None, current_user=user, db=db))
+        if not page:
+            break
+        seen.extend(page)
+        before = response.headers["X-Next-Cursor"]
+
+    assert len(seen) == 288 + 96
+    assert [e.timestamp for e in seen] == sorted((e.timestamp for e in seen), reverse=True)
+    assert all(e.id < 0 for e in seen[288:])
+    assert seen[-1].timestamp == START and seen[-1].value == 57
+
+
+def test_resync_does_not_reinsert_compacted_readings(db, user, ingest, monkeypatch):
+    ingest(_values(2 * 288), START)
+    _compact(db, user, START + timedelta(days=1))
+
+    payload = [
+        {"sgv": 120, "dateString": (START + timedelta(minutes=5 * i)).isoformat() + "Z", "device": "xDrip"}
+        for i in range(0, 2 * 288 + 2, 48)
+    ]
+
+    async def fake_fetch(url, token=None):
+        return payload
+    monkeypatch.setattr(nightscout_service, "fetch_entries", fake_fetch)
+
+    result = asyncio.run(nightscout_service.sync_user_data(db, user, "https://ns.example"))
+    assert result["synced"] == 1
+    assert stats_service.window_stats(db, user.id, START)["count"] == 2 * 288 + 1
@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import func
+
+from app.api.endpoints import _rolling_avg_90d
+from app.models import models
+from app.services.nightscout_service import nightscout_service
+from app.services.summary_service import summary_service, window_start, _daily_totals
+
+
+def _exact(db, user, start):
+    entry = models.GlucoseEntry
+    count, total = db.query(func.count(entry.value), func.sum(entry.value)).filter(
+        entry.user_id == user.id, entry.timestamp >= start
+    ).one()
+    return count, float(total or 0.0)
+
+
+def _assert_exact(db, user):
+    window = summary_service.rolling_window(db, user.id)
+    count, total = _exact(db, user, window["start"])
+    assert window["count"] == count
+    assert abs(window["sum"] - total) < 1e-6
+
+
+def test_window_counts_late_readings_and_ignores_expired_ones(db, user, ingest):
+    now = datetime.utcnow()
+    ingest(points=[(now - timedelta(hours=h), 100 + h) for h in range(0, 48, 3)])
+    _assert_exact(db, user)
+
+    # Re-sync tardive : dans la fenêtre (comptée) et hors fenêtre (ignorée)
+    ingest(points=[(now - timedelta(days=30), 250), (now - timedelta(days=95), 400)])
+    _assert_exact(db, user)
+    row = summary_service.get(db, user.id)
+    assert row.window_count == 17 and row.reading_count == 18
+
+
+def test_window_advance_subtracts_expired_days(db, user, ingest):
+    today = window_start(days=1)
+    ingest(points=[(today - timedelta(days=d, hours=-12), 80 + d) for d in range(0, 100)])
+    target = window_start()
+
+    # État tel qu'à la dernière ingestion il y a 5 jours : la fenêtre commençait 5 jours plus tôt
+    row = summary_service.get(db, user.id)
+    row.window_start = target - timedelta(days=5)
+    row.window_count, row.window_sum = _daily_totals(db, user.id, row.window_start)
+    db.commit()
+    assert row.window_count == 95
+
+    _assert_exact(db, user)  # Lecture : jours sortis retranchés sans écriture
+    assert summary_service.get(db, user.id).window_start == target - timedelta(days=5)
+
+    # Ingestion : la fenêtre avance, y compris avec une mesure tardive d'un jour sorti
+    ingest(points=[(datetime.utcnow(), 120), (target - timedelta(days=2, hours=-1), 300)])
+    row = summary_service.get(db, user.id)
+    assert row.window_start == target and row.window_count == 91
+    _assert_exact(db, user)
+
+
+def test_deduplicated_resync_does_not_double_count(db, user, monkeypatch):
+    now = datetime.utcnow().replace(microsecond=0)
+    entries = [
+        {"sgv": 100 + i, "dateString": (now - timedelta(minutes=5 * i)).isoformat() + "Z", "device": "xDrip"}
+        for i in range(24)
+    ]
+
+    async def fetch(url, token=None):
+        return entries
+
+    monkeypatch.setattr(nightscout_service, "fetch_entries", fetch)
+    first = asyncio.run(nightscout_service.sync_user_data(db, user, "https://ns.example"))
+    entries += [{"sgv": 90, "dateString": (now + timedelta(minutes=5)).isoformat() + "Z", "device": "xDrip"}]
+    second = asyncio.run(nightscout_service.sync_user_data(db, user, "https://ns.example"))
+
+    assert (first["synced"], second["synced"]) == (24, 1)
+    window = summary_service.rolling_window(db, user.id)
+    assert window["count"] == 25
+    _assert_exact(db, user)
+
+
+def test_stability_average_comes_from_the_window(db, user, ingest):
+    snapshot = SimpleNamespace(lab_data=SimpleNamespace(fasting_glucose=95))
+    assert _rolling_avg_90d(db, user.id, snapshot) == 95.0  # Aucune mesure : glycémie à jeun
+
+    today = window_start(days=1)
+    ingest(points=[(today - timedelta(days=d, hours=-12), 300 if d > 95 else 100 + d % 2 * 20) for d in range(0, 120)])
+    window = summary_service.rolling_window(db, user.id)
+    # Jours sortis de la fenêtre exclus, jours clos inclus
+    assert _rolling_avg_90d(db, user.id, snapshot) == window["sum"] / window["count"]
+    assert 100 < window["sum"] / window["count"] < 120  # Jours à 300 mg/dL hors fenêtre
+    count, total = _exact(db, user, window["start"])
+    assert abs(_rolling_avg_90d(db, user.id, snapshot) - total / count) < 1e-9
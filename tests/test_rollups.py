@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from fastapi import Response
+
+from app.api.endpoints import get_tir_stats, get_hba1c_stats
+from app.models import models
+from app.services.rollup_service import rollup_service, bucket_start
+from app.services.stats_service import stats_service
+
+
+def test_bucket_start_alignment():
+    ts = datetime(2026, 5, 17, 13, 47, 12)
+    assert bucket_start(ts, "5m") == datetime(2026, 5, 17, 13, 45)
+    assert bucket_start(ts, "1h") == datetime(2026, 5, 17, 13, 0)
+    assert bucket_start(ts, "1d") == datetime(2026, 5, 17)
+
+
+def test_ingest_updates_rollups_incrementally(db, user, ingest):
+    start = datetime(2026, 5, 17, 23, 0)
+    values = [60, 100, 150, 200, 250] * 6
+    ingest(values[:10], start)
+    ingest(values[10:], start + timedelta(minutes=50))
+
+    daily = db.query(models.GlucoseRollup).filter(models.GlucoseRollup.resolution == "1d").all()
+    assert sorted(r.bucket_start for r in daily) == [datetime(2026, 5, 17), datetime(2026, 5, 18)]
+    assert sum(r.value_count for r in daily) == 30
+    assert sum(r.value_sum for r in daily) == sum(values)
+    assert min(r.value_min for r in daily) == 60
+    assert max(r.value_max for r in daily) == 250
+
+    summary = stats_service.window_stats(db, user.id, start)
+    assert summary["count"] == 30
+    assert (summary["low"], summary["normal"], summary["high"]) == (6, 12, 12)
+
+
+def test_rebuild_matches_incremental(db, user, ingest):
+    start = datetime(2026, 5, 1, 7, 3)
+    values = [80 + (i * 37) % 200 for i in range(600)]
+    ingest(values, start)
+
+    def snapshot():
+        return sorted(
+            (r.resolution, r.bucket_start, r.value_count, round(r.value_sum, 6), r.low_count, r.high_count)
+            for r in db.query(models.GlucoseRollup).all()
+        )
+
+    incremental = snapshot()
+    rollup_service.rebuild_user(db, user.id)
+    db.commit()
+    assert snapshot() == incremental
+
+
+def test_stats_endpoints_read_rollups(db, user, ingest):
+    now = datetime.utcnow()
+    values = [65, 120, 190, 110]
+    ingest(values, now - timedelta(hours=3), step=30)
+
+    tir = get_tir_stats(response=Response(), days=1, current_user=user, db=db)
+    assert tir == {"low": 25.0, "normal": 50.0, "high": 25.0, "count": 4, "avg": 121.0}
+
+    hba1c = get_hba1c_stats(response=Response(), days=90, current_user=user, db=db)
+    assert hba1c["avg_glucose"] == sum(values) / 4
+
+
+def test_overlapping_applies_add_up_without_conflict(db, user):
+    # Deux ingestions concurrentes : aucune ne voit le bucket (non encore flushé) de l'autre
+    start = datetime(2026, 5, 17, 10, 0)
+    for offset, values in ((0, (100, 60)), (1, (200, 90))):
+        rollup_service.apply_entries(db, user.id, [
+            models.GlucoseEntry(user_id=user.id, value=v, timestamp=start + timedelta(minutes=offset + 5 * i))
+            for i, v in enumerate(values)
+        ])
+    db.commit()
+
+    daily = db.query(models.GlucoseRollup).filter(models.GlucoseRollup.resolution == "1d").one()
+    assert (daily.value_count, daily.value_sum, daily.value_min, daily.value_max) == (4, 450, 60, 200)
+    assert (daily.low_count, daily.normal_count, daily.high_count) == (1, 2, 1)
+    assert db.query(models.GlucoseRollup).count() == 1  # Agrégat journalier seul
@@ -0,0 +1,38 @@
+from datetime import datetime
+from sqlalchemy import event
+
+from app.models import models
+from app.services.stats_service import stats_service
+
+
+def _values(n):
+    return [50 + (i * 13) % 250 for i in range(n)]
+
+
+def test_window_stats_is_exact_on_partial_first_day(db, user, ingest):
+    start = datetime(2026, 4, 1, 0, 0)
+    ingest(_values(288 * 3), start)
+
+    window_start = datetime(2026, 4, 1, 17, 42)
+    expected = stats_service.raw_window_stats(db, user.id, window_start)
+    combined = stats_service.window_stats(db, user.id, window_start)
+
+    assert combined["count"] == expected["count"]
+    assert (combined["low"], combined["normal"], combined["high"]) == (expected["low"], expected["normal"], expected["high"])
+    assert abs(combined["sum"] - expected["sum"]) < 1e-6
+    assert (combined["min"], combined["max"]) == (expected["min"], expected["max"])
+
+
+def test_window_stats_materializes_no_rows(db, user, ingest):
+    ingest(_values(288), datetime(2026, 4, 1))
+
+    loaded = []
+    listener = lambda target, context: loaded.append(target)
+    event.listen(models.GlucoseEntry, "load", listener)
+    try:
+        stats = stats_service.window_stats(db, user.id, datetime(2026, 4, 1, 6, 0))
+    finally:
+        event.remove(models.GlucoseEntry, "load", listener)
+
+    assert stats["count"] == 288 - 72
+    assert loaded == []
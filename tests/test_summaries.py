@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from fastapi import Response
+
+from app.api.endpoints import get_hba1c_stats
+from app.services.chunk_service import chunk_service
+from app.services.rollup_service import rollup_service
+from app.services.summary_service import summary_service
+
+
+def test_counters_follow_every_ingest_including_late_readings(db, user, ingest):
+    start = datetime(2026, 2, 1, 12)
+    ingest([100, 120, 140], start)
+    ingest([80], start - timedelta(days=1))  # Mesure en retard (re-sync)
+    ingest([200], start + timedelta(hours=2))
+
+    row = summary_service.get(db, user.id)
+    db.refresh(row)
+    assert (row.reading_count, row.value_sum) == (5, 640)
+    assert row.first_timestamp == start - timedelta(days=1)
+    assert row.last_timestamp == start + timedelta(hours=2)
+
+
+def test_rebuild_matches_incremental_counters(db, user, ingest):
+    start = datetime(2026, 2, 1)
+    ingest([100 + i % 30 for i in range(600)], start)
+    chunk_service.pack_user(db, user.id, start + timedelta(days=1))
+    db.commit()
+    incremental = summary_service.get(db, user.id)
+    db.refresh(incremental)
+    expected = (incremental.reading_count, incremental.value_sum, incremental.first_timestamp, incremental.last_timestamp)
+
+    rollup_service.rebuild_user(db, user.id)
+    rebuilt = summary_service.rebuild_user(db, user.id)
+    assert (rebuilt.reading_count, rebuilt.value_sum, rebuilt.first_timestamp, rebuilt.last_timestamp) == expected
+
+
+def test_hba1c_reports_real_points_and_coverage(db, user, ingest):
+    # 2 jours de données, une mesure toutes les 10 min : couverture ~50 %
+    start = datetime.utcnow() - timedelta(days=2)
+    ingest([154] * 288, start, step=10)
+
+    result = get_hba1c_stats(response=Response(), days=90, if_none_match=None, current_user=user, db=db)
+    assert result["points"] == 288
+    assert 49.0 <= result["coverage"] <= 51.0
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.trend import rate_of_change, trend_direction, describe_trend
+from app.models import models, schemas
+from app.services.summary_service import summary_service
+from app.services.trend_service import trend_service
+from app.api.endpoints import receive_cgm_ping
+
+START = datetime(2026, 6, 1, 8, 0)
+
+
+@pytest.fixture(autouse=True)
+def fresh_buffers():
+    trend_service.reset()
+    yield
+    trend_service.reset()
+
+
+def _points(values, step=5):
+    return [(START + timedelta(minutes=step * i), v) for i, v in enumerate(values)]
+
+
+def test_rate_of_change_is_least_squares_slope_over_15_minutes():
+    assert rate_of_change(_points([100, 110, 120, 130])) == pytest.approx(2.0)
+    # Le point à -20 min sort de la fenêtre
+    assert rate_of_change(_points([300, 110, 120, 130, 140])) == pytest.approx(2.0)
+    # Bruit : la pente lisse un point aberrant
+    assert abs(rate_of_change(_points([120, 118, 135, 121]))) < 1.0
+    assert rate_of_change(_points([120])) is None
+    assert rate_of_change([(START, 100), (START + timedelta(minutes=30), 130)]) is None
+
+
+@pytest.mark.parametrize("rate, direction", [
+    (3.5, "DoubleUp"), (2.5, "SingleUp"), (1.5, "FortyFiveUp"), (0.3, "Flat"),
+    (-1.0, "Flat"), (-1.5, "FortyFiveDown"), (-2.5, "SingleDown"), (-4.0, "DoubleDown"), (None, None),
+])
+def test_trend_direction(rate, direction):
+    assert trend_direction(rate) == direction
+
+
+def test_trend_is_stored_at_ingest_across_batches_and_restarts(db, user, ingest):
+    first = ingest([100, 105, 110], START)
+    assert first[0].trend is None and first[1].rate_of_change == 1.0
+    assert (first[2].rate_of_change, first[2].trend) == (1.0, "Flat")
+
+    trend_service.reset()  # Nouveau process : le tampon est rechargé depuis la base
+    (entry,) = ingest([125], START, offset=3)
+    assert (entry.rate_of_change, entry.trend) == (1.6, "FortyFiveUp")
+
+    stored = db.query(models.GlucoseEntry).filter(models.GlucoseEntry.id == entry.id).one()
+    assert stored.trend == "FortyFiveUp"
+
+
+def test_gap_and_late_readings_have_no_trend(db, user, ingest):
+    ingest([100, 100, 100], START)
+    (after_gap,) = ingest([150], START, offset=12)
+    assert after_gap.trend is None and after_gap.rate_of_change is None
+
+    (late,) = ingest([90], START, offset=5)
+    assert late.trend is None
+    assert trend_service.latest(db, user.id)[0] == START + timedelta(minutes=60)
+
+
+def test_cgm_ping_returns_trend_and_current_is_served_from_buffer(db, user):
+    now = datetime.utcnow().replace(microsecond=0)
+    for i, value in enumerate([150, 140, 130, 120]):
+        result = receive_cgm_ping(
+            schemas.CGMPing(value=value, timestamp=now - timedelta(minutes=5 * (3 - i)), trend="stable"),
+            current_user=user, db=db
+        )
+    assert (result.rate_of_change, result.trend) == (-2.0, "FortyFiveDown")
+
+    value, label = trend_service.current(db, user.id)
+    assert value == 120 and label == describe_trend("FortyFiveDown", -2.0) == "↘ légère baisse (-2.0 mg/dL/min)"
+    assert trend_service.current(db, user.id, now=now + timedelta(hours=1)) is None
+
+
+def test_database_reads_happen_outside_the_buffer_lock(db, user, ingest, monkeypatch):
+    ingest([100, 105, 110], START)
+    trend_service.reset()
+    locked = []
+    original_get = summary_service.get
+    original_seed = trend_service._seed
+
+    def get(db_, user_id):
+        locked.append(trend_service._lock.locked())
+        return original_get(db_, user_id)
+
+    def seed(db_, user_id, before):
+        locked.append(trend_service._lock.locked())
+        return original_seed(db_, user_id, before)
+
+    monkeypatch.setattr(summary_service, "get", get)
+    monkeypatch.setattr(trend_service, "_seed", seed)
+    assert trend_service.latest(db, user.id)[1] == 110
+    (entry,) = ingest([120], START, offset=3)
+    assert entry.trend is not None
+    assert locked and not any(locked)  # Un utilisateur lent ne bloque pas les autres